@@ -3,223 +3,445 @@ import plotly.graph_objects as go
 import numpy as np
 
 # Importar módulos de la nueva arquitectura
-from src.config.constants import APP_CONFIG
-from src.services import DataService, ModelService
-from src.components import MetricsDisplay
-from src.utils import Calculations
+from src.config.constants import (
+    APP_CONFIG, ACIDEZ_MAXIMA, PROTEINA_MINIMA, CONDICIONES_ALMACENAMIENTO, RANGOS_SENSIBILIDAD,
+    VARIABLES_SENSIBILIDAD, COSTOS_ALMACENAMIENTO, PROTEINA_DATA_FILE
+)
+from src.services import DataService, ModelService, RiskService, SensitivityService, OptimizationService, ResultCache
+from src.components import MetricsDisplay, FigureCache, ProfilingDisplay
+from src.utils import Calculations, seccion_memorizada
 
 # Configuración de la página
 st.set_page_config(**APP_CONFIG)
 
-# Título principal
-st.title("🌱 Soya Insights")
+# Duración del rerun completo (métricas Prometheus) y perfilado bajo demanda
+with ProfilingDisplay.pagina("soya_insights"):
+    # Título principal
+    st.title("🌱 Soya Insights")
 
-# Información sobre las páginas disponibles
-st.info("""
+    # Información sobre las páginas disponibles
+    st.info("""
 📚 **Páginas Disponibles:**
 - **📊 Resumen Principal** (actual): Soya Insights
 - **📉 Modelo de Degradación**: Detalle del modelo de degradación del grano en función del tiempo
 - **🧪 Modelo de Acidez**: Análisis del cambio de acidez en función del daño
 - **🥜 Modelo de Proteína**: Estudio del cambio de proteína soluble por degradación
+- **⏳ Vida Útil**: Meses de almacenamiento hasta superar los límites de acidez o proteína
+- **📦 Evaluación de Lotes**: Carga de inventarios CSV y evaluación masiva de silos y camiones
 """)
 
-# Sidebar para controles
-st.sidebar.header("Configuración de Análisis")
+    # Sidebar para controles
+    st.sidebar.header("Configuración de Análisis")
 
-# Parámetros de degradación reales
-st.sidebar.subheader("Parámetros de Daño del Grano")
-gdc = st.sidebar.slider("GDC - Daño Térmico (%)", 0.0, 100.0, 25.0, 0.1)
-gdh = st.sidebar.slider("GDH - Daño por Hongos (%)", 0.0, 50.0, 10.0, 0.1)
-gdt = gdc + gdh
+    # Parámetros de degradación reales
+    st.sidebar.subheader("Parámetros de Daño del Grano")
+    gdc = st.sidebar.slider("GDC - Daño Térmico (%)", 0.0, 100.0, 25.0, 0.1)
+    gdh = st.sidebar.slider("GDH - Daño por Hongos (%)", 0.0, 50.0, 10.0, 0.1)
+    gdt = gdc + gdh
 
-# Mostrar GDT calculado
-st.sidebar.info(f"""
+    # Mostrar GDT calculado
+    st.sidebar.info(f"""
 **GDT - Daño Total: {gdt:.1f}%**
 - GDC: {gdc:.1f}%
 - GDH: {gdh:.1f}%
 """)
 
-# Cargar modelos usando el servicio
-acidez_model = ModelService.load_acidez_model()
-proteina_model = ModelService.load_proteina_model()
-
-# Calcular métricas usando los servicios
-acidez_actual = ModelService.predict_acidez(gdc, gdh, acidez_model)
-proteina_actual = ModelService.predict_proteina(gdt, proteina_model)
-impacto_productos = Calculations.calcular_impacto_productos(gdt)
-
-# ===== SECCIÓN PRINCIPAL: CALCULADORA Y RESULTADOS =====
-st.markdown("---")
-st.header("📊 Calculadora de Degradación y Resultados")
-
-# Métricas principales en tarjetas usando componentes
-col1, col2, col3, col4 = st.columns(4)
-
-with col1:
-    MetricsDisplay.display_gdt_metric(gdt)
-
-with col2:
-    MetricsDisplay.display_calidad_remanente_metric(gdt)
-
-with col3:
-    MetricsDisplay.display_acidez_metric(acidez_actual)
-
-with col4:
-    MetricsDisplay.display_proteina_metric(proteina_actual)
-
-# Resumen textual de resultados usando componentes
-st.subheader("📋 Resumen de Resultados")
-MetricsDisplay.display_quality_summary(gdt, gdc, gdh, acidez_actual, proteina_actual)
-
-# ===== GRÁFICOS DE EVOLUCIÓN =====
-st.markdown("---")
-st.header("📈 Análisis de Evolución Temporal")
-
-# Parámetros de simulación
-col1, col2 = st.columns(2)
-temperatura_alm = 25
-humedad_alm = 13
-
-# Valores iniciales
-gdc_inicial = 5.0
-gdh_inicial = 2.0
-
-# Crear datos para el gráfico
-gdt_range = np.linspace(0, 100, 50)
-acidez_range = [ModelService.predict_acidez(gdt_val * 0.7, gdt_val * 0.3, acidez_model) for gdt_val in gdt_range]
-proteina_range = [ModelService.predict_proteina(gdt_val, proteina_model) for gdt_val in gdt_range]
-
-# Gráfico de evolución
-fig_evolucion = go.Figure()
-
-# Acidez
-fig_evolucion.add_trace(go.Scatter(
-    x=gdt_range,
-    y=acidez_range,
-    mode='lines',
-    name='Acidez (mg KOH/g)',
-    line=dict(color='#FF6B6B', width=3),
-    yaxis='y'
-))
-
-# Proteína
-fig_evolucion.add_trace(go.Scatter(
-    x=gdt_range,
-    y=proteina_range,
-    mode='lines',
-    name='Proteína Soluble (%)',
-    line=dict(color='#4ECDC4', width=3),
-    yaxis='y2'
-))
-
-# Línea vertical para el promedio de GDT de la empresa
-fig_evolucion.add_vline(x=38.16, line_dash="dash", line_color="purple", line_width=2,
-                        annotation_text="Promedio GDT (38.16%)", 
-                        annotation_position="top right",
-                        annotation=dict(font=dict(color="purple", size=12)))
-
-fig_evolucion.update_layout(
-    title="Evolución de Acidez y Proteína vs GDT",
-    xaxis_title="GDT - Daño Total (%)",
-    yaxis=dict(title="Acidez (mg KOH/g)", side="left"),
-    yaxis2=dict(title="Proteína Soluble (%)", side="right", overlaying="y"),
-    height=500,
-    showlegend=True,
-    plot_bgcolor='white',
-    paper_bgcolor='white'
-)
-
-st.plotly_chart(fig_evolucion, use_container_width=True)
-
-# Simular evolución temporal usando utilidades
-tiempos, gdc_evol, gdh_evol, gdt_evol = Calculations.simular_evolucion_temporal(
-    temperatura_alm, humedad_alm, gdc_inicial, gdh_inicial, 36
-)
-
-# Calcular acidez y proteína en cada punto
-acidez_evol = [ModelService.predict_acidez(gdc, gdh, acidez_model) for gdc, gdh in zip(gdc_evol, gdh_evol)]
-proteina_evol = [ModelService.predict_proteina(gdt, proteina_model) for gdt in gdt_evol]
-
-# Gráfico de la ecuación base (sin ajustes)
-ecuacion_info = Calculations.obtener_ecuacion_base()
-tiempos_base = np.linspace(7, 36, 100)  # Rango de 7 a 36 meses
-ecuacion_base = [ecuacion_info['coeficientes'][0] * t**2 + ecuacion_info['coeficientes'][1] * t + ecuacion_info['coeficientes'][2] for t in tiempos_base]
-
-fig_ecuacion_base = go.Figure()
-
-fig_ecuacion_base.add_trace(go.Scatter(
-    x=tiempos_base,
-    y=ecuacion_base,
-    mode='lines',
-    name='Ecuación Base',
-    line=dict(color='#1A494C', width=3, dash='dash'),
-    hovertemplate='Tiempo: %{x:.1f} meses<br>Daño: %{y:.2f}%<extra></extra>'
-))
-
-# Línea horizontal para el promedio de GDT de la empresa
-fig_ecuacion_base.add_hline(y=38.16, line_dash="dash", line_color="purple", line_width=2,
-                            annotation_text="Promedio GDT (38.16%)", 
-                            annotation_position="right",
-                            annotation=dict(font=dict(color="purple", size=12)))
-
-fig_ecuacion_base.update_layout(
-    title="Ecuación Base del Daño del Grano (7-36 meses)",
-    xaxis_title="Tiempo (meses)",
-    yaxis_title="Daño del Grano (%)",
-    xaxis=dict(range=[7, 36]),  # Forzar rango de 7 a 36
-    height=400,
-    showlegend=True,
-    plot_bgcolor='white',
-    paper_bgcolor='white'
-)
-
-st.plotly_chart(fig_ecuacion_base, use_container_width=True)
-
-# Gráfico de evolución de acidez y proteína en el tiempo
-fig_calidad_temporal = go.Figure()
-
-# Acidez
-fig_calidad_temporal.add_trace(go.Scatter(
-    x=tiempos,
-    y=acidez_evol,
-    mode='lines+markers',
-    name='Acidez (mg KOH/g)',
-    line=dict(color='#FF6B6B', width=3),
-    yaxis='y'
-))
-
-# Proteína
-fig_calidad_temporal.add_trace(go.Scatter(
-    x=tiempos,
-    y=proteina_evol,
-    mode='lines+markers',
-    name='Proteína Soluble (%)',
-    line=dict(color='#4ECDC4', width=3),
-    yaxis='y2'
-))
-
-# Líneas de referencia
-fig_calidad_temporal.add_hline(y=1.0, line_dash="dash", line_color="orange", 
-                              annotation_text="Límite Acidez", yref="y")
-
-fig_calidad_temporal.update_layout(
-    title="Evolución de Calidad del Grano (7-36 meses)",
-    xaxis_title="Tiempo (meses)",
-    yaxis=dict(title="Acidez (mg KOH/g)", side="left"),
-    yaxis2=dict(title="Proteína Soluble (%)", side="right", overlaying="y"),
-    xaxis=dict(range=[7, 36]),  # Forzar rango de 7 a 36
-    height=500,
-    showlegend=True,
-    plot_bgcolor='white',
-    paper_bgcolor='white'
-)
-
-st.plotly_chart(fig_calidad_temporal, use_container_width=True)
-
-# ===== RECOMENDACIONES ESPECÍFICAS =====
-st.subheader("💡 Insights")
-
-st.info(f"""
+    # Condiciones de almacenamiento para la simulación temporal
+    st.sidebar.subheader("Condiciones de Almacenamiento")
+    temperatura_alm = st.sidebar.slider("Temperatura (°C)", 10.0, 40.0, 25.0, 0.5)
+    humedad_alm = st.sidebar.slider("Humedad (%)", 5.0, 25.0, 13.0, 0.5)
+
+    # Versiones de modelo y datos: entradas de las secciones memorizadas
+    version_modelo = ModelService.get_acidez_model_version()
+    version_datos = DataService.get_data_version()
+
+    # Cada sección declara sus entradas y solo se recalcula en el rerun si alguna cambió
+    @seccion_memorizada
+    def calcular_resultados(gdc, gdh, version_modelo, version_datos):
+        """Acidez, proteína e impacto en productos para el daño del sidebar
+
+        Compartido entre sesiones (ResultCache): los sliders se mueven en pasos de 0.1,
+        así que un valor ya visitado por cualquier usuario no se vuelve a calcular.
+        """
+        gdc, gdh = ResultCache.cuantizar(gdc, 0.1), ResultCache.cuantizar(gdh, 0.1)
+
+        def calcular():
+            gdt = gdc + gdh
+            return (
+                ModelService.predict_acidez(gdc, gdh, ModelService.load_acidez_model()),
+                ModelService.predict_proteina(gdt, ModelService.load_proteina_model()),
+                Calculations.calcular_impacto_productos(gdt),
+            )
+
+        return ResultCache.obtener(
+            "calculadora_principal", (gdc, gdh), (version_modelo, version_datos), calcular,
+            huella=lambda: ModelService.huella_acidez(PROTEINA_DATA_FILE)
+        )
+
+
+    # Figuras que no dependen del sidebar: se serializan una vez por proceso (FigureCache)
+    def figura_evolucion_gdt():
+        """Acidez esperada (con bandas de percentiles) y proteína vs GDT"""
+        # Acidez esperada sobre la proporción GDC/GDH observada en los lotes
+        gdt_range = np.linspace(0, 100, 50)
+        curva_acidez = ModelService.curva_acidez_marginal(version_modelo, version_datos, gdt_range)
+        proteina_range = ModelService.predict_proteina_batch(gdt_range, ModelService.load_proteina_model())
+
+        fig_evolucion = go.Figure()
+
+        # Bandas de percentiles de acidez (P10-P90 y P25-P75)
+        for bajo, alto, opacidad in (("p10", "p90", 0.15), ("p25", "p75", 0.3)):
+            fig_evolucion.add_trace(go.Scatter(
+                x=gdt_range, y=curva_acidez[alto], mode='lines', line=dict(width=0),
+                showlegend=False, hoverinfo='skip', yaxis='y'
+            ))
+            fig_evolucion.add_trace(go.Scatter(
+                x=gdt_range, y=curva_acidez[bajo], mode='lines', line=dict(width=0),
+                fill='tonexty', fillcolor=f'rgba(255,107,107,{opacidad})',
+                name=f'Acidez {bajo.upper()}-{alto.upper()}', hoverinfo='skip', yaxis='y'
+            ))
+
+        # Acidez esperada
+        fig_evolucion.add_trace(go.Scatter(
+            x=gdt_range,
+            y=curva_acidez["media"],
+            mode='lines',
+            name='Acidez esperada (mg KOH/g)',
+            line=dict(color='#FF6B6B', width=3),
+            yaxis='y'
+        ))
+
+        # Proteína
+        fig_evolucion.add_trace(go.Scatter(
+            x=gdt_range,
+            y=proteina_range,
+            mode='lines',
+            name='Proteína Soluble (%)',
+            line=dict(color='#4ECDC4', width=3),
+            yaxis='y2'
+        ))
+
+        # Línea vertical para el promedio de GDT de la empresa
+        fig_evolucion.add_vline(x=38.16, line_dash="dash", line_color="purple", line_width=2,
+                                annotation_text="Promedio GDT (38.16%)", 
+                                annotation_position="top right",
+                                annotation=dict(font=dict(color="purple", size=12)))
+
+        fig_evolucion.update_layout(
+            title="Evolución de Acidez y Proteína vs GDT",
+            xaxis_title="GDT - Daño Total (%)",
+            yaxis=dict(title="Acidez (mg KOH/g)", side="left"),
+            yaxis2=dict(title="Proteína Soluble (%)", side="right", overlaying="y"),
+            height=500,
+            showlegend=True,
+            plot_bgcolor='white',
+            paper_bgcolor='white'
+        )
+        return fig_evolucion
+
+
+    def figura_ecuacion_base():
+        """Ecuación base del daño (sin ajustes)"""
+        ecuacion_info = Calculations.obtener_ecuacion_base()
+        tiempos_base = np.linspace(7, 36, 100)  # Rango de 7 a 36 meses
+        a, b, c = ecuacion_info['coeficientes']
+        ecuacion_base = a * tiempos_base**2 + b * tiempos_base + c
+
+        fig_ecuacion_base = go.Figure()
+
+        fig_ecuacion_base.add_trace(go.Scatter(
+            x=tiempos_base,
+            y=ecuacion_base,
+            mode='lines',
+            name='Ecuación Base',
+            line=dict(color='#1A494C', width=3, dash='dash'),
+            hovertemplate='Tiempo: %{x:.1f} meses<br>Daño: %{y:.2f}%<extra></extra>'
+        ))
+
+        # Línea horizontal para el promedio de GDT de la empresa
+        fig_ecuacion_base.add_hline(y=38.16, line_dash="dash", line_color="purple", line_width=2,
+                                    annotation_text="Promedio GDT (38.16%)", 
+                                    annotation_position="right",
+                                    annotation=dict(font=dict(color="purple", size=12)))
+
+        fig_ecuacion_base.update_layout(
+            title="Ecuación Base del Daño del Grano (7-36 meses)",
+            xaxis_title="Tiempo (meses)",
+            yaxis_title="Daño del Grano (%)",
+            xaxis=dict(range=[7, 36]),  # Forzar rango de 7 a 36
+            height=400,
+            showlegend=True,
+            plot_bgcolor='white',
+            paper_bgcolor='white'
+        )
+        return fig_ecuacion_base
+
+
+    @seccion_memorizada
+    def figura_calidad_temporal(temperatura_alm, humedad_alm, gdc_inicial, gdh_inicial, version_modelo, version_datos):
+        """Acidez y proteína del lote simulado a 36 meses; depende solo de las condiciones de almacenamiento"""
+        # Simular evolución temporal (un escenario, matrices escenario × tiempo)
+        tiempos, gdc_evol, gdh_evol, gdt_evol = Calculations.simular_evolucion_lote(
+            temperatura_alm, humedad_alm, gdc_inicial, gdh_inicial, 36
+        )
+
+        # Calcular acidez y proteína en todos los puntos con una sola evaluación por modelo
+        acidez_evol = ModelService.predict_acidez_batch(gdc_evol[0], gdh_evol[0], ModelService.load_acidez_model())
+        proteina_evol = ModelService.predict_proteina_batch(gdt_evol[0], ModelService.load_proteina_model())
+
+        fig_calidad_temporal = go.Figure()
+
+        # Acidez
+        fig_calidad_temporal.add_trace(go.Scatter(
+            x=tiempos,
+            y=acidez_evol,
+            mode='lines+markers',
+            name='Acidez (mg KOH/g)',
+            line=dict(color='#FF6B6B', width=3),
+            yaxis='y'
+        ))
+
+        # Proteína
+        fig_calidad_temporal.add_trace(go.Scatter(
+            x=tiempos,
+            y=proteina_evol,
+            mode='lines+markers',
+            name='Proteína Soluble (%)',
+            line=dict(color='#4ECDC4', width=3),
+            yaxis='y2'
+        ))
+
+        # Líneas de referencia
+        fig_calidad_temporal.add_hline(y=1.0, line_dash="dash", line_color="orange", 
+                                      annotation_text="Límite Acidez", yref="y")
+
+        fig_calidad_temporal.update_layout(
+            title="Evolución de Calidad del Grano (7-36 meses)",
+            xaxis_title="Tiempo (meses)",
+            yaxis=dict(title="Acidez (mg KOH/g)", side="left"),
+            yaxis2=dict(title="Proteína Soluble (%)", side="right", overlaying="y"),
+            xaxis=dict(range=[7, 36]),  # Forzar rango de 7 a 36
+            height=500,
+            showlegend=True,
+            plot_bgcolor='white',
+            paper_bgcolor='white'
+        )
+        # Se guarda ya serializada: los reruns que la reutilizan no vuelven a convertirla a JSON
+        return FigureCache.serializar(fig_calidad_temporal)
+
+
+    # Calcular métricas (sección dependiente de GDC y GDH)
+    acidez_actual, proteina_actual, impacto_productos = calcular_resultados(gdc, gdh, version_modelo, version_datos)
+
+    # ===== SECCIÓN PRINCIPAL: CALCULADORA Y RESULTADOS =====
+    st.markdown("---")
+    st.header("📊 Calculadora de Degradación y Resultados")
+
+    # Métricas principales en tarjetas usando componentes
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        MetricsDisplay.display_gdt_metric(gdt)
+
+    with col2:
+        MetricsDisplay.display_calidad_remanente_metric(gdt)
+
+    with col3:
+        MetricsDisplay.display_acidez_metric(acidez_actual)
+
+    with col4:
+        MetricsDisplay.display_proteina_metric(proteina_actual)
+
+    # Resumen textual de resultados usando componentes
+    st.subheader("📋 Resumen de Resultados")
+    MetricsDisplay.display_quality_summary(gdt, gdc, gdh, acidez_actual, proteina_actual)
+
+    # ===== GRÁFICOS DE EVOLUCIÓN =====
+    st.markdown("---")
+    st.header("📈 Análisis de Evolución Temporal")
+
+    # Valores iniciales
+    gdc_inicial = 5.0
+    gdh_inicial = 2.0
+
+    # El punto del usuario es una superposición de la sesión sobre la figura compartida
+    FigureCache.mostrar(
+        FigureCache.obtener("evolucion_gdt", (version_modelo, version_datos), figura_evolucion_gdt),
+        superposiciones=[go.Scatter(
+            x=[gdt], y=[acidez_actual], mode='markers', name='Valores ingresados',
+            marker=dict(color='white', size=12, line=dict(color='#FF6B6B', width=3)), yaxis='y'
+        )]
+    )
+    st.caption("La acidez esperada y sus bandas de percentiles promedian la predicción sobre la proporción GDC/GDH observada en los lotes históricos, en lugar de suponer una división fija 70/30.")
+
+    FigureCache.mostrar(FigureCache.obtener("ecuacion_base", None, figura_ecuacion_base))
+
+    FigureCache.mostrar(
+        figura_calidad_temporal(temperatura_alm, humedad_alm, gdc_inicial, gdh_inicial, version_modelo, version_datos)
+    )
+
+    # ===== RIESGO DE ALMACENAMIENTO (MONTE CARLO) =====
+    with st.expander("🎲 Riesgo de Almacenamiento (Monte Carlo)"):
+        st.caption("Los silos no siguen una sola trayectoria: se muestrean condiciones y daño inicial por trayectoria y se estima la probabilidad mensual de salir de especificación.")
+        with st.form("form_monte_carlo"):
+            col_mc1, col_mc2, col_mc3 = st.columns(3)
+            with col_mc1:
+                n_trayectorias = st.selectbox("Trayectorias", [10_000, 50_000, 100_000], index=2)
+            with col_mc2:
+                temp_media = st.number_input("Temperatura media (°C)", 0.0, 50.0, CONDICIONES_ALMACENAMIENTO["temperatura"][0], 0.5)
+                temp_desv = st.number_input("Desviación temperatura (°C)", 0.0, 15.0, CONDICIONES_ALMACENAMIENTO["temperatura"][1], 0.5)
+            with col_mc3:
+                hum_media = st.number_input("Humedad media (%)", 0.0, 100.0, CONDICIONES_ALMACENAMIENTO["humedad"][0], 0.5)
+                hum_desv = st.number_input("Desviación humedad (%)", 0.0, 20.0, CONDICIONES_ALMACENAMIENTO["humedad"][1], 0.5)
+            simular_mc = st.form_submit_button("Simular riesgo")
+
+        if simular_mc:
+            with st.spinner("Simulando trayectorias..."):
+                riesgo = RiskService.calcular_riesgo(
+                    version_modelo, n_trayectorias,
+                    {"temperatura": (temp_media, temp_desv), "humedad": (hum_media, hum_desv)}
+                )
+
+            fig_riesgo = go.Figure()
+            fig_riesgo.add_trace(go.Scatter(
+                x=riesgo["mes"], y=riesgo["prob_acidez_excede"] * 100,
+                mode='lines+markers', name=f'P(Acidez > {ACIDEZ_MAXIMA})',
+                line=dict(color='#FF6B6B', width=3)
+            ))
+            fig_riesgo.add_trace(go.Scatter(
+                x=riesgo["mes"], y=riesgo["prob_proteina_bajo"] * 100,
+                mode='lines+markers', name=f'P(Proteína < {PROTEINA_MINIMA}%)',
+                line=dict(color='#4ECDC4', width=3)
+            ))
+            fig_riesgo.update_layout(
+                title=f"Probabilidad de Salir de Especificación ({n_trayectorias:,} trayectorias)",
+                xaxis_title="Tiempo (meses)",
+                yaxis=dict(title="Probabilidad (%)", range=[0, 105]),
+                height=450,
+                plot_bgcolor='white',
+                paper_bgcolor='white'
+            )
+            FigureCache.mostrar_figura(fig_riesgo)
+
+    # ===== OPTIMIZADOR DE CONDICIONES =====
+    with st.expander("🎯 Optimizador de Condiciones de Almacenamiento"):
+        st.caption(f"Busca los setpoints de temperatura y humedad de menor costo (acondicionamiento + pérdida de calidad) que mantienen la acidez bajo el límite y la proteína soluble sobre el mínimo ({PROTEINA_MINIMA:g}%) durante el horizonte de almacenamiento.")
+        with st.form("form_optimizador"):
+            col_o1, col_o2, col_o3 = st.columns(3)
+            with col_o1:
+                opt_gdc_ini = st.number_input("GDC inicial del lote (%)", 0.0, 50.0, 5.0, 0.5)
+                opt_gdh_ini = st.number_input("GDH inicial del lote (%)", 0.0, 30.0, 2.0, 0.5)
+            with col_o2:
+                opt_meses = st.number_input("Horizonte de almacenamiento (meses)", 1, 36, 12, 1)
+                opt_acidez = st.number_input("Acidez máxima (mg KOH/g)", 0.1, 10.0, ACIDEZ_MAXIMA, 0.1)
+            with col_o3:
+                opt_enfriamiento = st.number_input("Enfriamiento (USD/ton·°C·mes)", 0.0, 10.0, COSTOS_ALMACENAMIENTO["enfriamiento"], 0.05)
+                opt_secado = st.number_input("Secado (USD/ton por punto de humedad)", 0.0, 20.0, COSTOS_ALMACENAMIENTO["secado"], 0.1)
+            optimizar = st.form_submit_button("Optimizar condiciones")
+
+        if optimizar:
+            with st.spinner("Optimizando setpoints..."):
+                optimo = OptimizationService.optimizar(
+                    version_modelo, opt_gdc_ini, opt_gdh_ini, int(opt_meses),
+                    opt_acidez, PROTEINA_MINIMA, {"enfriamiento": opt_enfriamiento, "secado": opt_secado}
+                )
+
+            if optimo["factible"]:
+                st.success(f"✅ Setpoints óptimos: **{optimo['temperatura']:.2f} °C** y **{optimo['humedad']:.2f}%** de humedad.")
+            else:
+                st.error(f"🚨 Ninguna condición mantiene la acidez bajo {opt_acidez:g} mg KOH/g y la proteína soluble sobre {PROTEINA_MINIMA:g}% durante {int(opt_meses)} meses. Se muestra la de menor exceso.")
+
+            col_r1, col_r2, col_r3, col_r4 = st.columns(4)
+            with col_r1:
+                st.metric("Costo Total", f"${optimo['costo_total']:,.1f}/ton")
+            with col_r2:
+                st.metric("Acondicionamiento", f"${optimo['costo_acondicionamiento']:,.1f}/ton")
+            with col_r3:
+                st.metric("Acidez Máxima Prevista", f"{optimo['acidez_maxima_prevista']:.2f} mg KOH/g")
+            with col_r4:
+                meses_maximos = optimo["meses_maximos"]
+                st.metric("Almacenamiento Máximo", "Sin límite" if np.isinf(meses_maximos) else f"{meses_maximos:.1f} meses")
+
+            malla = optimo["malla"]
+            costo_malla = malla.pivot(index="temperatura", columns="humedad", values="costo")
+            factible_malla = malla.pivot(index="temperatura", columns="humedad", values="violacion") == 0
+            fig_opt = go.Figure(go.Heatmap(
+                x=costo_malla.columns, y=costo_malla.index, z=costo_malla.where(factible_malla).values,
+                colorscale="Viridis_r", colorbar=dict(title="USD/ton"),
+                hovertemplate='Humedad: %{x:.0f}%<br>Temperatura: %{y:.0f} °C<br>Costo: $%{z:.1f}/ton<extra></extra>'
+            ))
+            fig_opt.add_trace(go.Scatter(
+                x=[optimo["humedad"]], y=[optimo["temperatura"]], mode='markers', name='Óptimo',
+                marker=dict(symbol='star', color='red', size=16, line=dict(color='white', width=1))
+            ))
+            fig_opt.update_layout(
+                title="Costo de las Condiciones que Cumplen el Límite (celdas vacías: no cumplen)",
+                xaxis_title="Humedad (%)",
+                yaxis_title="Temperatura (°C)",
+                height=450,
+                plot_bgcolor='#F0F0F0',
+                paper_bgcolor='white'
+            )
+            FigureCache.mostrar_figura(fig_opt)
+            st.caption(f"Malla gruesa de {len(malla)} puntos y refinamiento local: {optimo['evaluaciones']:,} condiciones evaluadas.")
+
+    # ===== ANÁLISIS DE SENSIBILIDAD (SOBOL) =====
+    with st.expander("🔍 Análisis de Sensibilidad Global (Índices de Sobol)"):
+        st.caption("Fracción de la varianza de la acidez y la proteína explicada por cada condición: el índice de primer orden mide el efecto individual y el total incluye las interacciones.")
+        # Formulario: el cuerpo del expander corre aunque esté cerrado, así que el cálculo espera al botón
+        with st.form("form_sobol"):
+            rangos = {}
+            col_s1, col_s2 = st.columns(2)
+            for i, (variable, (minimo, maximo)) in enumerate(RANGOS_SENSIBILIDAD.items()):
+                with (col_s1 if i % 2 == 0 else col_s2):
+                    rangos[variable] = st.slider(
+                        VARIABLES_SENSIBILIDAD[variable], 0.0, max(maximo * 2, 50.0), (minimo, maximo), 0.5,
+                        key=f"rango_{variable}"
+                    )
+            calcular_sobol = st.form_submit_button("Calcular índices")
+
+        @seccion_memorizada
+        def figuras_sobol(version_modelo, rangos):
+            """Barras de índices de Sobol por salida; se recalculan solo al mover los rangos"""
+            indices = SensitivityService.calcular_indices(version_modelo, dict(rangos))
+            figuras = []
+            for salida in ("Acidez", "Proteína"):
+                datos = indices[indices["salida"] == salida]
+                fig_sobol = go.Figure()
+                fig_sobol.add_trace(go.Bar(
+                    x=datos["variable"], y=datos["primer_orden"], name='Primer orden (S1)',
+                    marker_color='#1A494C'
+                ))
+                fig_sobol.add_trace(go.Bar(
+                    x=datos["variable"], y=datos["total"], name='Total (ST)',
+                    marker_color='#94AF92'
+                ))
+                fig_sobol.update_layout(
+                    title=f"Sensibilidad de {salida}",
+                    yaxis=dict(title="Índice", range=[0, 1.05]),
+                    barmode='group',
+                    height=400,
+                    plot_bgcolor='white',
+                    paper_bgcolor='white'
+                )
+                figuras.append(FigureCache.serializar(fig_sobol))
+            return figuras
+
+        if calcular_sobol:
+            try:
+                with st.spinner("Calculando índices de Sobol..."):
+                    figuras = figuras_sobol(version_modelo, tuple(rangos.items()))
+            except ValueError as e:
+                st.warning(f"⚠️ {e}")
+            else:
+                for col, figura in zip(st.columns(2), figuras):
+                    with col:
+                        FigureCache.mostrar(figura)
+
+    # ===== RECOMENDACIONES ESPECÍFICAS =====
+    st.subheader("💡 Insights")
+
+    st.info(f"""
     **🔬 Análisis de Datos y Modelado:**
     
     **📊 Limitaciones del Modelo:**
@@ -254,24 +476,24 @@ st.info(f"""
 
     """)
 
-# Recomendaciones por nivel de GDT
-if gdt < 15:
-    st.success("**Antes de cualquier acción basada en el modelo se debe mejorar/controlar y garantizar el manejo de la soya, luego tomar acciones (agregar efectos externos en pos del negocio)**")
+    # Recomendaciones por nivel de GDT
+    if gdt < 15:
+        st.success("**Antes de cualquier acción basada en el modelo se debe mejorar/controlar y garantizar el manejo de la soya, luego tomar acciones (agregar efectos externos en pos del negocio)**")
 
-    st.success("**✅ Mantener condiciones actuales** - Los granos están en excelente estado.")
+        st.success("**✅ Mantener condiciones actuales** - Los granos están en excelente estado.")
 
-elif gdt < 35:
-    st.markdown("**Antes de cualquier acción basada en el modelo se debe mejorar/controlar y garantizar el manejo de la soya, luego tomar acciones (agregar efectos externos en pos del negocio)**")
+    elif gdt < 35:
+        st.markdown("**Antes de cualquier acción basada en el modelo se debe mejorar/controlar y garantizar el manejo de la soya, luego tomar acciones (agregar efectos externos en pos del negocio)**")
 
-    st.success("**⚠️ Implementar mejoras inmediatas** - Considerar rotación de inventario.")
-else:
-    st.success("**Antes de cualquier acción basada en el modelo se debe mejorar/controlar y garantizar el manejo de la soya, luego tomar acciones (agregar efectos externos en pos del negocio)**")
+        st.success("**⚠️ Implementar mejoras inmediatas** - Considerar rotación de inventario.")
+    else:
+        st.success("**Antes de cualquier acción basada en el modelo se debe mejorar/controlar y garantizar el manejo de la soya, luego tomar acciones (agregar efectos externos en pos del negocio)**")
 
-    st.error("**🚨 Acción urgente requerida** - Tener cuidado, el contenido nutricional de la muestra de granos no cumple los criterios mínimos para una buena dieta.")
+        st.error("**🚨 Acción urgente requerida** - Tener cuidado, el contenido nutricional de la muestra de granos no cumple los criterios mínimos para una buena dieta.")
 
-# ===== INFORMACIÓN TÉCNICA =====
-with st.expander("🔬 Información Técnica de los Modelos"):
-    st.markdown("""
+    # ===== INFORMACIÓN TÉCNICA =====
+    with st.expander("🔬 Información Técnica de los Modelos"):
+        st.markdown("""
     **Modelos Utilizados:**
     
     **🧪 Modelo de Acidez:**
@@ -292,6 +514,6 @@ with st.expander("🔬 Información Técnica de los Modelos"):
     - **> 35%:** Calidad crítica
     """) 
 
-# Footer
-st.markdown("---")
-st.markdown("*Soya Insights - Okuo-Analytics - Juan David Rincón *") 
\ No newline at end of file
+    # Footer
+    st.markdown("---")
+    st.markdown("*Soya Insights - Okuo-Analytics - Juan David Rincón *") 
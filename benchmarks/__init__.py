@@ -0,0 +1 @@
+"""Benchmarks de las rutas críticas de la aplicación (``python -m benchmarks.suite``)"""
@@ -0,0 +1,237 @@
+"""Throughput y latencia de la API de predicción (``src.services.prediction_api``)
+
+Uso: python -m benchmarks.api --filas 100,1000,10000 --clientes 1,4 --duracion 10 --salida benchmarks/api.json
+
+Arranca la API en un puerto libre (o usa ``--url`` de una ya levantada) y, por
+cada combinación de endpoint, formato (JSON, CSV, Arrow), filas por petición y
+clientes simultáneos, envía lotes sintéticos por conexiones persistentes
+durante ``--duracion`` segundos. Reporta peticiones y filas por segundo y los
+percentiles p50/p95/p99 de la latencia (de enviar el cuerpo a leer la respuesta
+completa). Los clientes corren en la misma máquina: con pocos núcleos compiten
+con el servidor y los números son una cota inferior. ``--comparar`` muestra la
+diferencia frente a una corrida anterior.
+"""
+import argparse
+import http.client
+import io
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from src.utils.calculations import Calculations
+
+from .carga import _percentiles, _puerto_libre
+from .suite import RAIZ, entorno
+
+ENDPOINTS = ("acidez", "proteina", "calidad", "simulacion")
+FORMATOS = {
+    "json": "application/json",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+MESES_SIMULACION = 12
+PASOS_SIMULACION = len(Calculations.tiempos_simulacion(MESES_SIMULACION))  # Filas de trayectoria por escenario
+
+
+def _lote(endpoint, filas, semilla):
+    """DataFrame sintético con las columnas que espera ``endpoint``
+
+    En simulación ``filas`` cuenta las filas de respuesta: se envían ``filas / PASOS_SIMULACION`` escenarios.
+    """
+    rng = np.random.default_rng(semilla)
+    if endpoint == "simulacion":
+        filas = max(1, filas // PASOS_SIMULACION)
+    datos = {"gdc": rng.uniform(0, 40, filas).round(1), "gdh": rng.uniform(0, 20, filas).round(1)}
+    if endpoint == "simulacion":
+        datos["temperatura"] = rng.uniform(10, 40, filas).round(1)
+        datos["humedad"] = rng.uniform(40, 90, filas).round(1)
+    return pd.DataFrame(datos)
+
+
+def _serializar(df, formato):
+    if formato == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    if formato == "arrow":
+        import pyarrow as pa
+
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+        buffer = io.BytesIO()
+        with pa.ipc.new_stream(buffer, tabla.schema) as escritor:
+            escritor.write_table(tabla)
+        return buffer.getvalue()
+    return df.to_json(orient="records").encode("utf-8")
+
+
+def _cliente(host, puerto, ruta, cuerpo, tipo, hasta, latencias, errores):
+    """Enviar ``cuerpo`` en bucle por una conexión persistente hasta el instante ``hasta``"""
+    conexion = http.client.HTTPConnection(host, puerto, timeout=120)
+    cabeceras = {"Content-Type": tipo, "Accept": tipo}
+    try:
+        while time.perf_counter() < hasta:
+            inicio = time.perf_counter()
+            try:
+                conexion.request("POST", ruta, cuerpo, cabeceras)
+                respuesta = conexion.getresponse()
+                respuesta.read()
+            except (OSError, http.client.HTTPException):
+                errores.append(1)
+                conexion.close()
+                continue
+            if respuesta.status != 200:
+                errores.append(1)
+                continue
+            latencias.append(time.perf_counter() - inicio)
+    finally:
+        conexion.close()
+
+
+def _caso(base, endpoint, formato, filas, clientes, duracion, semilla):
+    host, puerto = urlsplit(base).hostname, urlsplit(base).port
+    cuerpo = _serializar(_lote(endpoint, filas, semilla), formato)
+    ruta = f"/v1/{endpoint}" + (f"?meses={MESES_SIMULACION}" if endpoint == "simulacion" else "")
+    # Una petición previa calienta caches y la conexión del servidor
+    _cliente(host, puerto, ruta, cuerpo, FORMATOS[formato], time.perf_counter(), [], [])
+
+    latencias, errores = [], []
+    hasta = time.perf_counter() + duracion
+    hilos = [
+        threading.Thread(target=_cliente, args=(host, puerto, ruta, cuerpo, FORMATOS[formato], hasta, latencias, errores))
+        for _ in range(clientes)
+    ]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    transcurrido = time.perf_counter() - inicio
+    return {
+        "endpoint": endpoint,
+        "formato": formato,
+        "filas": filas,
+        "clientes": clientes,
+        "peticiones": len(latencias),
+        "errores": len(errores),
+        "bytes_peticion": len(cuerpo),
+        "peticiones_por_s": round(len(latencias) / transcurrido, 2),
+        "filas_por_s": round(len(latencias) * filas / transcurrido, 1),
+        "latencia": _percentiles(latencias),
+    }
+
+
+def _arrancar_api(puerto, espera=120):
+    """API en segundo plano; retorna el proceso cuando responde ``/salud``"""
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "src.services.prediction_api", "--host", "127.0.0.1", "--puerto", str(puerto)],
+        cwd=RAIZ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    limite = time.time() + espera
+    while time.time() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"La API terminó con código {proceso.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/salud", timeout=2) as r:
+                if r.status == 200:
+                    return proceso
+        except OSError:
+            time.sleep(0.5)
+    proceso.terminate()
+    raise RuntimeError(f"La API no respondió en {espera} s")
+
+
+def ejecutar(base, endpoints, formatos, filas, clientes, duracion, semilla=0):
+    """Correr todas las combinaciones; retorna el documento JSON de resultados"""
+    casos = []
+    for endpoint, formato, n, c in itertools.product(endpoints, formatos, filas, clientes):
+        caso = _caso(base, endpoint, formato, n, c, duracion, semilla)
+        casos.append(caso)
+        print(f"{endpoint:>10} {formato:>5} {n:>7} filas × {c:>2} clientes: "
+              f"{caso['peticiones_por_s']:>8.1f} pet/s, {caso['filas_por_s']:>11,.0f} filas/s, "
+              f"p50 {caso['latencia']['p50_ms']} ms, p99 {caso['latencia']['p99_ms']} ms"
+              + (f", {caso['errores']} errores" if caso["errores"] else ""), file=sys.stderr, flush=True)
+    return {
+        "version": 1,
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "entorno": entorno(),
+        "parametros": {"duracion_s": duracion, "semilla": semilla, "meses_simulacion": MESES_SIMULACION},
+        "casos": casos,
+    }
+
+
+def comparar(actual, previa):
+    """Tabla de diferencias por caso (filas/s y p99)"""
+    llave = lambda c: (c["endpoint"], c["formato"], c["filas"], c["clientes"])  # noqa: E731
+    anteriores = {llave(c): c for c in previa["casos"]}
+    lineas = [f"{'caso':<34}  {'filas/s':>30}  {'p99 ms':>26}"]
+    for caso in actual["casos"]:
+        anterior = anteriores.get(llave(caso))
+        celdas = []
+        for ahora, antes in ((caso["filas_por_s"], anterior and anterior["filas_por_s"]),
+                             (caso["latencia"]["p99_ms"], anterior and anterior["latencia"]["p99_ms"])):
+            if ahora is None:
+                celdas.append("-")
+            elif antes:
+                celdas.append(f"{antes:,.1f} → {ahora:,.1f} {(ahora - antes) / antes:+.0%}")
+            else:
+                celdas.append(f"{ahora:,.1f}")
+        nombre = f"{caso['endpoint']}/{caso['formato']} {caso['filas']}×{caso['clientes']}"
+        lineas.append(f"{nombre:<34}  {celdas[0]:>30}  {celdas[1]:>26}")
+    return "\n".join(lineas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Throughput y latencia p99 de la API de predicción por lotes")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="Endpoints separados por coma")
+    parser.add_argument("--formatos", default=",".join(FORMATOS), help="Formatos separados por coma (json, csv, arrow)")
+    parser.add_argument("--filas", default="100,1000,10000", help="Filas por petición separadas por coma")
+    parser.add_argument("--clientes", default="1,4", help="Clientes simultáneos separados por coma")
+    parser.add_argument("--duracion", type=float, default=10.0, help="Segundos por caso")
+    parser.add_argument("--url", default=None, help="API ya levantada (p. ej. http://localhost:8000)")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", default="benchmarks/api.json", help="Archivo JSON de resultados")
+    parser.add_argument("--comparar", default=None, help="JSON de una corrida anterior")
+    args = parser.parse_args(argv)
+
+    endpoints, formatos = args.endpoints.split(","), args.formatos.split(",")
+    desconocidos = [e for e in endpoints if e not in ENDPOINTS] + [f for f in formatos if f not in FORMATOS]
+    if desconocidos:
+        print(f"Error: endpoints o formatos desconocidos: {', '.join(desconocidos)}", file=sys.stderr)
+        return 1
+    filas = [int(n) for n in args.filas.split(",")]
+    clientes = [int(c) for c in args.clientes.split(",")]
+
+    servidor = None
+    if args.url:
+        base = args.url.rstrip("/")
+    else:
+        puerto = _puerto_libre()
+        servidor = _arrancar_api(puerto)
+        base = f"http://127.0.0.1:{puerto}"
+    try:
+        resultados = ejecutar(base, endpoints, formatos, filas, clientes, args.duracion, args.semilla)
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.salida)), exist_ok=True)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    print(f"Resultados en {args.salida}", file=sys.stderr)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            print(comparar(resultados, json.load(f)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,401 @@
+"""Prueba de carga: N sesiones simultáneas contra un servidor de Streamlit local
+
+Uso: python -m benchmarks.carga --sesiones 1,5,10 --interacciones 20 --salida carga.json
+
+Arranca ``streamlit run Soya_Insights.py`` (o usa ``--url`` de un servidor ya
+levantado) y abre una conexión websocket por sesión simulada, con el mismo
+protocolo que el navegador. Cada sesión carga una página y repite interacciones
+de su guion (sliders, number_input, selectbox, radio y botones), esperando un
+tiempo de reflexión entre una y otra. Por nivel de concurrencia se reportan los
+percentiles p50/p95/p99 de la latencia del rerun (de enviar los widgets a recibir
+``script_finished``), el throughput y el crecimiento del RSS del servidor por
+sesión. ``--comparar`` muestra la diferencia frente a una corrida anterior.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+
+from .suite import PAGINAS, RAIZ, entorno
+
+# Guiones por página: (peso, tipo de widget, inicio de la etiqueta)
+GUIONES = {
+    "Soya_Insights.py": [
+        (5, "slider", "GDC - Daño Térmico (%)"),
+        (5, "slider", "GDH - Daño por Hongos (%)"),
+        (4, "slider", "Temperatura (°C)"),
+        (4, "slider", "Humedad (%)"),
+        (2, "number_input", "Temperatura media (°C)"),
+        (1, "button", "Simular riesgo"),
+        (1, "button", "Optimizar condiciones"),
+    ],
+    "pages/1_Modelo_Degradación.py": [
+        (3, "selectbox", "Seleccione la columna a analizar"),
+        (2, "number_input", "Ingrese el mes para predecir el valor de"),
+        (1, "button", "Calcular Predicción"),
+    ],
+    "pages/2_Modelo_Acidez.py": [
+        (4, "number_input", "GDC - Daño Térmico (%)"),
+        (4, "number_input", "GDH - Daño por Hongos (%)"),
+        (3, "button", "🔍 Calcular Acidez Esperada"),
+        (2, "radio", "Diagnóstico"),
+        (1, "number_input", "Límite de acidez para el contorno"),
+    ],
+    "pages/3_Modelo_Proteína_Soluble.py": [
+        (5, "slider", "Degradación del grano (%)"),
+        (1, "radio", "Distribución"),
+    ],
+    "pages/4_Vida_Útil_Almacenamiento.py": [
+        (3, "slider", "Temperatura (°C)"),
+        (3, "slider", "Humedad (%)"),
+        (3, "slider", "GDC inicial (%)"),
+        (3, "slider", "GDH inicial (%)"),
+        (1, "number_input", "Acidez máxima (mg KOH/g)"),
+        (1, "number_input", "Proteína mínima (%)"),
+    ],
+    "pages/5_Evaluacion_Lotes.py": [
+        (1, "number_input", "Acidez máxima (mg KOH/g)"),
+        (1, "number_input", "Proteína mínima (%)"),
+    ],
+}
+
+WIDGETS = {"slider", "number_input", "selectbox", "radio", "button"}
+PERCENTILES = (50, 95, 99)
+MUESTREO_RSS = 0.5  # Segundos entre lecturas del RSS del servidor
+
+
+def _nombre_pagina(ruta):
+    """Nombre de la página en la URL (``pages/2_Modelo_Acidez.py`` -> ``Modelo_Acidez``; la principal, vacío)"""
+    if ruta == PAGINAS[0]:
+        return ""
+    return re.sub(r"^[0-9]*[_ -]*", "", Path(ruta).stem)
+
+
+def _rss_mb(pid):
+    """RSS del proceso en MB (Linux, ``/proc``); None si no se puede leer"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for linea in f:
+                if linea.startswith("VmRSS:"):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class _Sesion:
+    """Una pestaña del navegador: websocket, widgets de la última ejecución y estado enviado"""
+
+    def __init__(self, url, ruta, rng):
+        self.url = url
+        self.ruta = ruta
+        self.rng = rng
+        self.pagina = _nombre_pagina(ruta)
+        self.hash_pagina = ""
+        self.widgets = []       # (tipo, proto) en orden de aparición
+        self.estados = {}       # id -> (campo de WidgetState, valor)
+        self.mensajes = {}      # hash -> ForwardMsg (mensajes grandes que el servidor envía una sola vez)
+        self.ws = None
+
+    async def conectar(self):
+        from tornado.websocket import websocket_connect
+
+        self.ws = await websocket_connect(self.url, subprotocols=["streamlit"], max_message_size=1 << 30)
+
+    def cerrar(self):
+        if self.ws is not None:
+            self.ws.close()
+
+    async def rerun(self, disparar=None):
+        """Enviar los widgets (más ``disparar``, un botón) y esperar el fin del script; retorna (segundos, errores)"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        mensaje = BackMsg()
+        cliente = mensaje.rerun_script
+        cliente.page_script_hash = self.hash_pagina
+        cliente.page_name = self.pagina
+        for id_widget, (campo, valor) in self.estados.items():
+            estado = cliente.widget_states.widgets.add()
+            estado.id = id_widget
+            if campo == "double_array_value":
+                estado.double_array_value.data.extend(valor)
+            else:
+                setattr(estado, campo, valor)
+        if disparar is not None:
+            estado = cliente.widget_states.widgets.add()
+            estado.id = disparar
+            estado.trigger_value = True
+
+        inicio = time.perf_counter()
+        await self.ws.write_message(mensaje.SerializeToString(), binary=True)
+        errores = 0
+        while True:
+            datos = await self.ws.read_message()
+            if datos is None:
+                raise ConnectionError("El servidor cerró la conexión")
+            recibido = ForwardMsg()
+            recibido.ParseFromString(datos)
+            if recibido.WhichOneof("type") == "ref_hash":
+                recibido = self.mensajes.get(recibido.ref_hash, recibido)
+            elif recibido.hash:
+                self.mensajes[recibido.hash] = recibido
+            tipo = recibido.WhichOneof("type")
+            if tipo == "new_session":
+                self.hash_pagina = recibido.new_session.page_script_hash
+                self.widgets = []
+            elif tipo == "delta" and recibido.delta.WhichOneof("type") == "new_element":
+                elemento = recibido.delta.new_element
+                clase = elemento.WhichOneof("type")
+                if clase in WIDGETS:
+                    self.widgets.append((clase, getattr(elemento, clase)))
+                elif clase == "exception":
+                    errores += 1
+            elif tipo == "script_finished":
+                if recibido.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return time.perf_counter() - inicio, errores
+
+    def _buscar(self, tipo, etiqueta):
+        for clase, proto in self.widgets:
+            # Los sliders de rango (dos valores) no forman parte de los guiones
+            if clase == tipo and proto.label.startswith(etiqueta) and not (clase == "slider" and len(proto.default) > 1):
+                return proto
+        return None
+
+    def interactuar(self):
+        """Elegir un paso del guion y fijar un valor al azar; retorna el id del botón a disparar o None"""
+        guion = GUIONES[self.ruta]
+        for _ in range(len(guion)):
+            _, tipo, etiqueta = self.rng.choices(guion, weights=[p for p, _, _ in guion])[0]
+            proto = self._buscar(tipo, etiqueta)
+            if proto is None:
+                continue  # Widget dentro de una rama que no se dibujó en esta ejecución
+            if tipo == "button":
+                return proto.id
+            if tipo in ("selectbox", "radio"):
+                self.estados[proto.id] = ("int_value", self.rng.randrange(len(proto.options)))
+            elif tipo == "slider":
+                pasos = int(round((proto.max - proto.min) / proto.step))
+                valor = proto.min + proto.step * self.rng.randint(0, pasos)
+                self.estados[proto.id] = ("double_array_value", [round(valor, 10)])
+            else:
+                minimo = proto.min if proto.has_min else proto.default - 10 * proto.step
+                maximo = proto.max if proto.has_max else proto.default + 10 * proto.step
+                pasos = int(round((maximo - minimo) / proto.step))
+                valor = minimo + proto.step * self.rng.randint(0, pasos)
+                if proto.data_type == proto.INT:
+                    self.estados[proto.id] = ("int_value", int(round(valor)))
+                else:
+                    self.estados[proto.id] = ("double_value", round(valor, 10))
+            return None
+        return None
+
+
+async def _sesion(url, ruta, interacciones, pausa, semilla, latencias, listas):
+    """Cargar ``ruta`` y repetir ``interacciones``; agrega (ruta, inicial, segundos, errores) a ``latencias``"""
+    rng = random.Random(semilla)
+    sesion = _Sesion(url, ruta, rng)
+    await sesion.conectar()
+    try:
+        segundos, errores = await sesion.rerun()
+        latencias.append((ruta, True, segundos, errores))
+        for _ in range(interacciones):
+            if pausa:
+                await asyncio.sleep(rng.expovariate(1 / pausa))
+            disparar = sesion.interactuar()
+            segundos, errores = await sesion.rerun(disparar)
+            latencias.append((ruta, False, segundos, errores))
+        listas.append(sesion)  # La sesión sigue abierta hasta medir el RSS del nivel
+    except Exception:
+        sesion.cerrar()
+        raise
+
+
+def _percentiles(valores):
+    if not valores:
+        return {f"p{p}_ms": None for p in PERCENTILES}
+    return {f"p{p}_ms": round(float(np.percentile(valores, p)) * 1000, 2) for p in PERCENTILES}
+
+
+async def _nivel(url, sesiones, paginas, interacciones, pausa, rampa, pid, semilla):
+    """Correr ``sesiones`` simultáneas y resumir latencias, throughput y RSS del servidor"""
+    latencias, listas = [], []
+    rss_inicio = _rss_mb(pid) if pid else None
+    rss_pico = [rss_inicio or 0.0]
+
+    async def muestrear_rss():
+        while True:
+            rss_pico[0] = max(rss_pico[0], _rss_mb(pid) or 0.0)
+            await asyncio.sleep(MUESTREO_RSS)
+
+    async def arrancar(i):
+        await asyncio.sleep(rampa * i / max(sesiones, 1))
+        await _sesion(url, paginas[i % len(paginas)], interacciones, pausa, semilla + i, latencias, listas)
+
+    muestreo = asyncio.ensure_future(muestrear_rss()) if pid else None
+    inicio = time.perf_counter()
+    resultados = await asyncio.gather(*(arrancar(i) for i in range(sesiones)), return_exceptions=True)
+    duracion = time.perf_counter() - inicio
+    if muestreo:
+        muestreo.cancel()
+    rss_fin = _rss_mb(pid) if pid else None
+    for sesion in listas:
+        sesion.cerrar()
+    fallidas = [repr(r) for r in resultados if isinstance(r, Exception)]
+
+    interaccion = [s for _, inicial, s, _ in latencias if not inicial]
+    resumen = {
+        "sesiones": sesiones,
+        "sesiones_fallidas": len(fallidas),
+        "fallos": fallidas[:5],
+        "reruns": len(latencias),
+        "errores_script": sum(e for *_, e in latencias),
+        "duracion_s": round(duracion, 2),
+        "throughput_rps": round(len(latencias) / duracion, 2) if duracion else None,
+        "latencia": _percentiles(interaccion),
+        "latencia_inicial": _percentiles([s for _, inicial, s, _ in latencias if inicial]),
+        "por_pagina": {
+            ruta: _percentiles([s for r, inicial, s, _ in latencias if r == ruta and not inicial])
+            for ruta in paginas[:sesiones]
+        },
+        "rss_inicio_mb": rss_inicio,
+        "rss_fin_mb": rss_fin,
+        "rss_pico_mb": round(rss_pico[0], 1) if pid else None,
+        "rss_por_sesion_mb": round((rss_fin - rss_inicio) / sesiones, 2) if rss_inicio and rss_fin else None,
+    }
+    return resumen
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _arrancar_servidor(puerto, espera=120):
+    """``streamlit run`` en segundo plano; retorna el proceso cuando responde ``/_stcore/health``"""
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", PAGINAS[0], "--server.headless=true",
+         f"--server.port={puerto}", "--server.address=127.0.0.1", "--browser.gatherUsageStats=false"],
+        cwd=RAIZ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    limite = time.time() + espera
+    while time.time() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"El servidor terminó con código {proceso.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/_stcore/health", timeout=2) as r:
+                if r.status == 200:
+                    return proceso
+        except OSError:
+            time.sleep(0.5)
+    proceso.terminate()
+    raise RuntimeError(f"El servidor no respondió en {espera} s")
+
+
+async def ejecutar(url, niveles, paginas, interacciones, pausa, rampa, pid, semilla=0, calentar=True):
+    """Correr todos los niveles de concurrencia; retorna el documento JSON de resultados"""
+    if calentar:
+        # Una sesión por página llena los caches del proceso: los niveles son comparables entre sí
+        await _nivel(url, len(paginas), paginas, 1, 0.0, 0.0, None, semilla)
+    resultados = []
+    for sesiones in niveles:
+        resultado = await _nivel(url, sesiones, paginas, interacciones, pausa, rampa, pid, semilla)
+        resultados.append(resultado)
+        print(f"{sesiones:>4} sesiones: p50 {resultado['latencia']['p50_ms']} ms, "
+              f"p99 {resultado['latencia']['p99_ms']} ms, {resultado['throughput_rps']} reruns/s, "
+              f"RSS/sesión {resultado['rss_por_sesion_mb']} MB", file=sys.stderr, flush=True)
+    return {
+        "version": 1,
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "entorno": entorno(),
+        "parametros": {"interacciones": interacciones, "pausa_s": pausa, "rampa_s": rampa,
+                       "paginas": paginas, "semilla": semilla},
+        "niveles": resultados,
+    }
+
+
+def comparar(actual, previa):
+    """Tabla de diferencias por nivel de concurrencia (latencias, throughput y RSS por sesión)"""
+    campos = [("p50", lambda n: n["latencia"]["p50_ms"]), ("p95", lambda n: n["latencia"]["p95_ms"]),
+              ("p99", lambda n: n["latencia"]["p99_ms"]), ("rps", lambda n: n["throughput_rps"]),
+              ("MB/sesión", lambda n: n["rss_por_sesion_mb"])]
+    anteriores = {n["sesiones"]: n for n in previa["niveles"]}
+    lineas = [f"{'sesiones':>8}  " + "  ".join(f"{nombre:>22}" for nombre, _ in campos)]
+    for nivel in actual["niveles"]:
+        anterior = anteriores.get(nivel["sesiones"])
+        celdas = []
+        for _, valor in campos:
+            ahora = valor(nivel)
+            antes = valor(anterior) if anterior else None
+            if ahora is None:
+                celdas.append(f"{'-':>22}")
+            elif antes:
+                celdas.append(f"{antes:>8.1f} → {ahora:>8.1f} {(ahora - antes) / antes:+.0%}".rjust(22))
+            else:
+                celdas.append(f"{ahora:>22.1f}")
+        lineas.append(f"{nivel['sesiones']:>8}  " + "  ".join(celdas))
+    return "\n".join(lineas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga con sesiones simultáneas contra un servidor local")
+    parser.add_argument("--sesiones", default="1,5,10", help="Niveles de concurrencia separados por coma")
+    parser.add_argument("--interacciones", type=int, default=20, help="Interacciones por sesión tras la carga")
+    parser.add_argument("--pausa", type=float, default=1.0, help="Tiempo medio de reflexión entre interacciones (s)")
+    parser.add_argument("--rampa", type=float, default=5.0, help="Segundos en que se reparten los arranques")
+    parser.add_argument("--paginas", default=None, help="Páginas separadas por coma (por defecto, todas)")
+    parser.add_argument("--url", default=None, help="Servidor ya levantado (p. ej. http://localhost:8501)")
+    parser.add_argument("--pid", type=int, default=None, help="PID del servidor de --url, para medir su RSS")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--sin-calentar", action="store_true", help="No precalentar los caches del servidor")
+    parser.add_argument("--salida", default="benchmarks/carga.json", help="Archivo JSON de resultados")
+    parser.add_argument("--comparar", default=None, help="JSON de una corrida anterior")
+    args = parser.parse_args(argv)
+
+    paginas = args.paginas.split(",") if args.paginas else list(GUIONES)
+    desconocidas = [p for p in paginas if p not in GUIONES]
+    if desconocidas:
+        print(f"Error: páginas sin guion: {', '.join(desconocidas)}", file=sys.stderr)
+        return 1
+    niveles = [int(n) for n in args.sesiones.split(",")]
+
+    servidor = None
+    if args.url:
+        base, pid = args.url.rstrip("/"), args.pid
+    else:
+        puerto = _puerto_libre()
+        servidor = _arrancar_servidor(puerto)
+        base, pid = f"http://127.0.0.1:{puerto}", servidor.pid
+    url = re.sub(r"^http", "ws", base) + "/_stcore/stream"
+    try:
+        resultados = asyncio.run(ejecutar(url, niveles, paginas, args.interacciones, args.pausa, args.rampa,
+                                          pid, args.semilla, not args.sin_calentar))
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.salida)), exist_ok=True)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    print(f"Resultados en {args.salida}", file=sys.stderr)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            print(comparar(resultados, json.load(f)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+"""Benchmarks de las rutas críticas: carga y predicción del modelo, simulación, regresión y páginas
+
+Uso: python -m benchmarks.suite --salida resultados.json --base benchmarks/base.json
+
+Cada caso se mide varias veces con el recolector de basura detenido y se
+resume con la mediana. Los casos que dependen de ``st.cache_resource`` se
+ejecutan dentro de un ``AppTest`` (fuera del runtime de Streamlit el cache no
+persiste); las páginas se ejecutan completas con ``AppTest``: en frío (caches
+de proceso vacíos), en una sesión nueva con caches calientes y como rerun de
+la misma sesión. Si se indica ``--base``, el proceso termina con código 1 cuando
+la mediana de algún caso empeora más de ``--umbral`` respecto a la base.
+"""
+import os
+
+# Un hilo por biblioteca numérica: tiempos comparables entre máquinas y corridas
+for _variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(_variable, "1")
+
+import argparse
+import gc
+import io
+import json
+import platform
+import subprocess
+import sys
+import threading
+import time
+import warnings
+from fnmatch import fnmatch
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+PAGINAS = ["Soya_Insights.py", *sorted(str(p.relative_to(RAIZ)) for p in (RAIZ / "pages").glob("*.py"))]
+
+UMBRAL = 0.25      # Empeoramiento relativo tolerado de la mediana
+PISO_MS = 2.0      # Diferencias absolutas menores se consideran ruido
+LOTE_FILAS = 10_000
+SEMILLA = 0
+
+
+def _medir(funcion, repeticiones, preparar=None, calentar=1):
+    """Mediana, mínimo y máximo en ms de ``funcion()``; ``preparar()`` corre antes de cada medición sin contar"""
+    for _ in range(calentar):
+        if preparar:
+            preparar()
+        funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar:
+            preparar()
+        gc.collect()
+        gc.disable()
+        try:
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        finally:
+            gc.enable()
+    tiempos.sort()
+    return {
+        "mediana_ms": round(tiempos[len(tiempos) // 2], 4),
+        "min_ms": round(tiempos[0], 4),
+        "max_ms": round(tiempos[-1], 4),
+        "repeticiones": repeticiones,
+    }
+
+
+def _esperar_hilos(nombre="forest-lookup"):
+    """Esperar trabajo en segundo plano (tablas de búsqueda) para que no contamine la siguiente medición"""
+    for hilo in threading.enumerate():
+        if hilo.name == nombre:
+            hilo.join()
+
+
+def casos_en_runtime(repeticiones=None, filtro="*"):
+    """Casos de modelo, simulación y regresión; debe correr dentro del runtime (``AppTest``)"""
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    from src.config.constants import SEGUIMIENTO_DATA_FILE, SUPERFICIE_ACIDEZ
+    from src.services import ModelService
+    from src.utils import Calculations, load_and_prepare_data, fit_quantile_regression, plot_best_fit
+    from src.utils import calculations
+    from src.utils.forest_lookup import get_lookup_table
+
+    def carga_fria():
+        ModelService.get_acidez_registry().stop()
+        ModelService.get_acidez_registry.clear()
+
+    rng = np.random.default_rng(SEMILLA)
+    gdc_lote = rng.uniform(*SUPERFICIE_ACIDEZ["gdc"], LOTE_FILAS)
+    gdh_lote = rng.uniform(*SUPERFICIE_ACIDEZ["gdh"], LOTE_FILAS)
+    simulacion = dict(temperatura=28.0, humedad=14.0, gdc_ini=5.0, gdh_ini=3.0, meses=24)
+
+    df = load_and_prepare_data(SEGUIMIENTO_DATA_FILE)
+    columnas = [c for c in df.select_dtypes(include="number").columns if c != "Fecha"]
+    ajustes = fit_quantile_regression(df, columnas[0], taus=[0.5])
+    mejor = ajustes.loc[ajustes["pseudo_r2"].idxmax()]
+
+    def ajustar_todas():
+        for columna in columnas:
+            fit_quantile_regression(df, columna)
+
+    def graficar():
+        plt.close(plot_best_fit(df, columnas[0], mejor))
+
+    def graficar_png():
+        fig = plot_best_fit(df, columnas[0], mejor)
+        fig.savefig(io.BytesIO(), format="png")
+        plt.close(fig)
+
+    casos = [
+        # nombre, función, repeticiones, preparar, calentar
+        ("modelo.carga_fria", ModelService.load_acidez_model, 5, carga_fria, 0),
+        ("modelo.carga_caliente", ModelService.load_acidez_model, 200, None, 1),
+        ("modelo.predecir_fila", lambda: ModelService.predict_acidez(25.0, 10.0, modelo), 200, None, 1),
+        ("modelo.predecir_lote", lambda: ModelService.predict_acidez_batch(gdc_lote, gdh_lote, modelo), 20, None, 1),
+        ("calculos.simular_evolucion_temporal", lambda: Calculations.simular_evolucion_temporal(**simulacion),
+         20, calculations._cache_simulacion.clear, 1),
+        ("calculos.simular_evolucion_temporal_cache", lambda: Calculations.simular_evolucion_temporal(**simulacion),
+         200, None, 1),
+        ("regresion.ajustar_todas_columnas", ajustar_todas, 3, None, 1),
+        ("regresion.graficar_ajuste", graficar, 10, None, 1),
+        ("regresion.graficar_ajuste_png", graficar_png, 10, None, 1),
+    ]
+    resultados = {}
+    modelo = None
+    for nombre, funcion, n, preparar, calentar in casos:
+        if nombre.startswith("modelo.predecir") and modelo is None:
+            # La predicción de la app usa la tabla de búsqueda en cuanto está lista
+            modelo = ModelService.load_acidez_model()
+            get_lookup_table(modelo, esperar=True)
+        if fnmatch(nombre, filtro):
+            resultados[nombre] = _medir(funcion, repeticiones or n, preparar, calentar)
+            _esperar_hilos()
+    return resultados
+
+
+def _limpiar_caches():
+    import streamlit as st
+    from src.utils import PresupuestoMemoria
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    PresupuestoMemoria.limpiar()
+    gc.collect()
+
+
+def casos_paginas(repeticiones=None, filtro="*"):
+    """Ejecución completa de cada página con ``AppTest``: fría, sesión nueva y rerun de la misma sesión"""
+    from streamlit.testing.v1 import AppTest
+
+    def ejecutar(app):
+        app.run()
+        _esperar_hilos()
+        if app.exception:
+            raise RuntimeError(f"{ruta}: {app.exception[0].value}")
+        return app
+
+    resultados = {}
+    for ruta in PAGINAS:
+        nombre = f"pagina.{Path(ruta).stem}"
+        if not any(fnmatch(f"{nombre}.{tipo}", filtro) for tipo in ("fria", "sesion_nueva", "rerun")):
+            continue
+        n = repeticiones or 3
+        resultados[f"{nombre}.fria"] = _medir(
+            lambda: ejecutar(AppTest.from_file(ruta, default_timeout=600)), n, _limpiar_caches, calentar=1
+        )
+        resultados[f"{nombre}.sesion_nueva"] = _medir(
+            lambda: ejecutar(AppTest.from_file(ruta, default_timeout=600)), n
+        )
+        app = ejecutar(AppTest.from_file(ruta, default_timeout=600))
+        resultados[f"{nombre}.rerun"] = _medir(lambda: ejecutar(app), n)
+    return {k: v for k, v in resultados.items() if fnmatch(k, filtro)}
+
+
+def _ejecutar_en_runtime(repeticiones, filtro):
+    from streamlit.testing.v1 import AppTest
+
+    script = (
+        "import streamlit as st\n"
+        "from benchmarks.suite import casos_en_runtime\n"
+        f"st.session_state['resultados'] = casos_en_runtime({repeticiones!r}, {filtro!r})\n"
+    )
+    app = AppTest.from_string(script, default_timeout=1800).run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return app.session_state["resultados"]
+
+
+def entorno():
+    """Versiones y máquina de la corrida, para saber si dos resultados son comparables"""
+    from importlib.metadata import version, PackageNotFoundError
+
+    paquetes = {}
+    for paquete in ("numpy", "pandas", "scikit-learn", "statsmodels", "matplotlib", "plotly", "streamlit"):
+        try:
+            paquetes[paquete] = version(paquete)
+        except PackageNotFoundError:
+            paquetes[paquete] = None
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "procesador": platform.processor() or platform.machine(),
+        "nucleos": os.cpu_count(),
+        "commit": commit,
+        "paquetes": paquetes,
+    }
+
+
+def ejecutar(repeticiones=None, filtro="*", paginas=True):
+    """Correr la suite; retorna el documento JSON de resultados"""
+    casos = _ejecutar_en_runtime(repeticiones, filtro)
+    if paginas:
+        casos.update(casos_paginas(repeticiones, filtro))
+    return {
+        "version": 1,
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "entorno": entorno(),
+        "casos": casos,
+    }
+
+
+def comparar(actual, base, umbral=UMBRAL, piso_ms=PISO_MS, filtro="*", paginas=True):
+    """Filas (caso, base_ms, actual_ms, cambio, estado) para los casos de ``actual`` y de la base
+
+    Un caso es regresión si su mediana supera la de la base en más de ``umbral``
+    (relativo) y de ``piso_ms`` (absoluto). Los casos de la base que la corrida
+    debía medir (según ``filtro`` y ``paginas``) y no midió quedan como "ausente".
+    """
+    filas = []
+    for caso, previa in sorted(base["casos"].items()):
+        esperado = fnmatch(caso, filtro) and (paginas or not caso.startswith("pagina."))
+        if esperado and caso not in actual["casos"]:
+            filas.append((caso, previa["mediana_ms"], None, None, "ausente"))
+    for caso, medicion in sorted(actual["casos"].items()):
+        previa = base["casos"].get(caso)
+        if previa is None:
+            filas.append((caso, None, medicion["mediana_ms"], None, "nuevo"))
+            continue
+        antes, ahora = previa["mediana_ms"], medicion["mediana_ms"]
+        cambio = (ahora - antes) / antes if antes else 0.0
+        if cambio > umbral and ahora - antes > piso_ms:
+            estado = "regresión"
+        elif cambio < -umbral and antes - ahora > piso_ms:
+            estado = "mejora"
+        else:
+            estado = "igual"
+        filas.append((caso, antes, ahora, cambio, estado))
+    return sorted(filas, key=lambda fila: fila[0])
+
+
+def _informe(filas):
+    ancho = max(len(f[0]) for f in filas)
+    lineas = [f"{'caso':<{ancho}}  {'base ms':>10}  {'actual ms':>10}  {'cambio':>8}  estado"]
+    for caso, antes, ahora, cambio, estado in filas:
+        antes_txt = f"{antes:10.2f}" if antes is not None else f"{'-':>10}"
+        cambio_txt = f"{cambio:+8.1%}" if cambio is not None else f"{'-':>8}"
+        ahora_txt = f"{ahora:10.2f}" if ahora is not None else f"{'-':>10}"
+        lineas.append(f"{caso:<{ancho}}  {antes_txt}  {ahora_txt}  {cambio_txt}  {estado}")
+    return "\n".join(lineas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de las rutas críticas de la aplicación")
+    parser.add_argument("--salida", default="benchmarks/resultados.json", help="Archivo JSON de resultados")
+    parser.add_argument("--base", default=None, help="JSON de referencia; falla si algún caso empeora")
+    parser.add_argument("--guardar-base", action="store_true", help="Escribir también los resultados en --base")
+    parser.add_argument("--umbral", type=float, default=UMBRAL, help="Empeoramiento relativo tolerado (0.25 = 25%%)")
+    parser.add_argument("--piso-ms", type=float, default=PISO_MS, help="Diferencia absoluta mínima para contar")
+    parser.add_argument("--repeticiones", type=int, default=None, help="Repeticiones de todos los casos")
+    parser.add_argument("--filtro", default="*", help="Patrón de casos a correr (p. ej. 'modelo.*')")
+    parser.add_argument("--sin-paginas", action="store_true", help="Omitir la ejecución completa de las páginas")
+    args = parser.parse_args(argv)
+
+    # Las páginas leen data/ y models/ con rutas relativas a la raíz del repositorio
+    os.chdir(RAIZ)
+    if str(RAIZ) not in sys.path:
+        sys.path.insert(0, str(RAIZ))
+    warnings.filterwarnings("ignore")
+
+    resultados = ejecutar(args.repeticiones, args.filtro, not args.sin_paginas)
+    os.makedirs(os.path.dirname(os.path.abspath(args.salida)), exist_ok=True)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    print(f"Resultados en {args.salida}", file=sys.stderr)
+
+    if not args.base:
+        return 0
+    if args.guardar_base:
+        with open(args.base, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"Base actualizada en {args.base}", file=sys.stderr)
+        return 0
+    try:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+    except FileNotFoundError:
+        # Sin base no hay comparación: pasar en silencio desactivaría el control de regresiones
+        print(f"Error: no existe la base {args.base}; créela con --guardar-base", file=sys.stderr)
+        return 1
+
+    filas = comparar(resultados, base, args.umbral, args.piso_ms, args.filtro, not args.sin_paginas)
+    print(_informe(filas))
+    for campo in ("python", "nucleos", "procesador"):
+        if base["entorno"].get(campo) != resultados["entorno"].get(campo):
+            print(f"Aviso: la base se midió con otro entorno ({campo}: {base['entorno'].get(campo)})",
+                  file=sys.stderr)
+    regresiones = [f[0] for f in filas if f[4] == "regresión"]
+    ausentes = [f[0] for f in filas if f[4] == "ausente"]
+    if regresiones:
+        print(f"Regresiones: {', '.join(regresiones)}", file=sys.stderr)
+    if ausentes:
+        print(f"Casos de la base sin medir (¿renombrados o eliminados? actualice con --guardar-base): "
+              f"{', '.join(ausentes)}", file=sys.stderr)
+    return 1 if regresiones or ausentes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
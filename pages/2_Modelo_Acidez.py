@@ -4,10 +4,12 @@ import plotly.graph_objects as go
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-import streamlit.components.v1 as components
 import os
-import joblib
-import json
+from src.config.constants import (
+    ACIDEZ_MAXIMA, ACIDEZ_DATA_FILE
+)
+from src.services import DataService, ModelService, DiagnosticsService, ResultCache
+from src.components import SurfaceDisplay, DiagnosticsDisplay, DistributionDisplay, FigureCache, ProfilingDisplay
 
 # Colores corporativos
 CORPORATE_COLORS = {
@@ -17,146 +19,144 @@ CORPORATE_COLORS = {
     "gris_neutro": "#C9C9C9"        # rgb(201,201,201)
 }
 
-@st.cache_resource
-def load_acidez_model():
-    """Cargar el modelo de acidez"""
-    try:
-        model = joblib.load("models/artifacts/random_forest_acidez.pkl")
-        with open("models/artifacts/metrics_acidez.json", "r") as f:
-            metrics = json.load(f)
-        with open("models/artifacts/model_info_acidez.json", "r") as f:
-            model_info = json.load(f)
-        return model, metrics, model_info
-    except Exception as e:
-        st.error(f"Error cargando modelo: {e}")
-        return None, None, None
-
 st.set_page_config(
     page_title="Modelo de Acidez - Soya Insights",
     page_icon="🧪",
     layout="wide"
 )
 
-st.title("🧪 Modelo de Cambio de Acidez en Función del Daño del Grano")
-st.markdown("---")
+# Duración del rerun completo (métricas Prometheus) y perfilado bajo demanda
+with ProfilingDisplay.pagina("modelo_acidez"):
+    st.title("🧪 Modelo de Cambio de Acidez en Función del Daño del Grano")
+    st.markdown("---")
 
-# ===== CALCULADORA PRÁCTICA =====
-st.header("🧮 Calculadora de Acidez")
+    # ===== CALCULADORA PRÁCTICA =====
+    st.header("🧮 Calculadora de Acidez")
 
-# Cargar modelo ML
-model, metrics, model_info = load_acidez_model()
+    # Cargar modelo ML (versión activa del registro)
+    model = ModelService.load_acidez_model()
+    resultado = None
 
-if model is not None:
-    # Obtener valor medio de acidez de los datos
-    df_acidez_data = pd.read_csv("data/data_acidez.csv")
-    acidez_media = df_acidez_data['pct_oil_acidez_mean'].mean()
+    if model is not None:
+        # Obtener valor medio de acidez de los datos
+        df_acidez_data = pd.read_csv("data/data_acidez.csv")
+        acidez_media = df_acidez_data['pct_oil_acidez_mean'].mean()
     
-    col1, col2 = st.columns([2, 1])
+        col1, col2 = st.columns([2, 1])
     
-    with col1:
-        st.subheader("📊 Ingrese los Valores de Daño")
+        with col1:
+            st.subheader("📊 Ingrese los Valores de Daño")
         
-        # Inputs para GDC y GDH
-        gdc_input = st.number_input(
-            "GDC - Daño Térmico (%)",
-            min_value=0,
-            max_value=100,
-            value=30,
-            step=1,
-            help="Ingrese el porcentaje de daño térmico observado"
-        )
+            # Inputs para GDC y GDH
+            gdc_input = st.number_input(
+                "GDC - Daño Térmico (%)",
+                min_value=0,
+                max_value=100,
+                value=30,
+                step=1,
+                help="Ingrese el porcentaje de daño térmico observado"
+            )
         
-        gdh_input = st.number_input(
-            "GDH - Daño por Hongos (%)",
-            min_value=0,
-            max_value=100,
-            value=15,
-            step=1,
-            help="Ingrese el porcentaje de daño por hongos observado"
-        )
+            gdh_input = st.number_input(
+                "GDH - Daño por Hongos (%)",
+                min_value=0,
+                max_value=100,
+                value=15,
+                step=1,
+                help="Ingrese el porcentaje de daño por hongos observado"
+            )
         
-        # Botón para calcular
-        if st.button("🔍 Calcular Acidez Esperada", type="primary"):
-            # Hacer predicción
-            data_input = pd.DataFrame({
-                'gdc_mean_in': [gdc_input],
-                'gdh_mean_in': [gdh_input]
-            })
-            
-            acidez_predicha = model.predict(data_input)[0]
-            diferencia_media = acidez_predicha - acidez_media
-            porcentaje_cambio = (diferencia_media / acidez_media) * 100
-            
-            # Guardar en session state para mostrar en la columna derecha
-            st.session_state.acidez_resultado = {
-                'predicha': acidez_predicha,
-                'media': acidez_media,
-                'diferencia': diferencia_media,
-                'porcentaje': porcentaje_cambio,
-                'gdc': gdc_input,
-                'gdh': gdh_input
-            }
+            # Botón para calcular
+            if st.button("🔍 Calcular Acidez Esperada", type="primary"):
+                # Entradas enteras: el resultado se comparte entre sesiones por (GDC, GDH, versiones).
+                # La sesión guarda solo las entradas; el resultado vive en el cache compartido (acotado)
+                st.session_state.acidez_entradas = (int(gdc_input), int(gdh_input))
+
+        def calcular_resultado(gdc, gdh):
+            # Versión y modelo de la misma lectura del registro: un intercambio en caliente
+            # no puede guardar un resultado del modelo nuevo bajo la versión anterior
+            activo = ModelService.get_acidez_registry().active
+            version_calculo = (activo.version, DataService.get_data_version(ACIDEZ_DATA_FILE))
+
+            def calcular():
+                data_input = pd.DataFrame({
+                    'gdc_mean_in': [gdc],
+                    'gdh_mean_in': [gdh]
+                })
+                acidez_predicha = float(activo.model.predict(data_input)[0])
+                diferencia_media = acidez_predicha - acidez_media
+                return {
+                    'predicha': acidez_predicha,
+                    'media': acidez_media,
+                    'diferencia': diferencia_media,
+                    'porcentaje': (diferencia_media / acidez_media) * 100,
+                    'gdc': gdc,
+                    'gdh': gdh,
+                    'version': version_calculo
+                }
+
+            return ResultCache.obtener("calculadora_acidez", (gdc, gdh), version_calculo, calcular,
+                                       huella=lambda: ModelService.huella_acidez(ACIDEZ_DATA_FILE))
+
+        if 'acidez_entradas' in st.session_state:
+            resultado = calcular_resultado(*st.session_state.acidez_entradas)
     
-    with col2:
-        st.subheader("📈 Resultado del Análisis")
+        with col2:
+            st.subheader("📈 Resultado del Análisis")
         
-        if 'acidez_resultado' in st.session_state:
-            resultado = st.session_state.acidez_resultado
-            
-            # Métrica principal
-            st.metric(
-                label="Acidez Esperada",
-                value=f"{resultado['predicha']:.2f} mg KOH/g",
-                delta=f"{resultado['diferencia']:+.2f} mg KOH/g"
-            )
+            if resultado is not None:
+                # Métrica principal
+                st.metric(
+                    label="Acidez Esperada",
+                    value=f"{resultado['predicha']:.2f} mg KOH/g",
+                    delta=f"{resultado['diferencia']:+.2f} mg KOH/g"
+                )
             
-            # Comparación con media
-            st.markdown("**Comparación con Valor Medio:**")
-            st.markdown(f"- **Valor Medio:** {resultado['media']:.2f} mg KOH/g")
-            st.markdown(f"- **Diferencia:** {resultado['diferencia']:+.2f} mg KOH/g")
-            st.markdown(f"- **Cambio:** {resultado['porcentaje']:+.1f}%")
+                # Comparación con media
+                st.markdown("**Comparación con Valor Medio:**")
+                st.markdown(f"- **Valor Medio:** {resultado['media']:.2f} mg KOH/g")
+                st.markdown(f"- **Diferencia:** {resultado['diferencia']:+.2f} mg KOH/g")
+                st.markdown(f"- **Cambio:** {resultado['porcentaje']:+.1f}%")
             
-            # Interpretación
-            st.markdown("**Interpretación:**")
-            if resultado['diferencia'] > 0:
-                st.warning(f"⚠️ **Por encima del promedio** (+{resultado['diferencia']:.2f} mg KOH/g)")
-            elif resultado['diferencia'] < 0:
-                st.success(f"✅ **Por debajo del promedio** ({resultado['diferencia']:.2f} mg KOH/g)")
-            else:
-                st.info("ℹ️ **En el promedio**")
+                # Interpretación
+                st.markdown("**Interpretación:**")
+                if resultado['diferencia'] > 0:
+                    st.warning(f"⚠️ **Por encima del promedio** (+{resultado['diferencia']:.2f} mg KOH/g)")
+                elif resultado['diferencia'] < 0:
+                    st.success(f"✅ **Por debajo del promedio** ({resultado['diferencia']:.2f} mg KOH/g)")
+                else:
+                    st.info("ℹ️ **En el promedio**")
             
-            # Calidad según acidez
-            if resultado['predicha'] < 1.0:
-                st.success("🟢 **Calidad Excelente**")
-            elif resultado['predicha'] < 2.0:
-                st.warning("🟡 **Calidad Buena**")
-            else:
-                st.error("🔴 **Calidad Crítica**")
+                # Calidad según acidez
+                if resultado['predicha'] < 1.0:
+                    st.success("🟢 **Calidad Excelente**")
+                elif resultado['predicha'] < 2.0:
+                    st.warning("🟡 **Calidad Buena**")
+                else:
+                    st.error("🔴 **Calidad Crítica**")
             
-            # Recomendación
-            st.markdown("**Recomendación:**")
-            if resultado['predicha'] > 3.0:
-                st.error("🔴 Revisar condiciones de almacenamiento y procesamiento")
-            elif resultado['predicha'] > 2.0:
-                st.warning("🟡 Monitorear parámetros de proceso")
-            else:
-                st.success("🟢 Condiciones óptimas mantenidas")
+                # Recomendación
+                st.markdown("**Recomendación:**")
+                if resultado['predicha'] > 3.0:
+                    st.error("🔴 Revisar condiciones de almacenamiento y procesamiento")
+                elif resultado['predicha'] > 2.0:
+                    st.warning("🟡 Monitorear parámetros de proceso")
+                else:
+                    st.success("🟢 Condiciones óptimas mantenidas")
         
-        else:
-            st.info("💡 Ingrese valores y haga clic en 'Calcular' para ver el análisis")
+            else:
+                st.info("💡 Ingrese valores y haga clic en 'Calcular' para ver el análisis")
     
-    # Explicación y métricas del modelo Random Forest en un expander
-    import json
-    try:
-        with open("models/artifacts/model_info_acidez.json", "r") as f:
-            model_info = json.load(f)
-        with open("models/artifacts/metrics_acidez.json", "r") as f:
-            metrics = json.load(f)
-        acidez_media = metrics['test']['mean'] if 'mean' in metrics['test'] else 0
-        fecha_entrenamiento = model_info.get('training_date', 'N/A')[:10]
-        with st.expander("ℹ️ Información del Modelo"):
-            st.markdown(f"""
+        # Explicación y métricas del modelo Random Forest en un expander
+        try:
+            model_info = ModelService.load_model_info()
+            metrics = ModelService.load_model_metrics()
+            acidez_media = metrics['test']['mean'] if 'mean' in metrics['test'] else 0
+            fecha_entrenamiento = model_info.get('training_date', 'N/A')[:10]
+            with st.expander("ℹ️ Información del Modelo"):
+                st.markdown(f"""
             **Modelo Random Forest:**
+            - **Versión activa:** {ModelService.get_acidez_model_version()}
             - **Fecha de entrenamiento:** {fecha_entrenamiento}
             - **Precisión (R²):** {metrics['test']['r2']:.1%}
             - **Error promedio:** {metrics['test']['mae']:.3f} mg KOH/g
@@ -166,161 +166,176 @@ if model is not None:
             - **GDC (Térmico):** {model_info['feature_importance']['gdc_mean_in']:.1%}
             - **GDH (Hongos):** {model_info['feature_importance']['gdh_mean_in']:.1%}
             """)
-    except Exception:
-        st.warning("No se pudo cargar la información del modelo.")
+        except Exception:
+            st.warning("No se pudo cargar la información del modelo.")
 
-else:
-    st.error("❌ No se pudo cargar el modelo. Verifique que el archivo `models/artifacts/random_forest_acidez.pkl` existe.")
+    else:
+        st.error("❌ No se pudo cargar el modelo. Verifique que el archivo `models/artifacts/random_forest_acidez.pkl` existe.")
 
-# Mostrar análisis detallado si hay resultado (fuera de las columnas)
-if 'acidez_resultado' in st.session_state:
-    st.markdown("---")
-    st.header("📊 Análisis Detallado")
-    
-    resultado = st.session_state.acidez_resultado
-    
-    col1, col2 = st.columns(2)
+    # Mostrar análisis detallado si hay resultado (fuera de las columnas)
+    if resultado is not None:
+        st.markdown("---")
+        st.header("📊 Análisis Detallado")
     
-    with col1:
-        st.subheader("🎯 Posición en la Distribución")
-        
-        # Crear gráfico de distribución con el punto actual
-        fig_dist = go.Figure()
-        
-        # Histograma de datos históricos
-        fig_dist.add_trace(go.Histogram(
-            x=df_acidez_data['pct_oil_acidez_mean'],
-            name='Datos Históricos',
-            marker_color=CORPORATE_COLORS["verde_claro"],
-            opacity=1,
-            nbinsx=30
-        ))
+        def figuras_analisis():
+            """Distribución y radar del resultado, serializados para compartirlos junto con él"""
+            # Crear gráfico de distribución con el punto actual
+            fig_dist = go.Figure()
         
-        # Línea de media
-        fig_dist.add_vline(
-            x=resultado['media'],
-            line_dash="dash",
-            line_color="blue",
-            annotation_text=f"Media: {resultado['media']:.2f}",
-            annotation_position="top right",
-            annotation=dict(font=dict(color="#1A494C"))
-        )
-        
-        # Punto actual
-        fig_dist.add_vline(
-            x=resultado['predicha'],
-            line_dash="solid",
-            line_color="red",
-            line_width=3,
-            annotation_text=f"Predicción: {resultado['predicha']:.2f}",
-            annotation_position="bottom left",
-            annotation=dict(font=dict(color="#1A494C"))
-        )
+            # Histograma de datos históricos (binado en el servidor) con su densidad
+            resumen_acidez = DataService.resumir_distribucion(
+                ACIDEZ_DATA_FILE, DataService.get_data_version(ACIDEZ_DATA_FILE), 'pct_oil_acidez_mean'
+            )
+            fig_dist.add_traces(DistributionDisplay.trazas_distribucion(resumen_acidez, 'Datos Históricos'))
         
-        fig_dist.update_layout(
-            title="Distribución Histórica de Acidez",
-            xaxis_title="Acidez (mg KOH/g)",
-            yaxis_title="Frecuencia",
-            height=400,
-            showlegend=False
-        )
+            # Línea de media
+            fig_dist.add_vline(
+                x=resultado['media'],
+                line_dash="dash",
+                line_color="blue",
+                annotation_text=f"Media: {resultado['media']:.2f}",
+                annotation_position="top right",
+                annotation=dict(font=dict(color="#1A494C"))
+            )
         
-        st.plotly_chart(fig_dist, use_container_width=True, key="dist_hist")
-    
-    with col2:
-        st.subheader("📈 Comparación de Variables")
+            # Punto actual
+            fig_dist.add_vline(
+                x=resultado['predicha'],
+                line_dash="solid",
+                line_color="red",
+                line_width=3,
+                annotation_text=f"Predicción: {resultado['predicha']:.2f}",
+                annotation_position="bottom left",
+                annotation=dict(font=dict(color="#1A494C"))
+            )
         
-        # Gráfico de radar para comparar GDC y GDH
-        fig_radar = go.Figure()
+            fig_dist.update_layout(
+                title="Distribución Histórica de Acidez",
+                xaxis_title="Acidez (mg KOH/g)",
+                yaxis_title="Frecuencia",
+                height=400,
+                showlegend=False,
+                bargap=0
+            )
+
+            # Gráfico de radar para comparar GDC y GDH
+            fig_radar = go.Figure()
         
-        fig_radar.add_trace(go.Scatterpolar(
-            r=[resultado['gdc'], resultado['gdh']],
-            theta=['GDC (Térmico)', 'GDH (Hongos)'],
-            fill='toself',
-            name='Valores Actuales',
-            line_color=CORPORATE_COLORS["verde_oscuro"]
-        ))
+            fig_radar.add_trace(go.Scatterpolar(
+                r=[resultado['gdc'], resultado['gdh']],
+                theta=['GDC (Térmico)', 'GDH (Hongos)'],
+                fill='toself',
+                name='Valores Actuales',
+                line_color=CORPORATE_COLORS["verde_oscuro"]
+            ))
         
-        # Valores medios históricos
-        gdc_medio = df_acidez_data['gdc_mean_in'].mean()
-        gdh_medio = df_acidez_data['gdh_mean_in'].mean()
+            # Valores medios históricos
+            gdc_medio = df_acidez_data['gdc_mean_in'].mean()
+            gdh_medio = df_acidez_data['gdh_mean_in'].mean()
         
-        fig_radar.add_trace(go.Scatterpolar(
-            r=[gdc_medio, gdh_medio],
-            theta=['GDC (Térmico)', 'GDH (Hongos)'],
-            fill='toself',
-            name='Valores Medios',
-            line_color=CORPORATE_COLORS["gris_neutro"]
-        ))
+            fig_radar.add_trace(go.Scatterpolar(
+                r=[gdc_medio, gdh_medio],
+                theta=['GDC (Térmico)', 'GDH (Hongos)'],
+                fill='toself',
+                name='Valores Medios',
+                line_color=CORPORATE_COLORS["gris_neutro"]
+            ))
         
-        fig_radar.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, max(resultado['gdc'], resultado['gdh'], gdc_medio, gdh_medio) * 1.2]
-                )),
-            showlegend=True,
-            title="Comparación con Valores Medios",
-            height=400
+            fig_radar.update_layout(
+                polar=dict(
+                    radialaxis=dict(
+                        visible=True,
+                        range=[0, max(resultado['gdc'], resultado['gdh'], gdc_medio, gdh_medio) * 1.2]
+                    )),
+                showlegend=True,
+                title="Comparación con Valores Medios",
+                height=400
+            )
+
+            return FigureCache.serializar(fig_dist), FigureCache.serializar(fig_radar)
+
+        # Dependen solo de las entradas del cálculo y las versiones: se comparten entre sesiones
+        fig_dist, fig_radar = ResultCache.obtener(
+            "acidez_graficos", (resultado['gdc'], resultado['gdh']), resultado['version'], figuras_analisis,
+            huella=lambda: ModelService.huella_acidez(ACIDEZ_DATA_FILE)
         )
-        
-        st.plotly_chart(fig_radar, use_container_width=True, key="radar_comp")
+
+        col1, col2 = st.columns(2)
     
-    # Tabla de resumen
-    st.subheader("📋 Resumen del Análisis")
+        with col1:
+            st.subheader("🎯 Posición en la Distribución")
+            FigureCache.mostrar(fig_dist)
     
-    col1, col2, col3, col4 = st.columns(4)
+        with col2:
+            st.subheader("📈 Comparación de Variables")
+            FigureCache.mostrar(fig_radar)
     
-    with col1:
-        st.metric(
-            "Acidez Predicha",
-            f"{resultado['predicha']:.2f} mg KOH/g",
-            f"{resultado['diferencia']:+.2f}"
-        )
+        # Tabla de resumen
+        st.subheader("📋 Resumen del Análisis")
     
-    with col2:
-        st.metric(
-            "Desviación",
-            f"{resultado['porcentaje']:+.1f}%",
-            "vs Media"
-        )
+        col1, col2, col3, col4 = st.columns(4)
     
-    with col3:
-        # Calcular percentil
-        percentil = (df_acidez_data['pct_oil_acidez_mean'] < resultado['predicha']).mean() * 100
-        st.metric(
-            "Percentil",
-            f"{percentil:.0f}%",
-            "de la distribución"
-        )
+        with col1:
+            st.metric(
+                "Acidez Predicha",
+                f"{resultado['predicha']:.2f} mg KOH/g",
+                f"{resultado['diferencia']:+.2f}"
+            )
+    
+        with col2:
+            st.metric(
+                "Desviación",
+                f"{resultado['porcentaje']:+.1f}%",
+                "vs Media"
+            )
+    
+        with col3:
+            # Calcular percentil
+            percentil = (df_acidez_data['pct_oil_acidez_mean'] < resultado['predicha']).mean() * 100
+            st.metric(
+                "Percentil",
+                f"{percentil:.0f}%",
+                "de la distribución"
+            )
     
-    with col4:
-        # Calcular riesgo
-        if resultado['predicha'] < 1.0:
-            riesgo = "Bajo"
-        elif resultado['predicha'] < 2.0:
-            riesgo = "Moderado"
-        else:
-            riesgo = "Alto"
+        with col4:
+            # Calcular riesgo
+            if resultado['predicha'] < 1.0:
+                riesgo = "Bajo"
+            elif resultado['predicha'] < 2.0:
+                riesgo = "Moderado"
+            else:
+                riesgo = "Alto"
         
-        st.metric(
-            "Nivel de Riesgo",
-            riesgo,
-            "Calidad"
+            st.metric(
+                "Nivel de Riesgo",
+                riesgo,
+                "Calidad"
+            )
+
+    # ===== SUPERFICIE DE RESPUESTA =====
+    if model is not None:
+        st.markdown("---")
+        st.header("🗺️ Superficie de Respuesta de Acidez")
+        st.caption("Acidez predicha por el modelo en todo el plano GDC × GDH (resolución de 0.1%). La línea punteada marca el límite de acidez y el marcador los valores ingresados en la calculadora.")
+        limite_superficie = st.number_input(
+            "Límite de acidez para el contorno (mg KOH/g)", 0.1, 10.0, ACIDEZ_MAXIMA, 0.1
         )
+        with st.spinner("Calculando superficie..."):
+            SurfaceDisplay.mostrar_superficie(
+                ModelService.get_acidez_model_version(), gdc_input, gdh_input, limite_superficie
+            )
 
-st.markdown("---")
+    st.markdown("---")
 
 
-# ===== SECCIÓN 1: EXPLICACIÓN DEL MODELO =====
-st.header("🔬 Explicación del Modelo de Acidez")
+    # ===== SECCIÓN 1: EXPLICACIÓN DEL MODELO =====
+    st.header("🔬 Explicación del Modelo de Acidez")
 
-# Explicación del modelo Random Forest
-import json
-try:
-    with open("models/artifacts/model_info_acidez.json", "r") as f:
-        model_info = json.load(f)
-    st.markdown("""
+    # Explicación del modelo Random Forest
+    try:
+        model_info = ModelService.load_model_info()
+        st.markdown("""
     Este modelo utiliza un **Random Forest Regressor**, un conjunto de árboles de decisión entrenados sobre los datos históricos de acidez y daño del grano.
     
     - **Tipo de modelo:** Árboles de decisión en ensamble (Random Forest)
@@ -337,44 +352,43 @@ try:
     
     El modelo aprende reglas a partir de los datos para predecir la acidez esperada según el daño observado. Puedes ver el árbol más representativo a continuación.
     """.format(
-        n_estimators=model_info['best_params']['n_estimators'],
-        max_depth=model_info['best_params']['max_depth'],
-        min_samples_leaf=model_info['best_params']['min_samples_leaf'],
-        min_samples_split=model_info['best_params']['min_samples_split'],
-        max_features=model_info['best_params']['max_features']
-    ))
-except Exception:
-    st.warning("No se pudo cargar la información del modelo.")
-
-# Mostrar reglas del árbol más representativo
-try:
-    with open("models/artifacts/tree_rules_acidez.txt", "r") as f:
-        tree_rules = f.read()
-    with st.expander("Ver árbol más representativo del modelo Random Forest"):
-        st.code(tree_rules, language="text")
-except FileNotFoundError:
-    st.warning("No se encontraron las reglas del árbol representativo. Ejecuta el entrenamiento para generarlas.")
-
-# ===== SECCIÓN 2: GRÁFICOS DE ACIDEZ =====
-st.header("📈 Análisis de Distribuciones de Datos")
-
-
-st.markdown("""
+            n_estimators=model_info['best_params']['n_estimators'],
+            max_depth=model_info['best_params']['max_depth'],
+            min_samples_leaf=model_info['best_params']['min_samples_leaf'],
+            min_samples_split=model_info['best_params']['min_samples_split'],
+            max_features=model_info['best_params']['max_features']
+        ))
+    except Exception:
+        st.warning("No se pudo cargar la información del modelo.")
+
+    # Mostrar reglas del árbol más representativo
+    try:
+        with open("models/artifacts/tree_rules_acidez.txt", "r") as f:
+            tree_rules = f.read()
+        with st.expander("Ver árbol más representativo del modelo Random Forest"):
+            st.code(tree_rules, language="text")
+    except FileNotFoundError:
+        st.warning("No se encontraron las reglas del árbol representativo. Ejecuta el entrenamiento para generarlas.")
+
+    # ===== SECCIÓN 2: GRÁFICOS DE ACIDEZ =====
+    st.header("📈 Análisis de Distribuciones de Datos")
+
+
+    st.markdown("""
 ### 
 
 A continuación se muestran las distribuciones de las variables relacionadas con la acidez del aceite, 
 basadas en datos reales de análisis de granos de soya:
 """)
 
-# Mostrar la imagen generada
-try:
-    # Leer el archivo HTML
-    with open("imagenes/subplot_distribuciones_acidez_oil.html", "r", encoding="utf-8") as f:
-        html_content = f.read()
-    
-    # Mostrar el gráfico HTML interactivo
-    st.components.v1.html(html_content, height=500)
-    st.markdown("""
+    # La figura se calcula (una vez por versión de los datos) solo cuando se abre la sección
+    if st.toggle("Mostrar distribuciones", key="mostrar_distribuciones_acidez"):
+        DistributionDisplay.mostrar_distribuciones(ACIDEZ_DATA_FILE, {
+            "gdc_mean_in": ("GDC - Daño Térmico (%)", CORPORATE_COLORS["verde_oscuro"]),
+            "gdh_mean_in": ("GDH - Daño por Hongos (%)", CORPORATE_COLORS["verde_claro"]),
+            "pct_oil_acidez_mean": ("Acidez del Aceite (mg KOH/g)", "#FF6B6B"),
+        }, "Distribuciones de Daño y Acidez", height=450)
+        st.markdown("""
     **Interpretación de las Distribuciones:**
     
     - **GDC (Daño Térmico)**: Muestra la distribución del daño térmico en los granos
@@ -382,40 +396,42 @@ try:
     - **Acidez del Aceite (%)**: Distribución de los valores de acidez medidos en el aceite extraído
    
     """)
-    
-except FileNotFoundError:
-    st.warning("⚠️ No se encontró el archivo HTML de distribuciones. Los gráficos de distribución no están disponibles.")
-
 
-       
 
-
-# ===== SECCIÓN 6.5: ANÁLISIS DEL MODELO ML =====
-if model is not None:
-    st.header("🔍 Análisis del Modelo de Machine Learning")
-    
-    col1, col2 = st.columns(2)
+    # ===== SECCIÓN 6.5: ANÁLISIS DEL MODELO ML =====
+    if model is not None:
+        st.header("🔍 Análisis del Modelo de Machine Learning")
     
-    with col1:
-        st.subheader("**Predicciones vs Valores Reales**")
-        st.caption("Gráfico de dispersión que muestra la relación entre los valores reales y predichos de acidez.")
-        components.html(open("imagenes/predicciones_vs_reales_acidez.html").read(), height=500)
-    
-    with col2:
-        st.subheader("**Análisis de Residuos**")
-        st.caption("Gráfico de residuos que muestra la diferencia entre valores reales y predichos.")
-        components.html(open("imagenes/residuos_acidez.html").read(), height=400)
+        # Diagnóstico en vivo sobre los datos actuales (compartido por versión de modelo y datos)
+        version_modelo = ModelService.get_acidez_model_version()
+        datos_diagnostico, huella_datos = DiagnosticsService.calcular_diagnostico(version_modelo)
+        st.caption(f"Calculado con la versión activa del modelo sobre las {len(datos_diagnostico):,} muestras actuales de `data_acidez.csv`; las diferencias son respecto a las métricas de test del entrenamiento.")
+        DiagnosticsDisplay.mostrar_metricas(
+            DiagnosticsService.calcular_metricas(datos_diagnostico["pct_oil_acidez_mean"], datos_diagnostico["predicha"]),
+            ModelService.load_model_metrics().get("test", {})
+        )
+
+        # Pestañas: solo se construye la figura de la pestaña seleccionada
+        vistas = {
+            "Predicciones vs Valores Reales": "predicciones",
+            "Distribución de Residuos": "distribucion_residuos",
+            "Residuos vs Variables": "residuos_variables",
+        }
+        pestaña = st.radio(
+            "Diagnóstico", list(vistas), horizontal=True, label_visibility="collapsed", key="pestaña_diagnostico_acidez"
+        )
+        DiagnosticsDisplay.mostrar_diagnostico(version_modelo, huella_datos, datos_diagnostico, vistas[pestaña])
     
-    # Gráficos SHAP
-    st.subheader("📊 Análisis SHAP - Importancia de Variables")
-    st.caption("Gráfico que muestra la importancia de cada variable en la predicción de acidez.")
-    st.image("imagenes/shap_importance_acidez.png", caption="SHAP Summary Plot - Acidez del Aceite")
+        # Gráficos SHAP
+        st.subheader("📊 Análisis SHAP - Importancia de Variables")
+        st.caption("Gráfico que muestra la importancia de cada variable en la predicción de acidez.")
+        st.image("imagenes/shap_importance_acidez.png", caption="SHAP Summary Plot - Acidez del Aceite")
 
-# ===== SECCIÓN 7: ANÁLISIS Y ARGUMENTACIÓN CIENTÍFICA =====
-st.header("🧪 Entendimiento de los Resultados en Base a la Literatura")
+    # ===== SECCIÓN 7: ANÁLISIS Y ARGUMENTACIÓN CIENTÍFICA =====
+    st.header("🧪 Entendimiento de los Resultados en Base a la Literatura")
 
-st.subheader("📚 Resumen Bibliográfico")
-st.markdown('''
+    st.subheader("📚 Resumen Bibliográfico")
+    st.markdown('''
 La **acidez del aceite de soya** es un parámetro clave para evaluar su calidad, estabilidad y aptitud para consumo humano y animal. Numerosas investigaciones científicas han evidenciado que:
 
 - El **daño en el grano de soya**, ya sea **físico, térmico o microbiológico**, acelera la **hidrólisis de triglicéridos**, lo cual libera **ácidos grasos libres** que incrementan la acidez.
@@ -430,8 +446,8 @@ La **acidez del aceite de soya** es un parámetro clave para evaluar su calidad,
 - J. Rios et al., "Efecto del Almacenamiento y la Humedad sobre la Calidad del Aceite de Soya", *Revista Ciencias Agrícolas*, 2017.
 ''')
 
-st.subheader("📈 Resultados del Modelo")
-st.markdown(f'''
+    st.subheader("📈 Resultados del Modelo")
+    st.markdown(f'''
 Se evaluó una base de datos experimental con las siguientes variables:
 
 - **GDC**: Daño térmico del grano (en %).
@@ -446,8 +462,8 @@ El análisis mostró una **correlación positiva consistente** entre los niveles
 Este resultado evidencia un **nivel significativo de deterioro** en la calidad del aceite producido actualmente.
 ''')
 
-st.subheader("🔎 Interpretación Técnica y Recomendaciones")
-st.markdown('''
+    st.subheader("🔎 Interpretación Técnica y Recomendaciones")
+    st.markdown('''
 Si bien es posible construir **modelos estadísticos o de machine learning más avanzados** para predecir la acidez, estos **no resuelven el problema de fondo**. El modelo puede alertar o estimar la acidez, pero:
 
 > **Una predicción más precisa no mejora la calidad del producto.**
@@ -462,6 +478,6 @@ Por lo tanto, se requiere una **intervención directa en la calidad de la materi
 📌 *Conclusión: mejorar el modelo es útil como herramienta de monitoreo, pero **la solución real está en cambiar las condiciones de entrada y del proceso productivo.***
 ''')
 
-# Footer
-st.markdown("---")
-st.markdown("*Modelo de Acidez del Aceite - Soya Insights - Okuo-Analytics - Juan David Rincón *") 
\ No newline at end of file
+    # Footer
+    st.markdown("---")
+    st.markdown("*Modelo de Acidez del Aceite - Soya Insights - Okuo-Analytics - Juan David Rincón *") 
@@ -4,8 +4,8 @@ import plotly.graph_objects as go
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-import streamlit.components.v1 as components
-import os
+from src.config.constants import PROTEINA_DATA_FILE, PROTEINA_VS_GDT_FIGURA_FILE
+from src.components import FigureCache, DistributionDisplay, ProfilingDisplay
 
 # Colores corporativos
 CORPORATE_COLORS = {
@@ -21,78 +21,80 @@ st.set_page_config(
     layout="wide"
 )
 
-st.title("🥜 Modelo de Cambio de Proteína Soluble en Función del Daño del Grano")
-st.markdown("---")
+# Duración del rerun completo (métricas Prometheus) y perfilado bajo demanda
+with ProfilingDisplay.pagina("modelo_proteina"):
+    st.title("🥜 Modelo de Cambio de Proteína Soluble en Función del Daño del Grano")
+    st.markdown("---")
 
 
 
-# Calcular datos para gráficos
-degradacion_max = 120
-degradaciones = np.arange(0, degradacion_max/100 + 0.01, 0.01)
-#degradaciones = np.arange(0, degradacion_max + 0.01, 0.5)
-proteinas = 70.828 - 0.225 * degradaciones
+    # Calcular datos para gráficos
+    degradacion_max = 120
+    degradaciones = np.arange(0, degradacion_max/100 + 0.01, 0.01)
+    #degradaciones = np.arange(0, degradacion_max + 0.01, 0.5)
+    proteinas = 70.828 - 0.225 * degradaciones
 
-# Crear DataFrame para análisis
-df_proteina = pd.DataFrame({
-    'Degradación (%)': degradaciones,
-    'Proteína (%)': proteinas,
-    'Pérdida Proteína (%)': 70.828 - proteinas
-})
+    # Crear DataFrame para análisis
+    df_proteina = pd.DataFrame({
+        'Degradación (%)': degradaciones,
+        'Proteína (%)': proteinas,
+        'Pérdida Proteína (%)': 70.828 - proteinas
+    })
 
 
-# ===== SECCIÓN 3: CALCULADORA INTERACTIVA =====
-st.header("🧮 Calculadora de Proteína")
+    # ===== SECCIÓN 3: CALCULADORA INTERACTIVA =====
+    st.header("🧮 Calculadora de Proteína")
 
-col1, col2 = st.columns(2)
+    col1, col2 = st.columns(2)
 
-with col1:
-    degradacion_calc = st.slider(
-        "Degradación del grano (%)",
-        min_value=0.0,
-        max_value=100.0,
-        value=30.0,
-        step=5.0,
-        help="Selecciona el nivel de degradación para calcular la proteína"
-    )
+    with col1:
+        degradacion_calc = st.slider(
+            "Degradación del grano (%)",
+            min_value=0.0,
+            max_value=100.0,
+            value=30.0,
+            step=5.0,
+            help="Selecciona el nivel de degradación para calcular la proteína"
+        )
     
-    # Usar la ecuación lineal para el cálculo
-    proteina_calculada = 70.828 - 0.225 * degradacion_calc
-    perdida_calculada = 70.828 - proteina_calculada
+        # Usar la ecuación lineal para el cálculo
+        proteina_calculada = 70.828 - 0.225 * degradacion_calc
+        perdida_calculada = 70.828 - proteina_calculada
     
-    st.metric(
-        label="Proteína Calculada",
-        value=f"{proteina_calculada:.1f}%",
-        delta=f"-{perdida_calculada:.1f}%"
-    )
-    with st.expander("ℹ️ Detalles del cálculo de proteína"):
-        st.markdown(f"""
+        st.metric(
+            label="Proteína Calculada",
+            value=f"{proteina_calculada:.1f}%",
+            delta=f"-{perdida_calculada:.1f}%"
+        )
+        with st.expander("ℹ️ Detalles del cálculo de proteína"):
+            st.markdown(f"""
         **Fórmula utilizada:**
          - **P**(Degradación) = 70.828 - 0.225 × Degradación
          - **Cálculo actual:** 70.828 - 0.225 × {degradacion_calc} = {proteina_calculada:.1f}%
         - **R²** = 0.674
         """)
-        # Si tienes el valor de R², muéstralo aquí
-        try:
-            st.markdown(f"**R² del modelo:** {r2_proteina:.3f}")
-        except NameError:
-            pass
-
-with col2:
-    # Semáforo según el rango de proteína soluble (ecuación lineal)
-    if proteina_calculada > 80:
-        st.success("🟥 > 80% Torta Soya Cruda")
-    elif 75 <= proteina_calculada <= 80:
-        st.warning("🟩 Entre 75% y 80% Torta Soya Cocida")
-    else:
-        st.error("🟨 < 75% Torta Soya Muy Cocida")
+            # Si tienes el valor de R², muéstralo aquí
+            try:
+                st.markdown(f"**R² del modelo:** {r2_proteina:.3f}")
+            except NameError:
+                pass
 
-# ===== SECCIÓN 1: EXPLICACIÓN DEL MODELO =====
-st.header("🔬 Explicación del Modelo de Proteína")
+    with col2:
+        # Semáforo según el rango de proteína soluble (ecuación lineal)
+        if proteina_calculada > 80:
+            st.success("🟥 > 80% Torta Soya Cruda")
+        elif 75 <= proteina_calculada <= 80:
+            st.warning("🟩 Entre 75% y 80% Torta Soya Cocida")
+        else:
+            st.error("🟨 < 75% Torta Soya Muy Cocida")
 
-col1, col2 = st.columns([2, 1])
+    # ===== SECCIÓN 1: EXPLICACIÓN DEL MODELO =====
+    st.header("🔬 Explicación del Modelo de Proteína")
 
-with col1:
-    st.markdown("""
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.markdown("""
 
         El presente modelo busca describir el comportamiento de la **proteína soluble (PS)** en la torta de soya como función del **nivel de daño del grano (D)**. Se utiliza una formulación lineal simple, que representa una primera aproximación fisiológica y técnica al fenómeno observado:
 
@@ -137,8 +139,8 @@ with col1:
         ---
     """)
 
-with col2:
-    st.info(f"""
+    with col2:
+        st.info(f"""
     **Parámetros generales de la Torta de Soya:**
     
     - **Proteína Soluble Promedio:** {63.2}%
@@ -148,67 +150,68 @@ with col2:
     - **Humedad:** {13.14}%
     """)
 
-# ===== SECCIÓN 2: DISTRIBUCIONES DE DATOS =====
-st.header("📊 Distribuciones de Datos")
+    # ===== SECCIÓN 2: DISTRIBUCIONES DE DATOS =====
+    st.header("📊 Distribuciones de Datos")
 
-# Definir ruta de gráficos
-plots_path = "imagenes"
-
-st.markdown("""
+    st.markdown("""
 A continuación se muestran las distribuciones de proteína soluble y daño total de grano basadas en datos reales de laboratorio.
 """)
 
-# Distribuciones en 2 columnas
-col1, col2 = st.columns(2)
-
-with col1:
-    st.subheader("**Distribución de Soluble Protein (%)**")
-    st.caption("Histograma de la distribución de proteína soluble en las muestras. La línea vertical indica el valor promedio observado.")
-    components.html(open(os.path.join(plots_path, "soluble_protein_distribution.html")).read(), height=420)
-
-with col2:
-    st.subheader("**Distribución de Total Grain Damage (%)**")
-    st.caption("Histograma de la distribución del daño total de grano en las muestras. La línea vertical indica el valor promedio observado.")
-    components.html(open(os.path.join(plots_path, "grain_damage_distribution.html")).read(), height=420)
-
-
-# ===== SECCIÓN 5: GRÁFICA DE DISPERSIÓN DE PROTEÍNA SOLUBLE VS DAÑO TOTAL DE GRANO =====
-st.header("📈 Dispersión de Proteína Soluble vs Daño Total de Grano (Datos Reales)")
-st.caption("Esta gráfica muestra la dispersión real de los datos de laboratorio entre el daño total del grano y el porcentaje de proteína soluble. Cada punto representa una muestra real.")
-components.html(open(os.path.join(plots_path, "soluble_protein_vs_grain_damage.html")).read(), height=520)
-
-# ===== SECCIÓN 7: TABLA DE RESULTADOS =====
-st.header("📋 Resultados Detallados")
-
-# Crear tabla con puntos clave de degradación
-puntos_degradacion = [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 99]
-resultados_proteina = []
-for deg in puntos_degradacion:
-    proteina = 70.828 - 0.225 * deg
-    perdida = 70.828 - proteina
-    if proteina > 80:
-        calidad = "Torta Soya Cruda (>80%)"
-        color = "🟥"
-    elif 75 <= proteina <= 80:
-        calidad = "Torta Soya Cocida (75-80%)"
-        color = "🟩"
+    # Pestañas: solo se calcula la figura de la pestaña seleccionada (histograma y KDE binados en el servidor)
+    pestaña = st.radio(
+        "Distribución", ["Distribución de Soluble Protein (%)", "Distribución de Total Grain Damage (%)"],
+        horizontal=True, label_visibility="collapsed", key="pestaña_distribuciones_proteina"
+    )
+    if pestaña == "Distribución de Soluble Protein (%)":
+        st.caption("Histograma de la distribución de proteína soluble en las muestras. La línea vertical indica el valor promedio observado y la curva la densidad estimada.")
+        DistributionDisplay.mostrar_distribuciones(PROTEINA_DATA_FILE, {
+            "pct_soluble_protein_quim": ("Proteína soluble (%)", CORPORATE_COLORS["verde_claro"])
+        }, "Distribución de Proteína Soluble")
     else:
-        calidad = "Torta Soya Muy Cocida (<75%)"
-        color = "🟨"
-    resultados_proteina.append({
-        'Degradación (%)': f"{deg:.0f}%",
-        'Proteína (%)': f"{proteina:.1f}%",
-        'Pérdida (%)': f"-{perdida:.1f}%",
-        'Calidad': f"{color} {calidad}"
-    })
-df_resultados = pd.DataFrame(resultados_proteina)
-st.dataframe(df_resultados, use_container_width=True)
-
-# ===== SECCIÓN: ANÁLISIS Y ARGUMENTACIÓN CIENTÍFICA =====
-st.header("🧪 Análisis del Comportamiento de la Proteína Soluble en Función del Daño del Grano de Soya")
-
-st.subheader("📚 Resumen desde la literatura")
-st.markdown('''
+        st.caption("Histograma de la distribución del daño total de grano en las muestras. La línea vertical indica el valor promedio observado y la curva la densidad estimada.")
+        DistributionDisplay.mostrar_distribuciones(PROTEINA_DATA_FILE, {
+            "GDT": ("GDT (%)", CORPORATE_COLORS["verde_claro"])
+        }, "Distribución del Daño Total del Grano")
+
+
+    # ===== SECCIÓN 5: GRÁFICA DE DISPERSIÓN DE PROTEÍNA SOLUBLE VS DAÑO TOTAL DE GRANO =====
+    st.header("📈 Dispersión de Proteína Soluble vs Daño Total de Grano (Datos Reales)")
+    st.caption("Esta gráfica muestra la dispersión real de los datos de laboratorio entre el daño total del grano y el porcentaje de proteína soluble. Cada punto representa una muestra real.")
+    if st.toggle("Mostrar dispersión", key="mostrar_dispersion_proteina"):
+        FigureCache.mostrar_archivo(PROTEINA_VS_GDT_FIGURA_FILE)
+
+    # ===== SECCIÓN 7: TABLA DE RESULTADOS =====
+    st.header("📋 Resultados Detallados")
+
+    # Crear tabla con puntos clave de degradación
+    puntos_degradacion = [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 99]
+    resultados_proteina = []
+    for deg in puntos_degradacion:
+        proteina = 70.828 - 0.225 * deg
+        perdida = 70.828 - proteina
+        if proteina > 80:
+            calidad = "Torta Soya Cruda (>80%)"
+            color = "🟥"
+        elif 75 <= proteina <= 80:
+            calidad = "Torta Soya Cocida (75-80%)"
+            color = "🟩"
+        else:
+            calidad = "Torta Soya Muy Cocida (<75%)"
+            color = "🟨"
+        resultados_proteina.append({
+            'Degradación (%)': f"{deg:.0f}%",
+            'Proteína (%)': f"{proteina:.1f}%",
+            'Pérdida (%)': f"-{perdida:.1f}%",
+            'Calidad': f"{color} {calidad}"
+        })
+    df_resultados = pd.DataFrame(resultados_proteina)
+    st.dataframe(df_resultados, use_container_width=True)
+
+    # ===== SECCIÓN: ANÁLISIS Y ARGUMENTACIÓN CIENTÍFICA =====
+    st.header("🧪 Análisis del Comportamiento de la Proteína Soluble en Función del Daño del Grano de Soya")
+
+    st.subheader("📚 Resumen desde la literatura")
+    st.markdown('''
 La proteína soluble (PS) en la torta de soya es un indicador clave de la calidad nutricional y del procesamiento térmico del grano. Diversos estudios han demostrado que:
 
 - El **daño del grano de soya** (ya sea físico o térmico) provoca **desnaturalización de proteínas** y reduce su solubilidad.
@@ -219,8 +222,8 @@ La proteína soluble (PS) en la torta de soya es un indicador clave de la calida
 
 
 
-st.subheader("🔎 Interpretación técnica")
-st.markdown('''
+    st.subheader("🔎 Interpretación técnica")
+    st.markdown('''
 - Existe una **relación negativa moderada y estadísticamente significativa**: a mayor daño del grano, menor proporción de proteína soluble.
 - Esto es consistente con procesos de **desnaturalización térmica** y formación de agregados insolubles.
 - El modelo permite anticipar posibles pérdidas en la calidad funcional de la torta según el nivel de daño observado.
@@ -228,9 +231,9 @@ st.markdown('''
 
 
 
-st.subheader("🧮 Modelo Avanzado Propuesto")
+    st.subheader("🧮 Modelo Avanzado Propuesto")
 
-st.markdown(r'''
+    st.markdown(r'''
 Un modelo avanzado en pos de mejorar y entender la predecir de proteína soluble (PS) puede incorporar múltiples variables críticas del proceso y la materia prima, permitiendo capturar mejor la complejidad del fenómeno:
 
 $$
@@ -267,8 +270,8 @@ $$
 Este modelo permitiría anticipar la calidad funcional de la torta de soya considerando no solo el daño del grano, sino también las condiciones térmicas, estructurales y de almacenamiento, así como la variabilidad genética y de origen.
 ''')
 
-st.subheader("✅ Conclusión")
-st.markdown('''
+    st.subheader("✅ Conclusión")
+    st.markdown('''
 > El análisis evidencia una **relación negativa significativa** entre el daño total del grano (GDT) y la proteína soluble (PS) en la torta de soya. Este comportamiento sugiere que a mayor daño —probablemente por procesos térmicos o físicos agresivos— se reduce la solubilidad de la proteína, afectando su valor nutricional y funcional.
 >
 > El modelo lineal ajustado:
@@ -284,6 +287,6 @@ st.markdown('''
 > Se recomienda avanzar hacia un **modelo multivariable integrado**, que permita ajustar por estos factores y mejorar tanto la capacidad predictiva como la interpretación técnica del proceso.
 ''')
 
-# Footer
-st.markdown("---")
-st.markdown("*Modelo de Proteína Soluble - Soya Insights - Okuo-Analytics - Juan David Rincón *") 
\ No newline at end of file
+    # Footer
+    st.markdown("---")
+    st.markdown("*Modelo de Proteína Soluble - Soya Insights - Okuo-Analytics - Juan David Rincón *") 
@@ -0,0 +1,133 @@
+import streamlit as st
+import plotly.graph_objects as go
+import numpy as np
+
+from src.config.constants import (
+    ACIDEZ_MAXIMA, PROTEINA_MINIMA, MESES_ALMACENAMIENTO, VIDA_UTIL_MALLA, CORPORATE_COLORS
+)
+from src.services import ModelService, ShelfLifeService
+from src.components import FigureCache, ProfilingDisplay
+
+st.set_page_config(
+    page_title="Vida Útil en Almacenamiento - Soya Insights",
+    page_icon="⏳",
+    layout="wide"
+)
+
+# Duración del rerun completo (métricas Prometheus) y perfilado bajo demanda
+with ProfilingDisplay.pagina("vida_util"):
+    st.title("⏳ Vida Útil del Grano en Almacenamiento")
+    st.markdown("""
+¿Cuánto tiempo puede permanecer un lote almacenado antes de que la acidez supere el límite
+o la proteína soluble caiga por debajo del mínimo? Esta página resuelve la pregunta inversa
+del simulador de almacenamiento: dado el daño inicial y las condiciones, retorna el primer
+mes de incumplimiento.
+""")
+    st.markdown("---")
+
+    # Sidebar: condiciones del lote y límites de especificación
+    st.sidebar.header("Condiciones del Lote")
+    temperatura = st.sidebar.slider("Temperatura (°C)", 10.0, 40.0, 25.0, 0.5)
+    humedad = st.sidebar.slider("Humedad (%)", 5.0, 25.0, 13.0, 0.5)
+    gdc_ini = st.sidebar.slider("GDC inicial (%)", 0.0, 30.0, 5.0, 0.1)
+    gdh_ini = st.sidebar.slider("GDH inicial (%)", 0.0, 15.0, 2.0, 0.1)
+
+    st.sidebar.subheader("Límites de Especificación")
+    acidez_maxima = st.sidebar.number_input("Acidez máxima (mg KOH/g)", 0.1, 10.0, ACIDEZ_MAXIMA, 0.1)
+    proteina_minima = st.sidebar.number_input("Proteína mínima (%)", 10.0, 80.0, PROTEINA_MINIMA, 1.0)
+
+    acidez_model = ModelService.load_acidez_model()
+    proteina_model = ModelService.load_proteina_model()
+    tabla = ShelfLifeService.get_tabla(
+        ModelService.get_acidez_model_version(), acidez_maxima, proteina_minima
+    )
+
+
+    def formato_meses(meses):
+        """Texto legible para meses hasta incumplimiento"""
+        if np.isinf(meses):
+            return f"> {MESES_ALMACENAMIENTO} meses"
+        return f"{meses:.1f} meses"
+
+
+    # ===== CALCULADORA DEL LOTE =====
+    st.header("🧮 Vida Útil del Lote")
+
+    # Cálculo exacto (sin cuantizar) para el lote individual
+    meses_acidez, meses_proteina = ShelfLifeService.resolver_vida_util(
+        acidez_model, proteina_model, temperatura, humedad, gdc_ini, gdh_ini,
+        acidez_maxima=acidez_maxima, proteina_minima=proteina_minima
+    )
+    meses_acidez, meses_proteina = float(meses_acidez[0]), float(meses_proteina[0])
+    vida_util = min(meses_acidez, meses_proteina)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Vida Útil", formato_meses(vida_util))
+    with col2:
+        st.metric(f"Acidez > {acidez_maxima:g} mg KOH/g", formato_meses(meses_acidez))
+    with col3:
+        st.metric(f"Proteína < {proteina_minima:g}%", formato_meses(meses_proteina))
+
+    if vida_util == 0:
+        st.error("🚨 El lote ya está fuera de especificación con el daño inicial indicado.")
+    elif np.isinf(vida_util):
+        st.success(f"✅ El lote se mantiene en especificación durante los {MESES_ALMACENAMIENTO} meses simulados.")
+    elif vida_util < 12:
+        st.warning(f"⚠️ Planificar la salida del lote antes de {vida_util:.1f} meses.")
+    else:
+        st.success(f"✅ El lote puede almacenarse hasta {vida_util:.1f} meses.")
+
+    # ===== MAPA DE VIDA ÚTIL =====
+    st.header("🗺️ Vida Útil según Condiciones de Almacenamiento")
+    st.caption("Vida útil del lote para cada combinación de temperatura y humedad de la malla cuantizada. Las celdas ya consultadas por cualquier sesión se leen de la tabla compartida y las nuevas se resuelven en un solo lote vectorizado.")
+
+    temp_min, temp_max, temp_paso = VIDA_UTIL_MALLA["temperatura"]
+    hum_min, hum_max, hum_paso = VIDA_UTIL_MALLA["humedad"]
+    temperaturas = np.arange(temp_min, temp_max + temp_paso / 2, temp_paso)
+    humedades = np.arange(hum_min, hum_max + hum_paso / 2, hum_paso)
+    tt, hh = np.meshgrid(temperaturas, humedades, indexing="ij")
+
+    vida_malla = ShelfLifeService.calcular_vida_util(tabla, tt, hh, gdc_ini, gdh_ini)["vida_util"]
+    vida_malla = np.minimum(vida_malla.to_numpy(), MESES_ALMACENAMIENTO).reshape(tt.shape)
+
+    fig_mapa = go.Figure(go.Heatmap(
+        x=humedades,
+        y=temperaturas,
+        z=vida_malla.round(1),
+        colorscale=[[0, "#FF6B6B"], [0.5, CORPORATE_COLORS["verde_claro"]], [1, CORPORATE_COLORS["verde_oscuro"]]],
+        zmin=0,
+        zmax=MESES_ALMACENAMIENTO,
+        colorbar=dict(title="Meses"),
+        hovertemplate='Humedad: %{x:.1f}%<br>Temperatura: %{y:.1f} °C<br>Vida útil: %{z:.1f} meses<extra></extra>'
+    ))
+    fig_mapa.add_trace(go.Scatter(
+        x=[humedad], y=[temperatura], mode='markers', name='Lote actual',
+        marker=dict(color='white', size=14, line=dict(color='black', width=2))
+    ))
+    fig_mapa.update_layout(
+        title=f"Vida Útil (meses) con GDC inicial {gdc_ini:.1f}% y GDH inicial {gdh_ini:.1f}%",
+        xaxis_title="Humedad (%)",
+        yaxis_title="Temperatura (°C)",
+        height=550,
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    FigureCache.mostrar_figura(fig_mapa)
+
+    with st.expander("ℹ️ Método de Cálculo"):
+        st.markdown(f"""
+    - **Horquillado:** se evalúan todos los lotes a la vez sobre una malla de tiempo fina y se
+      localiza el primer intervalo en el que la acidez predicha supera {acidez_maxima:g} mg KOH/g
+      (o la proteína cae bajo {proteina_minima:g}%).
+    - **Refinamiento:** el intervalo se refina por bisección vectorizada hasta una resolución de horas.
+    - **Tabla cuantizada:** las condiciones se ajustan a la malla (temperatura cada {temp_paso:g} °C,
+      humedad cada {hum_paso:g}%, daño inicial cada {VIDA_UTIL_MALLA['gdc_ini'][2]:g}%) y los resultados
+      se guardan para todas las sesiones. Celdas calculadas: {tabla.celdas_calculadas:,}.
+    - **Validez:** mismo rango que el simulador (0-{MESES_ALMACENAMIENTO} meses); excursiones de acidez
+      más cortas que el paso de la malla pueden pasar inadvertidas.
+    """)
+
+    # Footer
+    st.markdown("---")
+    st.markdown("*Vida Útil en Almacenamiento - Soya Insights - Okuo-Analytics - Juan David Rincón *")
@@ -0,0 +1,218 @@
+import streamlit as st
+import plotly.graph_objects as go
+import pandas as pd
+import numpy as np
+
+from src.config.constants import (
+    ACIDEZ_MAXIMA, PROTEINA_MINIMA, GDT_EXCELENTE, GDT_MODERADO, LOTES_COLUMNAS, LOTES_BLOQUE,
+    CLASES_CALIDAD, CORPORATE_COLORS
+)
+from src.services import ModelService, ScoringService, EconomicService
+from src.components import FigureCache, ProfilingDisplay
+from src.utils import PresupuestoMemoria
+
+st.set_page_config(
+    page_title="Evaluación de Lotes - Soya Insights",
+    page_icon="📦",
+    layout="wide"
+)
+
+# Duración del rerun completo (métricas Prometheus) y perfilado bajo demanda
+with ProfilingDisplay.pagina("evaluacion_lotes"):
+    st.title("📦 Evaluación Masiva de Lotes")
+    st.markdown(f"""
+Cargue el inventario de silos y camiones en CSV para evaluar todos los lotes a la vez: acidez
+predicha, proteína soluble, impacto en productos derivados y clase de calidad por GDT
+(Excelente < {GDT_EXCELENTE:g}% ≤ Moderada < {GDT_MODERADO:g}% ≤ Crítica).
+""")
+    st.markdown("---")
+
+    COLORES_CLASE = {
+        "Excelente": CORPORATE_COLORS["verde_oscuro"],
+        "Moderada": "#FFA500",
+        "Crítica": "#FF6B6B",
+    }
+
+    # Sidebar: límites de especificación
+    st.sidebar.header("Límites de Especificación")
+    acidez_maxima = st.sidebar.number_input("Acidez máxima (mg KOH/g)", 0.1, 10.0, ACIDEZ_MAXIMA, 0.1)
+    proteina_minima = st.sidebar.number_input("Proteína mínima (%)", 10.0, 80.0, PROTEINA_MINIMA, 1.0)
+
+    # ===== CARGA DEL INVENTARIO =====
+    st.header("📤 Inventario")
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        archivo = st.file_uploader("Archivo CSV de inventario", type=["csv"])
+    with col2:
+        plantilla = pd.DataFrame({"lote": ["SILO-01", "CAMION-17"], "gdc": [12.5, 30.2], "gdh": [3.1, 8.4]})
+        st.download_button(
+            "📄 Descargar plantilla", plantilla.to_csv(index=False).encode("utf-8"),
+            file_name="plantilla_inventario.csv", mime="text/csv"
+        )
+    st.caption(
+        "Columnas requeridas: GDC y GDH en %. "
+        f"Nombres aceptados: {', '.join(LOTES_COLUMNAS['gdc'])} / {', '.join(LOTES_COLUMNAS['gdh'])}. "
+        "Columnas opcionales: identificación (" + ", ".join(LOTES_COLUMNAS['lote']) + ") "
+        "y toneladas (" + ", ".join(LOTES_COLUMNAS['toneladas']) + ")."
+    )
+
+    if archivo is None:
+        st.info("💡 Cargue un inventario para iniciar la evaluación.")
+        st.stop()
+
+    acidez_model = ModelService.load_acidez_model()
+    proteina_model = ModelService.load_proteina_model()
+
+    # El resultado se conserva mientras no cambie el archivo, el modelo o los límites, en un cache
+    # acotado por el presupuesto de memoria (no en la sesión): si se desaloja, se vuelve a evaluar
+    clave = (archivo.file_id, ModelService.get_acidez_model_version(), acidez_maxima, proteina_minima)
+    evaluaciones = PresupuestoMemoria.registro("evaluacion_lotes")
+    evaluacion = evaluaciones.obtener(clave)
+    if evaluacion is None:
+        try:
+            inventario = ScoringService.normalizar_inventario(pd.read_csv(archivo))
+        except (ValueError, pd.errors.ParserError, UnicodeDecodeError) as e:
+            st.error(f"Error leyendo el inventario: {e}")
+            st.stop()
+
+        bloques = []
+        conteo = 0
+        progreso = st.progress(0.0, text="Evaluando lotes...")
+        parcial = st.empty()
+        for bloque in ScoringService.evaluar_por_bloques(
+            inventario, acidez_model, proteina_model, LOTES_BLOQUE,
+            acidez_maxima=acidez_maxima, proteina_minima=proteina_minima
+        ):
+            bloques.append(bloque)
+            evaluados = sum(len(b) for b in bloques)
+            progreso.progress(evaluados / len(inventario), text=f"Evaluados {evaluados:,} de {len(inventario):,} lotes")
+            conteo = conteo + ScoringService.resumir_clases(bloque)["lotes"]
+            if len(bloques) > 1:
+                parcial.dataframe(conteo.rename("lotes evaluados"), use_container_width=True)
+        progreso.empty()
+        parcial.empty()
+        resultado = pd.concat(bloques) if bloques else ScoringService.evaluar_lotes(
+            inventario, acidez_model, proteina_model,
+            acidez_maxima=acidez_maxima, proteina_minima=proteina_minima
+        )
+        evaluacion = evaluaciones.guardar(clave, (resultado, ScoringService.exportar_csv(resultado)))
+
+    resultado, resultado_csv = evaluacion
+    fuera_acidez = ~resultado["cumple_acidez"].fillna(True)
+    fuera_proteina = ~resultado["cumple_proteina"].fillna(True)
+
+    # ===== RESUMEN =====
+    st.header("📊 Resumen del Inventario")
+    resumen = ScoringService.resumir_clases(resultado)
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Lotes Evaluados", f"{len(resultado):,}")
+    with col2:
+        st.metric("GDT Promedio", f"{resultado['gdt'].mean():.1f}%")
+    with col3:
+        st.metric(f"Acidez > {acidez_maxima:g}", f"{fuera_acidez.sum():,}")
+    with col4:
+        st.metric(f"Proteína < {proteina_minima:g}%", f"{fuera_proteina.sum():,}")
+
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        st.dataframe(resumen.style.format({"porcentaje": "{:.1f}%"}), use_container_width=True)
+    with col2:
+        fig_clases = go.Figure(go.Bar(
+            x=list(CLASES_CALIDAD),
+            y=resumen["lotes"],
+            marker_color=[COLORES_CLASE[clase] for clase in CLASES_CALIDAD],
+            text=resumen["lotes"],
+            textposition="auto"
+        ))
+        fig_clases.update_layout(
+            title="Lotes por Clase de Calidad",
+            yaxis_title="Lotes",
+            height=300,
+            margin=dict(t=40, b=20),
+            plot_bgcolor='white',
+            paper_bgcolor='white'
+        )
+        FigureCache.mostrar_figura(fig_clases)
+
+    sin_datos = resultado["clase_calidad"].isna().sum()
+    if sin_datos:
+        st.warning(f"⚠️ {sin_datos:,} lotes sin GDC o GDH no fueron evaluados.")
+
+    # ===== RESULTADOS =====
+    st.header("📋 Resultados por Lote")
+    solo_criticos = st.checkbox("Mostrar solo lotes en clase Crítica o fuera de especificación")
+    vista = resultado
+    if solo_criticos:
+        vista = resultado[(resultado["clase_calidad"] == "Crítica") | fuera_acidez | fuera_proteina]
+    st.dataframe(vista, use_container_width=True, hide_index=True)
+
+    st.download_button(
+        "📥 Descargar resultados (CSV)", resultado_csv,
+        file_name="evaluacion_lotes.csv", mime="text/csv"
+    )
+
+    # ===== PÉRDIDAS ECONÓMICAS =====
+    st.header("💰 Pérdidas Económicas")
+    st.caption("Valor perdido por la degradación de cada producto frente a grano sin daño, según las toneladas del lote, el rendimiento de la planta y el escenario de precios (USD/ton de producto).")
+
+    if "toneladas" in resultado.columns:
+        toneladas = resultado["toneladas"].to_numpy(dtype=float)
+    else:
+        toneladas_lote = st.number_input("Toneladas por lote (el archivo no incluye toneladas)", 0.1, 10_000.0, 30.0, 1.0)
+        toneladas = np.full(len(resultado), toneladas_lote)
+
+    precios = st.data_editor(EconomicService.escenarios_precios(), use_container_width=True, num_rows="dynamic")
+    precios = precios.dropna()
+    if precios.empty:
+        st.warning("⚠️ Defina al menos un escenario de precios completo.")
+        st.stop()
+
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        filas_pivote = st.radio("Filas", ["Clase de calidad", "Escenario"])
+        if filas_pivote == "Clase de calidad":
+            escenario = st.selectbox("Escenario", list(precios.index), index=min(1, len(precios) - 1))
+
+    perdidas = EconomicService.resumir_perdidas(
+        toneladas, resultado["gdt"].to_numpy(dtype=float), precios,
+        resultado["clase_calidad"].fillna("Sin datos").to_numpy()
+    )
+    totales = perdidas.groupby("escenario", sort=False)["perdida_usd"].sum()
+    if filas_pivote == "Clase de calidad":
+        perdidas = perdidas[perdidas["escenario"] == escenario]
+        pivote = perdidas.pivot_table(index="grupo", columns="producto", values="perdida_usd", aggfunc="sum")
+        pivote = pivote.reindex([c for c in CLASES_CALIDAD if c in pivote.index] + [c for c in pivote.index if c not in CLASES_CALIDAD])
+    else:
+        pivote = perdidas.pivot_table(index="escenario", columns="producto", values="perdida_usd", aggfunc="sum", sort=False)
+    pivote["Total"] = pivote.sum(axis=1)
+
+    with col2:
+        st.dataframe(pivote.style.format("${:,.0f}"), use_container_width=True)
+
+    fig_perdidas = go.Figure()
+    for producto in pivote.columns.drop("Total"):
+        fig_perdidas.add_trace(go.Bar(x=pivote.index, y=pivote[producto], name=producto))
+    fig_perdidas.update_layout(
+        barmode="stack",
+        title="Pérdida Económica por Producto (USD)",
+        yaxis_title="USD",
+        height=400,
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    FigureCache.mostrar_figura(fig_perdidas)
+
+    # Pérdida total y por tonelada de cada escenario
+    toneladas_totales = np.nansum(toneladas[resultado["gdt"].notna().to_numpy()])
+    for col, (nombre, total) in zip(st.columns(len(totales)), totales.items()):
+        with col:
+            st.metric(
+                f"Escenario {nombre}", f"${total:,.0f}",
+                f"{total / toneladas_totales:,.1f} USD/ton" if toneladas_totales > 0 else None,
+                delta_color="off"
+            )
+
+    # Footer
+    st.markdown("---")
+    st.markdown("*Evaluación de Lotes - Soya Insights - Okuo-Analytics - Juan David Rincón *")
@@ -1,4 +1,10 @@
 # Componentes de la aplicación
 from .metrics_display import MetricsDisplay
+from .surface_display import SurfaceDisplay
+from .figure_cache import FigureCache
+from .diagnostics_display import DiagnosticsDisplay
+from .distribution_display import DistributionDisplay
+from .profiling_display import ProfilingDisplay
+from .streamlit_adapter import StreamlitAdapter
 
-__all__ = ['MetricsDisplay'] 
\ No newline at end of file
+__all__ = ['MetricsDisplay', 'SurfaceDisplay', 'FigureCache', 'DiagnosticsDisplay', 'DistributionDisplay', 'ProfilingDisplay', 'StreamlitAdapter'] 
\ No newline at end of file
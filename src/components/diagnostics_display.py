@@ -0,0 +1,90 @@
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+from ..config.constants import CORPORATE_COLORS
+from ..utils.distribuciones import Distribuciones
+from .distribution_display import DistributionDisplay
+from .figure_cache import FigureCache
+
+VARIABLES_DIAGNOSTICO = {"gdc_mean_in": "GDC - Daño Térmico (%)", "gdh_mean_in": "GDH - Daño por Hongos (%)"}
+
+
+def _layout(fig, titulo, **kwargs):
+    fig.update_layout(title=titulo, plot_bgcolor='white', paper_bgcolor='white', **kwargs)
+    return fig
+
+
+class DiagnosticsDisplay:
+    """Componente de diagnóstico en vivo del modelo de acidez (predicciones y residuos)"""
+
+    @staticmethod
+    def figura_predicciones(datos):
+        reales, predichas = datos["pct_oil_acidez_mean"], datos["predicha"]
+        extremos = [float(min(reales.min(), predichas.min())), float(max(reales.max(), predichas.max()))]
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=reales, y=predichas, mode="markers", name="Muestras",
+            marker=dict(color=CORPORATE_COLORS["verde_oscuro"], size=8, opacity=0.7),
+            hovertemplate='Real: %{x:.2f}<br>Predicha: %{y:.2f}<extra></extra>'
+        ))
+        fig.add_trace(go.Scatter(
+            x=extremos, y=extremos, mode="lines", name="Predicción perfecta",
+            line=dict(color="#FF6B6B", dash="dash")
+        ))
+        return _layout(fig, "Predicciones vs Valores Reales", height=450,
+                       xaxis_title="Acidez real (mg KOH/g)", yaxis_title="Acidez predicha (mg KOH/g)")
+
+    @staticmethod
+    def figura_distribucion_residuos(datos):
+        residuos = datos["residuo"]
+        fig = go.Figure(DistributionDisplay.trazas_distribucion(Distribuciones.resumir(residuos.to_numpy()), "Residuos"))
+        fig.add_vline(x=0, line_dash="dash", line_color="#FF6B6B")
+        fig.add_vline(x=float(residuos.mean()), line_dash="dot", line_color=CORPORATE_COLORS["verde_oscuro"],
+                      annotation_text=f"Media: {residuos.mean():+.3f}", annotation_position="top right")
+        return _layout(fig, "Distribución de Residuos (Real - Predicha)", height=400, showlegend=False, bargap=0,
+                       xaxis_title="Residuo (mg KOH/g)", yaxis_title="Frecuencia")
+
+    @staticmethod
+    def figura_residuos_variables(datos):
+        fig = make_subplots(rows=1, cols=len(VARIABLES_DIAGNOSTICO), shared_yaxes=True,
+                            subplot_titles=list(VARIABLES_DIAGNOSTICO.values()))
+        for i, columna in enumerate(VARIABLES_DIAGNOSTICO, start=1):
+            fig.add_trace(go.Scatter(
+                x=datos[columna], y=datos["residuo"], mode="markers", name=VARIABLES_DIAGNOSTICO[columna],
+                marker=dict(color=CORPORATE_COLORS["verde_claro"], size=7, line=dict(color=CORPORATE_COLORS["verde_oscuro"], width=1))
+            ), row=1, col=i)
+            fig.add_hline(y=0, line_dash="dash", line_color="#FF6B6B", row=1, col=i)
+        fig.update_yaxes(title_text="Residuo (mg KOH/g)", row=1, col=1)
+        return _layout(fig, "Residuos vs Variables de Entrada", height=400, showlegend=False)
+
+    @staticmethod
+    def mostrar_metricas(vivas, congeladas):
+        """RMSE, MAE y R² sobre los datos actuales junto a las del entrenamiento (``metrics_acidez.json``)"""
+        col1, col2, col3, col4 = st.columns(4)
+        for col, (clave, etiqueta, formato, color) in zip(
+            (col1, col2, col3),
+            (("rmse", "RMSE", "{:.3f}", "inverse"), ("mae", "MAE", "{:.3f}", "inverse"), ("r2", "R²", "{:.3f}", "normal"))
+        ):
+            referencia = congeladas.get(clave)
+            with col:
+                st.metric(
+                    f"{etiqueta} (datos actuales)", formato.format(vivas[clave]),
+                    f"{vivas[clave] - referencia:+.3f} vs test ({formato.format(referencia)})"
+                    if referencia is not None and np.isfinite(vivas[clave]) else None,
+                    delta_color=color
+                )
+        with col4:
+            st.metric("Muestras evaluadas", f"{vivas['n']:,}")
+
+    @staticmethod
+    def mostrar_diagnostico(version_modelo, huella, datos, vista):
+        """Mostrar la vista de diagnóstico; la figura se comparte entre sesiones por (versión, datos)"""
+        constructores = {
+            "predicciones": DiagnosticsDisplay.figura_predicciones,
+            "distribucion_residuos": DiagnosticsDisplay.figura_distribucion_residuos,
+            "residuos_variables": DiagnosticsDisplay.figura_residuos_variables,
+        }
+        construir = constructores[vista]
+        FigureCache.mostrar(FigureCache.obtener(f"diagnostico_{vista}", (version_modelo, huella), lambda: construir(datos)))
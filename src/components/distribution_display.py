@@ -0,0 +1,60 @@
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from ..config.constants import CORPORATE_COLORS
+from ..services.data_service import DataService
+from .figure_cache import FigureCache
+
+
+class DistributionDisplay:
+    """Componente de histogramas con KDE a partir de distribuciones binadas en el servidor"""
+
+    @staticmethod
+    def trazas_distribucion(resumen, nombre, color=CORPORATE_COLORS["verde_claro"]):
+        """Barras del histograma y curva KDE (en conteos por barra) de ``Distribuciones.resumir``"""
+        bordes = resumen["bordes"]
+        barras = go.Bar(
+            x=(bordes[:-1] + bordes[1:]) / 2, y=resumen["conteos"], width=bordes[1] - bordes[0],
+            marker_color=color, name=nombre,
+            hovertemplate='%{x:.2f}: %{y} muestras<extra></extra>'
+        )
+        curva = go.Scatter(
+            x=resumen["x"], y=resumen["densidad"], mode="lines", name="Densidad (KDE)",
+            line=dict(color=CORPORATE_COLORS["verde_oscuro"], width=2), hoverinfo="skip"
+        )
+        return barras, curva
+
+    @staticmethod
+    def figura_distribuciones(paneles, titulo, height=400, media=True):
+        """Un panel por variable: ``paneles`` es una lista de (resumen, subtítulo, color)"""
+        fig = make_subplots(rows=1, cols=len(paneles), subplot_titles=[p[1] for p in paneles])
+        for i, (resumen, subtitulo, color) in enumerate(paneles, start=1):
+            for traza in DistributionDisplay.trazas_distribucion(resumen, subtitulo, color):
+                fig.add_trace(traza, row=1, col=i)
+            if media and resumen["n"]:
+                fig.add_vline(x=resumen["media"], line_dash="dash", line_color=CORPORATE_COLORS["verde_oscuro"],
+                              annotation_text=f"Promedio: {resumen['media']:.2f}", annotation_position="top right",
+                              row=1, col=i)
+        fig.update_yaxes(title_text="Frecuencia", row=1, col=1)
+        fig.update_layout(title=titulo, height=height, showlegend=False, bargap=0,
+                          plot_bgcolor='white', paper_bgcolor='white')
+        return fig
+
+    @staticmethod
+    def mostrar_distribuciones(archivo, columnas, titulo, height=400):
+        """Mostrar la distribución de ``columnas`` ({columna: (subtítulo, color)}) de un archivo de datos
+
+        Los resúmenes se cachean por versión del archivo y la figura serializada se
+        comparte entre sesiones; el navegador recibe solo barras y curva KDE.
+        """
+        version = DataService.get_data_version(archivo)
+        llave = (archivo, tuple(columnas), version)
+
+        def construir():
+            paneles = [
+                (DataService.resumir_distribucion(archivo, version, columna), subtitulo, color)
+                for columna, (subtitulo, color) in columnas.items()
+            ]
+            return DistributionDisplay.figura_distribuciones(paneles, titulo, height)
+
+        return FigureCache.mostrar(FigureCache.obtener("distribucion", llave, construir))
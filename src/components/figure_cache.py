@@ -0,0 +1,146 @@
+import json
+import os
+from collections import namedtuple
+
+import streamlit as st
+from plotly.io.json import to_json_plotly
+
+try:
+    from streamlit.proto.PlotlyChart_pb2 import PlotlyChart as PlotlyChartProto
+except ImportError:
+    PlotlyChartProto = None
+
+from ..config.constants import FIGURAS_CACHE_MAX, DECIMACION_UMBRAL
+from ..utils.decimacion import Decimacion
+from ..utils.metricas import Metricas
+from ..utils.presupuesto import PresupuestoMemoria
+
+# Trazas sin corchetes externos y layout en JSON, más el tamaño estimado de la figura sin reducir
+FiguraSerializada = namedtuple("FiguraSerializada", ["trazas", "layout", "bytes_originales"])
+
+# Versiones de Streamlit (mayor.menor) cuyo mensaje PlotlyChart y ``_enqueue`` (internos) se verificaron
+_VERSIONES_ENVIO_DIRECTO = ("1.32",)
+
+
+def _envio_directo():
+    """True si se puede enviar el JSON ya serializado sin pasar por ``st.plotly_chart``"""
+    version = ".".join(st.__version__.split(".")[:2])
+    return (version in _VERSIONES_ENVIO_DIRECTO and PlotlyChartProto is not None
+            and hasattr(st._main, "_enqueue"))
+
+
+_ENVIO_DIRECTO = _envio_directo()
+
+
+def _obtener(llave, serializar):
+    registro = FigureCache.registro()
+    serializada = registro.obtener(llave)
+    Metricas.contar("figuras", serializada is not None)
+    if serializada is None:
+        # Se serializa fuera del lock; si dos sesiones coinciden, gana la primera
+        serializada = serializar()
+        serializada = registro.guardar(llave, serializada, len(serializada.trazas) + len(serializada.layout))
+    return serializada
+
+
+def _dividir(figura):
+    """``FiguraSerializada`` de un dict de figura, con las trazas grandes reducidas (``Decimacion``)"""
+    reducida, _ = Decimacion.reducir(figura)
+    return FiguraSerializada(
+        to_json_plotly(reducida["data"])[1:-1], to_json_plotly(reducida["layout"]),
+        Decimacion.bytes_carga(figura, muestra=DECIMACION_UMBRAL)  # Estimado: no se serializa dos veces
+    )
+
+
+class FigureCache:
+    """Figuras Plotly que no dependen de la sesión, construidas y serializadas una vez por proceso"""
+
+    @staticmethod
+    def registro():
+        """Figuras serializadas compartidas por todas las sesiones (LRU dentro del presupuesto de memoria)"""
+        return PresupuestoMemoria.registro("figuras", maximo_entradas=FIGURAS_CACHE_MAX)
+
+    @staticmethod
+    def obtener(nombre, version, construir):
+        """JSON de la figura ``nombre`` para ``version`` (p. ej. versión de modelo y datos)
+
+        ``construir`` solo se llama si la figura no está en el registro. Retorna una
+        ``FiguraSerializada``: las trazas sin corchetes externos, para añadir
+        superposiciones por concatenación sin volver a serializar la figura.
+        """
+        return _obtener((nombre, version), lambda: FigureCache.serializar(construir()))
+
+    @staticmethod
+    def serializar(fig):
+        """``FiguraSerializada`` de una figura propia de la sesión, sin pasar por el registro
+
+        Útil para guardarla en una sección memorizada y no volver a serializarla
+        en cada rerun.
+        """
+        with Metricas.medir("figura.serializar"):
+            return _dividir(fig.to_plotly_json())
+
+    @staticmethod
+    def cargar_archivo(ruta):
+        """Figura guardada como JSON de Plotly, leída una vez por proceso y versión del archivo
+
+        Lanza ``FileNotFoundError`` si el archivo no existe.
+        """
+        version = os.stat(ruta).st_mtime_ns
+
+        def leer():
+            with open(ruta, encoding="utf-8") as f:
+                return _dividir(json.load(f))
+
+        return _obtener(("archivo", ruta, version), leer)
+
+    @staticmethod
+    def mostrar(figura, superposiciones=(), use_container_width=True, contenedor=None):
+        """Enviar al navegador una figura serializada más trazas propias de la sesión
+
+        Las ``superposiciones`` (p. ej. el marcador del usuario) son trazas de
+        ``plotly.graph_objects`` o diccionarios; solo ellas se serializan en el rerun.
+        Equivale a ``st.plotly_chart`` con el tema de Streamlit, sin reconstruir ni
+        validar la figura base. El envío directo usa internos de Streamlit y solo
+        se activa en versiones verificadas de Streamlit; en otras se
+        reconstruye el dict de la figura y se usa ``st.plotly_chart``.
+        """
+        trazas, layout = figura[:2]
+        extra = [to_json_plotly(t.to_plotly_json() if hasattr(t, "to_plotly_json") else t)
+                 for t in superposiciones]
+        spec = '{"data":[' + ",".join(filter(None, [trazas, *extra])) + '],"layout":' + layout + "}"
+        if not _ENVIO_DIRECTO:
+            return (contenedor or st).plotly_chart(json.loads(spec), use_container_width=use_container_width,
+                                                   theme="streamlit")
+        proto = PlotlyChartProto()
+        proto.use_container_width = use_container_width
+        proto.figure.spec = spec
+        proto.figure.config = '{"showLink": false, "linkText": false}'
+        proto.theme = "streamlit"
+        return (contenedor or st._main)._enqueue("plotly_chart", proto)
+
+    @staticmethod
+    def mostrar_archivo(ruta, use_container_width=True):
+        """Mostrar una figura guardada en JSON; si falta el archivo, un aviso en vez de un error"""
+        try:
+            return FigureCache.mostrar(FigureCache.cargar_archivo(ruta), use_container_width=use_container_width)
+        except FileNotFoundError:
+            st.warning(f"⚠️ No se encontró {ruta}. Genérelo con `python -m src.components.static_figures`.")
+
+    @staticmethod
+    def mostrar_figura(fig, use_container_width=True):
+        """``st.plotly_chart`` con la misma reducción de trazas que las figuras compartidas"""
+        return FigureCache.mostrar(FigureCache.serializar(fig), use_container_width=use_container_width)
+
+    @staticmethod
+    def estadisticas():
+        """Figuras en el registro, aciertos, fallos y bytes enviados frente a los estimados sin reducir"""
+        registro = FigureCache.registro()
+        figuras = registro.valores()
+        return {
+            "figuras": len(figuras),
+            "aciertos": registro.aciertos,
+            "fallos": registro.fallos,
+            "bytes": sum(len(f.trazas) + len(f.layout) for f in figuras),
+            "bytes_originales": sum(f.bytes_originales for f in figuras),
+        }
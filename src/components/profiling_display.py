@@ -0,0 +1,137 @@
+from collections import Counter
+
+import plotly.graph_objects as go
+import streamlit as st
+from streamlit.runtime.scriptrunner import StopException
+
+from ..config.constants import (
+    PERFILADO_HABILITADO, PERFILADO_CLAVE, PERFILADO_DIR, PERFILADO_MIN_FRACCION, CORPORATE_COLORS
+)
+from ..utils.metricas import Metricas
+from ..utils.perfilado import Perfilador, MODOS_PERFILADO
+from ..utils.presupuesto import PresupuestoMemoria
+from .figure_cache import FigureCache
+from .streamlit_adapter import StreamlitAdapter
+
+# Llaves de session_state
+_PENDIENTE = "_perfilado_pendiente"
+_ULTIMO = "_perfilado_ultimo"
+
+
+def _pedir_perfil():
+    etiqueta = st.session_state["_perfilado_modo"]
+    st.session_state[_PENDIENTE] = next(m for m, e in MODOS_PERFILADO.items() if e == etiqueta)
+
+
+class _PaginaPerfilada:
+    """Cronómetro del rerun (``Metricas``) que además perfila el rerun si se pidió
+
+    Bloque ``with`` alrededor del script: al salir siempre se registra el tiempo
+    y se detiene el perfilador, también con ``st.stop()``, un rerun
+    interrumpido o una excepción de la página.
+    """
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.metricas = None
+        self.habilitado = False
+        self.perfilador = None
+
+    def __enter__(self):
+        self.metricas = Metricas.pagina(self.nombre)
+        self.habilitado = ProfilingDisplay.habilitado()
+        if self.habilitado:
+            ProfilingDisplay.panel()
+            modo = st.session_state.pop(_PENDIENTE, None)
+            if modo:
+                self.perfilador = Perfilador(modo).iniciar()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.metricas.terminar()
+        if self.perfilador is not None:
+            perfilador, self.perfilador = self.perfilador, None
+            resultado = perfilador.detener()  # Lo primero: detiene el hilo de muestreo o cProfile
+            ruta = Perfilador.guardar(resultado, PERFILADO_DIR, self.nombre)
+            resultado.pop("perfil", None)
+            # Tras st.stop() Streamlit ya no admite cambios en la sesión: el perfil queda solo en disco
+            if tipo is None or not issubclass(tipo, StopException):
+                st.session_state[_ULTIMO] = dict(resultado, pagina=self.nombre, ruta=ruta, nuevo=True)
+        # Un rerun interrumpido o fallido no dibuja más: el perfil se muestra en el siguiente rerun completo
+        if self.habilitado and tipo is None:
+            ProfilingDisplay.mostrar_ultimo(self.nombre)
+        return False
+
+
+class ProfilingDisplay:
+    """Modo de perfilado para administradores, activado con ``SOYA_PERFILADO``
+
+    Incluye la contabilidad de memoria de los caches (``PresupuestoMemoria``).
+    Si además se define ``SOYA_PERFILADO_CLAVE``, el panel solo aparece al abrir
+    la página con ``?perfil=<clave>`` en la URL.
+    """
+
+    @staticmethod
+    def habilitado():
+        if not PERFILADO_HABILITADO:
+            return False
+        return not PERFILADO_CLAVE or st.query_params.get("perfil") == PERFILADO_CLAVE
+
+    @staticmethod
+    def pagina(nombre):
+        """Rerun de una página como bloque ``with``: métricas siempre, perfil si se pidió
+
+        También conecta los servicios con la app (``StreamlitAdapter``).
+        """
+        StreamlitAdapter.instalar()
+        return _PaginaPerfilada(nombre)
+
+    @staticmethod
+    def panel():
+        with st.sidebar.expander("🔬 Perfilado (administración)"):
+            st.radio("Perfilador", list(MODOS_PERFILADO.values()), key="_perfilado_modo")
+            # El callback corre antes del rerun que dispara el clic: ese rerun es el perfilado
+            st.button("Perfilar el próximo rerun", key="_perfilado_boton", on_click=_pedir_perfil)
+        with st.sidebar.expander("🧠 Memoria de caches (administración)"):
+            resumen = PresupuestoMemoria.resumen()
+            st.caption(f"{resumen['bytes'] / 2**20:,.1f} de {resumen['presupuesto_bytes'] / 2**20:,.0f} MB "
+                       f"({resumen['bytes_fijos'] / 2**20:,.1f} MB fijos: modelos)")
+            st.dataframe(PresupuestoMemoria.estadisticas(), use_container_width=True, hide_index=True)
+
+    @staticmethod
+    def figura_llamas(pilas, min_fraccion=PERFILADO_MIN_FRACCION):
+        """Gráfico de llamas (icicle) de las pilas muestreadas; omite nodos con menos de ``min_fraccion``"""
+        total = sum(pilas.values())
+        nodos = Counter()
+        for pila, n in pilas.items():
+            for i in range(1, len(pila) + 1):
+                nodos[pila[:i]] += n
+        visibles = sorted((ruta for ruta, n in nodos.items() if n >= total * min_fraccion), key=len)
+        ids = {ruta: str(i) for i, ruta in enumerate(visibles)}
+        fig = go.Figure(go.Icicle(
+            ids=[ids[r] for r in visibles],
+            labels=[r[-1] for r in visibles],
+            parents=[ids.get(r[:-1], "") for r in visibles],
+            values=[nodos[r] for r in visibles],
+            branchvalues="total",
+            tiling=dict(orientation="v"),
+            marker=dict(colorscale=[[0, CORPORATE_COLORS["verde_muy_claro"]], [1, CORPORATE_COLORS["verde_oscuro"]]]),
+            hovertemplate="%{label}<br>%{value} muestras (%{percentRoot:.1%})<extra></extra>",
+        ))
+        fig.update_layout(title="Gráfico de Llamas del Rerun", height=600, margin=dict(t=50, l=10, r=10, b=10))
+        return fig
+
+    @staticmethod
+    def mostrar_ultimo(nombre):
+        """Resultado del último perfil de esta página: gráfico de llamas (muestreo) y tabla ordenada"""
+        ultimo = st.session_state.get(_ULTIMO)
+        if not ultimo or ultimo["pagina"] != nombre:
+            return
+        titulo = f"🔬 Perfil del rerun: {ultimo['segundos'] * 1000:.0f} ms ({MODOS_PERFILADO[ultimo['modo']]})"
+        with st.expander(titulo, expanded=ultimo.pop("nuevo", False)):
+            st.caption(f"Perfil crudo guardado en `{ultimo['ruta']}`")
+            if ultimo["pilas"]:
+                FigureCache.mostrar_figura(ProfilingDisplay.figura_llamas(ultimo["pilas"]))
+            st.dataframe(ultimo["tabla"], use_container_width=True, hide_index=True)
+            st.button("Descartar perfil", key="_perfilado_descartar",
+                      on_click=lambda: st.session_state.pop(_ULTIMO, None))
@@ -0,0 +1,78 @@
+"""Figuras de dispersión de los datos de laboratorio exportadas como JSON compacto de Plotly
+
+Uso: python -m src.components.static_figures
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
+
+from ..config.constants import PROTEINA_DATA_FILE, CORPORATE_COLORS, PROTEINA_VS_GDT_FIGURA_FILE
+
+DECIMALES = 4  # Precisión de los valores guardados
+
+
+def _layout(fig, titulo, **kwargs):
+    fig.update_layout(
+        title=titulo, plot_bgcolor='white', paper_bgcolor='white',
+        margin=dict(t=50, b=40, l=50, r=20), **kwargs
+    )
+    return fig
+
+
+class StaticFigures:
+    """Constructores de las figuras que grafican cada muestra (las distribuciones usan ``DistributionDisplay``)"""
+
+    @staticmethod
+    def proteina_vs_daño(df_proteina):
+        datos = df_proteina[["GDT", "pct_soluble_protein_quim"]].dropna()
+        x = np.round(datos["GDT"].to_numpy(dtype=float), DECIMALES)
+        y = np.round(datos["pct_soluble_protein_quim"].to_numpy(dtype=float), DECIMALES)
+        pendiente, intercepto = np.polyfit(x, y, 1)
+        recta_x = np.array([x.min(), x.max()])
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=x, y=y, mode="markers", name="Muestras",
+            marker=dict(color=CORPORATE_COLORS["verde_claro"], size=8, line=dict(color=CORPORATE_COLORS["verde_oscuro"], width=1))
+        ))
+        fig.add_trace(go.Scatter(
+            x=recta_x, y=np.round(intercepto + pendiente * recta_x, DECIMALES), mode="lines",
+            name=f"Ajuste lineal: {intercepto:.2f} {pendiente:+.3f} × GDT",
+            line=dict(color=CORPORATE_COLORS["verde_oscuro"], width=3)
+        ))
+        return _layout(fig, "Proteína Soluble vs Daño Total del Grano", height=500,
+                       xaxis_title="GDT - Daño Total (%)", yaxis_title="Proteína soluble (%)")
+
+    @staticmethod
+    def guardar(fig, ruta):
+        """Guardar la figura como JSON sin plantilla (el tema lo aplica Streamlit al mostrarla)"""
+        figura = fig.to_plotly_json()
+        figura["layout"].pop("template", None)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            f.write(to_json_plotly({"data": figura["data"], "layout": figura["layout"]}))
+        os.replace(temporal, ruta)
+        return os.path.getsize(ruta)
+
+    @staticmethod
+    def exportar():
+        """Regenerar todas las figuras desde los datos; retorna {ruta: bytes}"""
+        df_proteina = pd.read_csv(PROTEINA_DATA_FILE)
+        figuras = {
+            PROTEINA_VS_GDT_FIGURA_FILE: StaticFigures.proteina_vs_daño(df_proteina),
+        }
+        return {ruta: StaticFigures.guardar(fig, ruta) for ruta, fig in figuras.items()}
+
+
+def main():
+    for ruta, tamaño in StaticFigures.exportar().items():
+        print(f"{ruta}: {tamaño / 1024:.1f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import logging
+import threading
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from ..utils.cache_backends import CacheStreamlit
+from ..utils.presupuesto import PresupuestoMemoria
+
+_lock = threading.Lock()
+
+
+class _ManejadorAvisos(logging.Handler):
+    """Muestra en la página los registros de los servicios marcados ``extra={"aviso": True}``"""
+
+    def emit(self, record):
+        # Solo en el hilo del script: los hilos de fondo (vigilancia del registro) no tienen página
+        if not getattr(record, "aviso", False) or get_script_run_ctx() is None:
+            return
+        try:
+            mensaje = self.format(record)
+            (st.error if record.levelno >= logging.ERROR else st.warning)(mensaje)
+        except Exception:
+            self.handleError(record)
+
+
+class StreamlitAdapter:
+    """Conecta los servicios (independientes de Streamlit) con la app
+
+    - Los avisos que los servicios registran con ``logging`` se muestran con
+      ``st.warning``/``st.error`` en la sesión que los produjo.
+    - Los caches decorados con ``PresupuestoMemoria.cache`` pasan a un
+      ``CacheStreamlit``: "Clear cache" los vacía como hacía ``st.cache_data``.
+      Los fijos (modelos) se dejan, pues su registro ya recarga versiones nuevas.
+    """
+
+    manejador = None
+
+    @staticmethod
+    def instalar():
+        """Idempotente; se llama al iniciar cada rerun (``ProfilingDisplay.pagina``)"""
+        with _lock:
+            if StreamlitAdapter.manejador is None:
+                manejador = _ManejadorAvisos(logging.WARNING)
+                manejador.setFormatter(logging.Formatter("%(message)s"))
+                logging.getLogger(__name__.split(".")[0]).addHandler(manejador)
+                StreamlitAdapter.manejador = manejador
+            for nombre, backend in PresupuestoMemoria.backends().items():
+                fijo = getattr(getattr(backend, "interno", backend), "fijo", False)
+                if not fijo and not isinstance(backend, CacheStreamlit):
+                    PresupuestoMemoria.usar_backend(nombre, CacheStreamlit(backend))
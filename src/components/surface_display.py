@@ -0,0 +1,121 @@
+import base64
+import io
+
+import contourpy
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+from matplotlib import colormaps
+from PIL import Image
+
+from ..config.constants import ACIDEZ_MAXIMA, SUPERFICIE_ACIDEZ, CORPORATE_COLORS
+from ..services.model_service import ModelService
+from .figure_cache import FigureCache
+
+MAPA_COLOR = "RdYlGn_r"
+
+
+class SurfaceDisplay:
+    """Componente para la superficie de respuesta de acidez sobre GDC × GDH"""
+
+    @staticmethod
+    @st.cache_data(max_entries=8, show_spinner=False)
+    def capas_superficie(version_modelo, limite=ACIDEZ_MAXIMA):
+        """Capas compactas de la superficie para el navegador (una vez por versión y límite)
+
+        - ``imagen``: PNG a resolución completa como data URI (decenas de KB en vez
+          de ~10 MB de JSON para 500k celdas float64)
+        - ``hover``: malla reducida a ``paso_hover`` con valores redondeados, para
+          hover y barra de color
+        - ``contorno``: línea de ``limite`` extraída a resolución completa
+        """
+        gdc, gdh, valores = ModelService.superficie_acidez(version_modelo)
+        zmin, zmax = float(valores.min()), float(valores.max())
+
+        # Filas de la imagen de arriba (GDH máximo) hacia abajo
+        normalizados = (valores.T[::-1] - zmin) / max(zmax - zmin, 1e-12)
+        rgba = colormaps[MAPA_COLOR](normalizados, bytes=True)
+        buffer = io.BytesIO()
+        Image.fromarray(rgba[..., :3]).save(buffer, format="PNG", optimize=True)
+        imagen = "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+        salto = max(1, int(round(SUPERFICIE_ACIDEZ["paso_hover"] / (gdc[1] - gdc[0]))))
+        hover = (gdc[::salto], gdh[::salto], np.round(valores[::salto, ::salto].T.astype(float), 2))
+
+        lineas = contourpy.contour_generator(gdc, gdh, valores.T).lines(limite)
+        x_contorno, y_contorno = [], []
+        for linea in lineas:
+            x_contorno.extend(np.round(linea[:, 0], 2).tolist() + [None])
+            y_contorno.extend(np.round(linea[:, 1], 2).tolist() + [None])
+
+        colores = colormaps[MAPA_COLOR](np.linspace(0, 1, 11))
+        escala = [
+            [float(p), f"rgb({int(r * 255)},{int(g * 255)},{int(b * 255)})"]
+            for p, (r, g, b, _) in zip(np.linspace(0, 1, 11), colores)
+        ]
+        return {
+            "imagen": imagen,
+            "extension": (float(gdc[0]), float(gdc[-1]), float(gdh[0]), float(gdh[-1])),
+            "hover": hover,
+            "contorno": (x_contorno, y_contorno),
+            "escala": escala,
+            "rango": (zmin, zmax),
+        }
+
+    @staticmethod
+    def marcador(gdc_punto, gdh_punto):
+        """Traza del punto ingresado por el usuario"""
+        return go.Scatter(
+            x=[gdc_punto], y=[gdh_punto], mode="markers", name="Valores ingresados",
+            marker=dict(color="white", size=14, line=dict(color=CORPORATE_COLORS["verde_oscuro"], width=3))
+        )
+
+    @staticmethod
+    def mostrar_superficie(version_modelo, gdc_punto=None, gdh_punto=None, limite=ACIDEZ_MAXIMA):
+        """Mostrar la superficie serializada una vez por proceso, con el punto de la sesión superpuesto"""
+        figura = FigureCache.obtener(
+            "superficie_acidez", (version_modelo, limite),
+            lambda: SurfaceDisplay.figura_superficie(version_modelo, limite=limite)
+        )
+        superposiciones = []
+        if gdc_punto is not None and gdh_punto is not None:
+            superposiciones.append(SurfaceDisplay.marcador(gdc_punto, gdh_punto))
+        return FigureCache.mostrar(figura, superposiciones)
+
+    @staticmethod
+    def figura_superficie(version_modelo, gdc_punto=None, gdh_punto=None, limite=ACIDEZ_MAXIMA):
+        """Figura de la superficie con el contorno del límite y el punto del usuario"""
+        capas = SurfaceDisplay.capas_superficie(version_modelo, limite)
+        gdc_min, gdc_max, gdh_min, gdh_max = capas["extension"]
+        x_hover, y_hover, z_hover = capas["hover"]
+
+        fig = go.Figure()
+        # Malla reducida invisible: hover y barra de color sobre la imagen
+        fig.add_trace(go.Heatmap(
+            x=x_hover, y=y_hover, z=z_hover,
+            colorscale=capas["escala"], zmin=capas["rango"][0], zmax=capas["rango"][1],
+            opacity=0, colorbar=dict(title="mg KOH/g"), name="Acidez",
+            hovertemplate='GDC: %{x:.0f}%<br>GDH: %{y:.0f}%<br>Acidez: %{z:.2f} mg KOH/g<extra></extra>'
+        ))
+        fig.add_trace(go.Scatter(
+            x=capas["contorno"][0], y=capas["contorno"][1], mode="lines",
+            name=f"Límite {limite:g} mg KOH/g", line=dict(color="black", width=2, dash="dash"),
+            hoverinfo="skip"
+        ))
+        if gdc_punto is not None and gdh_punto is not None:
+            fig.add_trace(SurfaceDisplay.marcador(gdc_punto, gdh_punto))
+        fig.add_layout_image(
+            source=capas["imagen"], xref="x", yref="y",
+            x=gdc_min, y=gdh_max, sizex=gdc_max - gdc_min, sizey=gdh_max - gdh_min,
+            sizing="stretch", layer="below"
+        )
+        fig.update_layout(
+            title="Superficie de Respuesta: Acidez Predicha según GDC y GDH",
+            xaxis=dict(title="GDC - Daño Térmico (%)", range=[gdc_min, gdc_max], showgrid=False, zeroline=False),
+            yaxis=dict(title="GDH - Daño por Hongos (%)", range=[gdh_min, gdh_max], showgrid=False, zeroline=False),
+            height=550,
+            legend=dict(orientation="h", y=-0.15),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='white'
+        )
+        return fig
@@ -15,15 +15,20 @@ SEGUIMIENTO_DATA_FILE = os.path.join(DATA_PATH, "datos_seguimiento_granos.csv")
 ACIDEZ_MODEL_FILE = os.path.join(MODELS_PATH, "random_forest_acidez.pkl")
 ACIDEZ_METRICS_FILE = os.path.join(MODELS_PATH, "metrics_acidez.json")
 ACIDEZ_INFO_FILE = os.path.join(MODELS_PATH, "model_info_acidez.json")
+ACIDEZ_TREE_RULES_FILE = os.path.join(MODELS_PATH, "tree_rules_acidez.txt")
+
+# Registro versionado de modelos
+MODEL_REGISTRY_PATH = os.path.join("models", "registry")
+ACIDEZ_REGISTRY_PATH = os.path.join(MODEL_REGISTRY_PATH, "acidez")
+REGISTRY_ACTIVE_FILE = "ACTIVE"  # Puntero a la versión activa
+REGISTRY_POLL_SECONDS = float(os.environ.get("SOYA_REGISTRY_POLL_SECONDS", 5))
+REGISTRY_MEMORY_BUDGET_MB = float(os.environ.get("SOYA_REGISTRY_MEMORY_MB", 512))
 
 # Archivos de visualización
 SHAP_IMPORTANCE_FILE = os.path.join(IMAGENES_PATH, "shap_importance_acidez.png")
-DISTRIBUCIONES_HTML_FILE = os.path.join(IMAGENES_PATH, "subplot_distribuciones_acidez_oil.html")
-PREDICCIONES_HTML_FILE = os.path.join(IMAGENES_PATH, "predicciones_vs_reales_acidez.html")
-RESIDUOS_HTML_FILE = os.path.join(IMAGENES_PATH, "residuos_acidez.html")
-PROTEINA_DIST_HTML_FILE = os.path.join(IMAGENES_PATH, "soluble_protein_distribution.html")
-GRAIN_DAMAGE_HTML_FILE = os.path.join(IMAGENES_PATH, "grain_damage_distribution.html")
-PROTEINA_VS_GDT_HTML_FILE = os.path.join(IMAGENES_PATH, "soluble_protein_vs_grain_damage.html")
+# Figuras de análisis en JSON compacto de Plotly (python -m src.components.static_figures)
+FIGURAS_PATH = os.path.join(IMAGENES_PATH, "figuras")
+PROTEINA_VS_GDT_FIGURA_FILE = os.path.join(FIGURAS_PATH, "soluble_protein_vs_grain_damage.json")
 
 # Parámetros de calidad
 GDT_EXCELENTE = 15.0
@@ -34,6 +39,159 @@ PROTEINA_BASE = 70.0
 PROTEINA_MINIMA = 50.0
 CALIDAD_REMANENTE_BASE = 85.0
 
+# Calidad base de cada producto derivado (fracción) y clases de calidad por GDT
+CALIDAD_PRODUCTOS = {
+    "Aceite de Soya": 0.9,
+    "Harina de Soya": 0.85,
+    "Proteína de Soya": 0.8,
+    "Lecitina": 0.95,
+    "Biodiesel": 0.75,
+}
+CLASES_CALIDAD = ("Excelente", "Moderada", "Crítica")
+
+# Pérdidas económicas: precio de referencia (USD/ton de producto) y toneladas de
+# producto por tonelada de grano según la mezcla de destino de la planta
+PRECIOS_PRODUCTOS = {
+    "Aceite de Soya": 1000.0,
+    "Harina de Soya": 400.0,
+    "Proteína de Soya": 1500.0,
+    "Lecitina": 2000.0,
+    "Biodiesel": 1200.0,
+}
+RENDIMIENTO_PRODUCTOS = {
+    "Aceite de Soya": 0.12,
+    "Harina de Soya": 0.60,
+    "Proteína de Soya": 0.10,
+    "Lecitina": 0.005,
+    "Biodiesel": 0.06,
+}
+ESCENARIOS_PRECIOS = {"Bajo": 0.8, "Base": 1.0, "Alto": 1.25}  # Multiplicador sobre el precio de referencia
+
+# Superficie de respuesta de acidez (plano GDC × GDH)
+SUPERFICIE_ACIDEZ = {
+    "gdc": (0.0, 100.0),
+    "gdh": (0.0, 50.0),
+    "paso": 0.1,        # Resolución de cálculo (1001 × 501 celdas)
+    "paso_hover": 1.0,  # Resolución de la malla enviada para hover y barra de color
+}
+
+# Curva de acidez vs GDT marginalizada sobre la proporción GDC/GDH observada
+CURVA_ACIDEZ_PERCENTILES = (10, 25, 75, 90)
+
+# Simulación de almacenamiento
+SIMULACION_CACHE_MAX_ESCENARIOS = 4096  # Escenarios memorizados (LRU)
+MESES_ALMACENAMIENTO = 36
+
+# Monte Carlo de riesgo de almacenamiento: (media, desviación estándar) por variable
+CONDICIONES_ALMACENAMIENTO = {
+    "temperatura": (25.0, 3.0),   # °C
+    "humedad": (13.0, 1.5),       # %
+    "gdc_ini": (5.0, 2.0),        # % daño térmico inicial
+    "gdh_ini": (2.0, 1.0),        # % daño por hongos inicial
+}
+MONTE_CARLO_SEMILLA = 42
+MONTE_CARLO_BLOQUE = 10_000  # Trayectorias por bloque (unidad de trabajo del pool)
+
+# Análisis de sensibilidad global (Sobol): rango (mínimo, máximo) uniforme por variable
+RANGOS_SENSIBILIDAD = {
+    "temperatura": (15.0, 35.0),  # °C
+    "humedad": (10.0, 20.0),      # %
+    "gdc_ini": (0.0, 15.0),       # %
+    "gdh_ini": (0.0, 8.0),        # %
+    "meses": (7.0, 36.0),         # Rango válido de la ecuación base
+}
+VARIABLES_SENSIBILIDAD = {
+    "temperatura": "Temperatura (°C)",
+    "humedad": "Humedad (%)",
+    "gdc_ini": "GDC inicial (%)",
+    "gdh_ini": "GDH inicial (%)",
+    "meses": "Meses de almacenamiento",
+}
+SOBOL_MUESTRAS = 2**14  # Potencia de 2; evaluaciones = n × (variables + 2)
+
+# Vida útil: malla cuantizada (mínimo, máximo, paso) de la tabla de consulta
+VIDA_UTIL_MALLA = {
+    "temperatura": (10.0, 40.0, 1.0),  # °C
+    "humedad": (5.0, 25.0, 1.0),       # %
+    "gdc_ini": (0.0, 30.0, 0.5),       # %
+    "gdh_ini": (0.0, 15.0, 0.5),       # %
+}
+VIDA_UTIL_PASO_MESES = 0.1  # Malla de horquillado (~3 días); excursiones más cortas pueden pasar inadvertidas
+VIDA_UTIL_ITERACIONES = 12  # Bisecciones por intervalo (~1 hora de resolución)
+VIDA_UTIL_BLOQUE = 8192     # Lotes por bloque del solver (acota la memoria lotes × tiempo)
+
+# Optimizador de condiciones de almacenamiento
+COSTOS_ALMACENAMIENTO = {
+    "temperatura_ambiente": 25.0,  # °C sin acondicionamiento
+    "humedad_ambiente": 13.0,      # % sin secado
+    "enfriamiento": 0.4,           # USD/ton por °C bajo el ambiente y por mes
+    "secado": 1.5,                 # USD/ton por punto de humedad retirado (una vez)
+}
+OPTIMIZACION_MALLA = {  # Búsqueda gruesa: (mínimo, máximo, paso)
+    "temperatura": (10.0, 40.0, 1.0),
+    "humedad": (5.0, 25.0, 1.0),
+}
+OPTIMIZACION_TOLERANCIA = 0.05  # Paso final del refinamiento local (°C / %)
+OPTIMIZACION_CANDIDATOS = 3     # Mejores puntos de la malla que se refinan
+
+# Evaluación masiva de lotes
+LOTES_COLUMNAS = {  # Columna estándar -> nombres aceptados en el archivo (sin distinguir mayúsculas)
+    "lote": ("lote", "lote_id", "id", "silo", "camion"),
+    "gdc": ("gdc", "gdc_mean_in", "daño_termico"),
+    "gdh": ("gdh", "gdh_mean_in", "daño_hongos"),
+    "toneladas": ("toneladas", "ton", "tonelaje", "peso_ton"),
+}
+LOTES_BLOQUE = 20_000  # Filas por bloque en la evaluación progresiva
+LOTES_BLOQUE_ARCHIVO = 250_000  # Filas por bloque del evaluador por lotes (CLI)
+
+# API HTTP de predicción sin interfaz (python -m src.services.prediction_api)
+API_HOST = os.environ.get("SOYA_API_HOST", "127.0.0.1")
+API_PUERTO = int(os.environ.get("SOYA_API_PUERTO", 8000))
+API_MAX_BYTES = 64 * 1024 * 1024  # Cuerpo máximo de una petición
+API_MAX_FILAS = 200_000           # Filas por petición (en simulación, escenarios × tiempos)
+API_MESES_MAX = 36                # Horizonte máximo de la simulación
+
+# Diagnóstico en vivo del modelo de acidez: versiones de modelo con predicciones residentes
+DIAGNOSTICO_VERSIONES_MAX = 4
+
+# Motor de distribuciones (histograma + KDE por FFT)
+DISTRIBUCION_BINS = 30
+DISTRIBUCION_PUNTOS_KDE = 512
+
+# Figuras Plotly serializadas compartidas entre sesiones (LRU)
+FIGURAS_CACHE_MAX = 32
+
+# Reducción de trazas grandes antes de enviarlas al navegador
+DECIMACION_UMBRAL = 2000        # Puntos máximos por traza de líneas
+DECIMACION_UMBRAL_WEBGL = 1000  # Scatter de marcadores por encima de esto usan WebGL
+DECIMACION_DIGITOS = 6          # Cifras significativas en el JSON
+
+# Resultados de las calculadoras compartidos entre sesiones (LRU; en disco si se define el directorio)
+RESULTADOS_CACHE_MAX = 4096
+
+# Presupuesto global de memoria de los caches en proceso (datos, modelos, figuras y resultados)
+MEMORIA_PRESUPUESTO_MB = float(os.environ.get("SOYA_MEMORIA_MB", 512))
+MEMORIA_MAX_FRACCION = 0.25  # Entradas mayores que esta fracción del presupuesto no se guardan
+
+# Caches persistidos en disco: servicios con huella ``disco`` y ResultCache (desactivado si no se configura)
+CACHE_DISCO_DIR = os.environ.get("SOYA_CACHE_DIR") or None
+CACHE_DISCO_MB = float(os.environ.get("SOYA_CACHE_DISCO_MB", 2048))  # Total de todos los caches del directorio
+
+# Métricas de rendimiento en formato Prometheus (exportador desactivado si no se configura)
+METRICAS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # segundos
+METRICAS_PUERTO = int(os.environ.get("SOYA_METRICAS_PUERTO", 0)) or None
+METRICAS_HOST = os.environ.get("SOYA_METRICAS_HOST", "127.0.0.1")
+METRICAS_ARCHIVO = os.environ.get("SOYA_METRICAS_ARCHIVO") or None
+METRICAS_INTERVALO = 15  # segundos entre volcados al archivo
+
+# Perfilado bajo demanda de un rerun (solo administradores)
+PERFILADO_HABILITADO = os.environ.get("SOYA_PERFILADO", "").lower() not in ("", "0", "false", "no")
+PERFILADO_CLAVE = os.environ.get("SOYA_PERFILADO_CLAVE") or None  # Exige ?perfil=<clave> en la URL
+PERFILADO_DIR = os.environ.get("SOYA_PERFILADO_DIR", "perfiles")
+PERFILADO_INTERVALO = 0.005     # segundos entre muestras de pila
+PERFILADO_FILAS = 40            # Funciones en la tabla
+PERFILADO_MIN_FRACCION = 0.005  # Nodos más pequeños se omiten del gráfico de llamas
+
 # Colores corporativos
 CORPORATE_COLORS = {
     "verde_oscuro": "#1A494C",
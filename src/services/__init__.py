@@ -1,5 +1,13 @@
 # Servicios de la aplicación
 from .data_service import DataService
 from .model_service import ModelService
+from .risk_service import RiskService
+from .sensitivity_service import SensitivityService
+from .shelf_life_service import ShelfLifeService
+from .scoring_service import ScoringService
+from .economic_service import EconomicService
+from .optimization_service import OptimizationService
+from .diagnostics_service import DiagnosticsService
+from .result_cache import ResultCache
 
-__all__ = ['DataService', 'ModelService'] 
\ No newline at end of file
+__all__ = ['DataService', 'ModelService', 'RiskService', 'SensitivityService', 'ShelfLifeService', 'ScoringService', 'EconomicService', 'OptimizationService', 'DiagnosticsService', 'ResultCache'] 
\ No newline at end of file
@@ -0,0 +1,268 @@
+"""Evaluación de archivos de inventario grandes (CSV/Parquet) fuera de memoria
+
+Uso: python -m src.services.batch_scoring entrada.csv salida.csv --procesos 4 --reanudar
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from ..config.constants import ACIDEZ_MAXIMA, PROTEINA_MINIMA, LOTES_BLOQUE_ARCHIVO
+from ..utils.forest_lookup import get_lookup_table
+from .model_service import ModelService
+from .scoring_service import ScoringService
+
+# Modelos y límites cargados una sola vez por proceso del pool
+_modelos_worker = {}
+
+
+def _inicializar_worker(predictor_acidez, modelo_proteina, limites):
+    _modelos_worker["acidez"] = predictor_acidez
+    _modelos_worker["proteina"] = modelo_proteina
+    _modelos_worker["limites"] = limites
+
+
+def _evaluar_bloque(bloque, primer_lote, parquet, encabezado):
+    """Evaluar y serializar un bloque en el proceso del pool; retorna (filas, bytes)"""
+    inventario = ScoringService.normalizar_inventario(bloque, primer_lote)
+    resultado = ScoringService.evaluar_lotes(
+        inventario, _modelos_worker["acidez"], _modelos_worker["proteina"], **_modelos_worker["limites"]
+    )
+    return len(resultado), _serializar(resultado, parquet, encabezado)
+
+
+def _serializar(resultado, parquet, encabezado):
+    if parquet:
+        buffer = io.BytesIO()
+        resultado.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    return ScoringService.exportar_csv(resultado, encabezado)
+
+
+def _es_parquet(ruta):
+    return ruta.rstrip("/\\").lower().endswith((".parquet", ".pq"))
+
+
+def _leer_bloques(entrada, tamano_bloque, bloques_hechos, filas_hechas):
+    """Iterar el archivo en DataFrames de hasta ``tamano_bloque`` filas desde el punto de reanudación"""
+    if _es_parquet(entrada):
+        import pyarrow.parquet as pq
+
+        lotes = pq.ParquetFile(entrada).iter_batches(batch_size=tamano_bloque)
+        for indice, lote in enumerate(lotes):
+            if indice >= bloques_hechos:
+                yield lote.to_pandas()
+    else:
+        # Callable y no range: pandas convierte un range en set, con memoria proporcional a lo ya hecho
+        saltar = (lambda i: 0 < i <= filas_hechas) if filas_hechas else None
+        yield from pd.read_csv(entrada, chunksize=tamano_bloque, skiprows=saltar)
+
+
+class _EscritorCSV:
+    """Salida CSV única; al reanudar se trunca al último bloque confirmado"""
+
+    def __init__(self, ruta, posicion=None):
+        modo = "r+b" if posicion is not None and os.path.exists(ruta) else "wb"
+        self._archivo = open(ruta, modo)
+        if posicion is not None:
+            self._archivo.truncate(posicion)
+            self._archivo.seek(posicion)
+
+    @property
+    def vacio(self):
+        return self._archivo.tell() == 0
+
+    def escribir(self, contenido, indice):
+        self._archivo.write(contenido)
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+        return self._archivo.tell()
+
+    def cerrar(self):
+        self._archivo.close()
+
+
+class _EscritorParquet:
+    """Salida Parquet como directorio de partes (un archivo por bloque)"""
+
+    vacio = True  # Cada parte lleva su propio esquema
+
+    def __init__(self, ruta, bloques_hechos=0):
+        self._ruta = ruta
+        os.makedirs(ruta, exist_ok=True)
+        # Partes de bloques no confirmados en la ejecución interrumpida
+        for nombre in os.listdir(ruta):
+            if nombre.startswith("part-") and int(nombre[5:10]) >= bloques_hechos:
+                os.remove(os.path.join(ruta, nombre))
+
+    def escribir(self, contenido, indice):
+        destino = os.path.join(self._ruta, f"part-{indice:05d}.parquet")
+        with open(destino + ".tmp", "wb") as f:
+            f.write(contenido)
+        os.replace(destino + ".tmp", destino)
+        return None
+
+    def cerrar(self):
+        pass
+
+
+def _leer_progreso(ruta):
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _guardar_progreso(ruta, progreso):
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(progreso, f, indent=2)
+    os.replace(temporal, ruta)
+
+
+def evaluar_archivo(entrada, salida, tamano_bloque=LOTES_BLOQUE_ARCHIVO, n_procesos=None,
+                    reanudar=False, acidez_maxima=ACIDEZ_MAXIMA, proteina_minima=PROTEINA_MINIMA,
+                    informar=print):
+    """Evaluar ``entrada`` por bloques y escribir los resultados en ``salida``
+
+    Los bloques se evalúan y serializan en un pool de ``n_procesos`` con a lo sumo
+    dos bloques pendientes por proceso, así que la memoria no depende del tamaño
+    del archivo. Los resultados se escriben en orden y, tras cada bloque, se guarda
+    el progreso en ``<salida>.progreso.json``; con ``reanudar=True`` se continúa
+    desde el último bloque confirmado. Retorna un resumen con filas, bloques, segundos y filas/s.
+    """
+    ruta_progreso = salida.rstrip("/\\") + ".progreso.json"
+    version_modelo = ModelService.get_acidez_model_version()
+    configuracion = {
+        "entrada": os.path.abspath(entrada),
+        "tamano_bloque": tamano_bloque,
+        "version_modelo": version_modelo,
+        "acidez_maxima": acidez_maxima,
+        "proteina_minima": proteina_minima,
+    }
+
+    progreso = _leer_progreso(ruta_progreso) if reanudar else None
+    if progreso is not None:
+        distintos = [k for k, v in configuracion.items() if progreso.get(k) != v]
+        if distintos:
+            raise ValueError(f"No se puede reanudar: cambió {', '.join(distintos)} respecto a la ejecución previa")
+        if progreso.get("completo"):
+            informar(f"{salida} ya está completo ({progreso['filas']:,} filas)")
+            return {"filas": progreso["filas"], "bloques": progreso["bloques"], "segundos": 0.0, "filas_por_segundo": 0.0}
+        informar(f"Reanudando desde el bloque {progreso['bloques']} ({progreso['filas']:,} filas)")
+    else:
+        progreso = {**configuracion, "bloques": 0, "filas": 0, "posicion_salida": None, "completo": False}
+
+    parquet = _es_parquet(salida)
+    if parquet:
+        escritor = _EscritorParquet(salida, progreso["bloques"])
+    else:
+        escritor = _EscritorCSV(salida, progreso["posicion_salida"])
+
+    acidez_model = ModelService.load_acidez_model()
+    proteina_model = ModelService.load_proteina_model()
+    # La tabla exacta del bosque viaja a los procesos en vez de los árboles
+    tabla = get_lookup_table(acidez_model)
+    initargs = (
+        tabla if tabla is not None else acidez_model,
+        proteina_model,
+        {"acidez_maxima": acidez_maxima, "proteina_minima": proteina_minima},
+    )
+    n_procesos = n_procesos or os.cpu_count() or 1
+    pool = None
+    if n_procesos > 1:
+        pool = ProcessPoolExecutor(max_workers=n_procesos, initializer=_inicializar_worker, initargs=initargs)
+    else:
+        _inicializar_worker(*initargs)
+
+    inicio = time.perf_counter()
+    filas_sesion = 0
+    pendientes = deque()
+
+    def confirmar(evaluado):
+        nonlocal filas_sesion
+        filas, contenido = evaluado
+        posicion = escritor.escribir(contenido, progreso["bloques"])
+        progreso["bloques"] += 1
+        progreso["filas"] += filas
+        progreso["posicion_salida"] = posicion
+        _guardar_progreso(ruta_progreso, progreso)
+        filas_sesion += filas
+        transcurrido = time.perf_counter() - inicio
+        informar(
+            f"Bloque {progreso['bloques']}: {progreso['filas']:,} filas "
+            f"({filas_sesion / max(transcurrido, 1e-9):,.0f} filas/s)"
+        )
+
+    try:
+        primer_lote = progreso["filas"] + 1
+        encabezado = escritor.vacio
+        for bloque in _leer_bloques(entrada, tamano_bloque, progreso["bloques"], progreso["filas"]):
+            argumentos = (bloque, primer_lote, parquet, encabezado or parquet)
+            if pool is None:
+                confirmar(_evaluar_bloque(*argumentos))
+            else:
+                pendientes.append(pool.submit(_evaluar_bloque, *argumentos))
+                while len(pendientes) >= 2 * n_procesos:
+                    confirmar(pendientes.popleft().result())
+            primer_lote += len(bloque)
+            encabezado = False
+        while pendientes:
+            confirmar(pendientes.popleft().result())
+    finally:
+        for futuro in pendientes:
+            futuro.cancel()
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        escritor.cerrar()
+
+    progreso["completo"] = True
+    _guardar_progreso(ruta_progreso, progreso)
+    segundos = time.perf_counter() - inicio
+    resumen = {
+        "filas": filas_sesion,
+        "bloques": progreso["bloques"],
+        "segundos": segundos,
+        "filas_por_segundo": filas_sesion / max(segundos, 1e-9),
+    }
+    informar(
+        f"Completo: {progreso['filas']:,} filas en {progreso['bloques']} bloques "
+        f"({resumen['filas_por_segundo']:,.0f} filas/s en esta ejecución)"
+    )
+    return resumen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Evaluar inventarios de lotes (acidez, proteína y clase de calidad) por bloques"
+    )
+    parser.add_argument("entrada", help="Archivo CSV o Parquet con columnas GDC y GDH")
+    parser.add_argument("salida", help="Archivo CSV o directorio .parquet de resultados")
+    parser.add_argument("--tamano-bloque", type=int, default=LOTES_BLOQUE_ARCHIVO, help="Filas por bloque")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos del pool (por defecto, núcleos disponibles)")
+    parser.add_argument("--reanudar", action="store_true", help="Continuar desde el último bloque confirmado")
+    parser.add_argument("--acidez-maxima", type=float, default=ACIDEZ_MAXIMA)
+    parser.add_argument("--proteina-minima", type=float, default=PROTEINA_MINIMA)
+    args = parser.parse_args(argv)
+
+    try:
+        evaluar_archivo(
+            args.entrada, args.salida, args.tamano_bloque, args.procesos, args.reanudar,
+            args.acidez_maxima, args.proteina_minima,
+            informar=lambda mensaje: print(mensaje, file=sys.stderr, flush=True)
+        )
+    except (ValueError, FileNotFoundError, ImportError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,41 +1,75 @@
+import logging
+import os
 import pandas as pd
-import streamlit as st
 from ..config.constants import (
-    ACIDEZ_DATA_FILE, PROTEINA_DATA_FILE, SEGUIMIENTO_DATA_FILE
+    ACIDEZ_DATA_FILE, PROTEINA_DATA_FILE, SEGUIMIENTO_DATA_FILE, DISTRIBUCION_BINS
 )
+from ..utils.distribuciones import Distribuciones
+from ..utils.presupuesto import PresupuestoMemoria
+
+logger = logging.getLogger(__name__)
 
 class DataService:
-    """Servicio para manejo de datos con cache optimizado"""
+    """Servicio para manejo de datos con cache optimizado
+    
+    No depende de Streamlit: los errores de carga se registran con ``logging``
+    (marcados ``aviso`` para que la interfaz los muestre) y los cargadores
+    retornan un DataFrame vacío, que no se cachea.
+    """
     
     @staticmethod
-    @st.cache_data(ttl=3600)  # Cache por 1 hora
-    def load_acidez_data():
-        """Cargar datos de acidez con cache"""
+    def _cargar(leer, descripcion):
         try:
-            return pd.read_csv(ACIDEZ_DATA_FILE)
+            return leer()
         except Exception as e:
-            st.error(f"Error cargando datos de acidez: {e}")
+            logger.error("Error cargando %s: %s", descripcion, e, extra={"aviso": True})
             return pd.DataFrame()
     
     @staticmethod
-    @st.cache_data(ttl=3600)
+    @PresupuestoMemoria.cache("datos.acidez", ttl=3600)  # Cache por 1 hora
+    def _leer_acidez():
+        return pd.read_csv(ACIDEZ_DATA_FILE)
+    
+    @staticmethod
+    @PresupuestoMemoria.cache("datos.proteina", ttl=3600)
+    def _leer_proteina():
+        return pd.read_csv(PROTEINA_DATA_FILE)
+    
+    @staticmethod
+    @PresupuestoMemoria.cache("datos.seguimiento", ttl=3600)
+    def _leer_seguimiento():
+        return pd.read_csv(SEGUIMIENTO_DATA_FILE)
+    
+    @staticmethod
+    def load_acidez_data():
+        """Cargar datos de acidez con cache"""
+        return DataService._cargar(DataService._leer_acidez, "datos de acidez")
+    
+    @staticmethod
     def load_proteina_data():
         """Cargar datos de proteína con cache"""
-        try:
-            return pd.read_csv(PROTEINA_DATA_FILE)
-        except Exception as e:
-            st.error(f"Error cargando datos de proteína: {e}")
-            return pd.DataFrame()
+        return DataService._cargar(DataService._leer_proteina, "datos de proteína")
     
     @staticmethod
-    @st.cache_data(ttl=3600)
     def load_seguimiento_data():
         """Cargar datos de seguimiento con cache"""
+        return DataService._cargar(DataService._leer_seguimiento, "datos de seguimiento")
+    
+    @staticmethod
+    def get_data_version(path=PROTEINA_DATA_FILE):
+        """Versión de un archivo de datos (fecha de modificación y tamaño), útil como llave de cache"""
         try:
-            return pd.read_csv(SEGUIMIENTO_DATA_FILE)
-        except Exception as e:
-            st.error(f"Error cargando datos de seguimiento: {e}")
-            return pd.DataFrame()
+            stat = os.stat(path)
+            return f"{stat.st_mtime_ns}-{stat.st_size}"
+        except OSError:
+            return None
+    
+    @staticmethod
+    @PresupuestoMemoria.cache("datos.distribucion", maximo_entradas=32)
+    def resumir_distribucion(archivo, version, columna, bins=DISTRIBUCION_BINS):
+        """Histograma + KDE de una columna, cacheado por versión del archivo (``get_data_version``)"""
+        valores = pd.to_numeric(pd.read_csv(archivo, usecols=[columna])[columna], errors="coerce")
+        return Distribuciones.resumir(valores.to_numpy(dtype=float), bins)
     
     @staticmethod
     def get_acidez_media():
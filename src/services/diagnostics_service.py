@@ -0,0 +1,115 @@
+import functools
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from ..config.constants import ACIDEZ_DATA_FILE, DIAGNOSTICO_VERSIONES_MAX
+from .model_service import ModelService
+
+COLUMNAS_DIAGNOSTICO = ("gdc_mean_in", "gdh_mean_in", "pct_oil_acidez_mean")
+
+
+class _EstadoDiagnostico:
+    """Predicciones de una versión de modelo sobre un archivo de datos, extensibles por filas añadidas"""
+
+    def __init__(self):
+        self.tamano = 0          # Bytes del archivo ya evaluados
+        self.huella = None       # SHA-256 de esos bytes
+        self.firma = None        # (fecha de modificación, tamaño) del archivo evaluado
+        self.columnas = None
+        self.datos = None
+        self.lock = threading.Lock()
+
+
+class _RegistroDiagnosticos:
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self.estados = OrderedDict()
+        self.lock = threading.Lock()
+
+    def estado(self, llave):
+        with self.lock:
+            if llave not in self.estados:
+                self.estados[llave] = _EstadoDiagnostico()
+            self.estados.move_to_end(llave)
+            while len(self.estados) > self.maximo:
+                self.estados.popitem(last=False)
+            return self.estados[llave]
+
+
+class DiagnosticsService:
+    """Diagnóstico en vivo del modelo de acidez sobre los datos actuales"""
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def registro():
+        return _RegistroDiagnosticos(DIAGNOSTICO_VERSIONES_MAX)
+
+    @staticmethod
+    def calcular_diagnostico(version_modelo, ruta=ACIDEZ_DATA_FILE, acidez_model=None):
+        """Valores reales, predichos y residuos de cada fila de ``ruta`` con la versión de modelo dada
+
+        Compartido entre sesiones por (versión de modelo, archivo). Si el archivo solo
+        creció por filas añadidas al final (los bytes ya evaluados conservan su
+        huella), únicamente se predicen las filas nuevas; cualquier otro cambio
+        recalcula todo en una sola evaluación del bosque. Retorna ``(datos, huella)``
+        con la huella SHA-256 del contenido evaluado, útil como llave de cache; el
+        DataFrame es compartido y no debe modificarse.
+        """
+        estado = DiagnosticsService.registro().estado((version_modelo, ruta))
+        stat = os.stat(ruta)
+        firma = (stat.st_mtime_ns, stat.st_size)
+
+        with estado.lock:
+            # Archivo sin cambios: ni siquiera se lee
+            if estado.firma == firma:
+                return estado.datos, estado.huella
+            with open(ruta, "rb") as f:
+                contenido = f.read()
+            incremental = (
+                estado.huella is not None
+                and len(contenido) >= estado.tamano
+                and contenido[estado.tamano - 1:estado.tamano] == b"\n"
+                and hashlib.sha256(contenido[:estado.tamano]).hexdigest() == estado.huella
+            )
+            if incremental:
+                resto = contenido[estado.tamano:]
+                nuevas = pd.read_csv(io.BytesIO(resto), header=None, names=estado.columnas) if resto.strip() else None
+            else:
+                nuevas = pd.read_csv(io.BytesIO(contenido))
+                estado.columnas = list(nuevas.columns)
+
+            if nuevas is not None:
+                nuevas = nuevas[list(COLUMNAS_DIAGNOSTICO)].apply(pd.to_numeric, errors="coerce").dropna()
+                nuevas["predicha"] = ModelService.predict_acidez_batch(
+                    nuevas["gdc_mean_in"].to_numpy(dtype=float), nuevas["gdh_mean_in"].to_numpy(dtype=float),
+                    acidez_model if acidez_model is not None else ModelService.load_acidez_model()
+                )
+                nuevas["residuo"] = nuevas["pct_oil_acidez_mean"] - nuevas["predicha"]
+                if incremental and len(estado.datos):
+                    estado.datos = pd.concat([estado.datos, nuevas], ignore_index=True)
+                else:
+                    estado.datos = nuevas.reset_index(drop=True)
+
+            estado.tamano = len(contenido)
+            estado.firma = firma
+            estado.huella = hashlib.sha256(contenido).hexdigest()
+            return estado.datos, estado.huella
+
+    @staticmethod
+    def calcular_metricas(reales, predichas):
+        """RMSE, MAE y R² de las predicciones"""
+        reales = np.asarray(reales, dtype=float)
+        errores = reales - np.asarray(predichas, dtype=float)
+        total = np.sum((reales - reales.mean()) ** 2) if len(reales) else 0.0
+        return {
+            "rmse": float(np.sqrt(np.mean(errores ** 2))) if len(reales) else float("nan"),
+            "mae": float(np.mean(np.abs(errores))) if len(reales) else float("nan"),
+            "r2": float(1 - np.sum(errores ** 2) / total) if total > 0 else float("nan"),
+            "n": int(len(reales)),
+        }
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from ..config.constants import (
+    CALIDAD_PRODUCTOS, PRECIOS_PRODUCTOS, RENDIMIENTO_PRODUCTOS, ESCENARIOS_PRECIOS
+)
+from ..utils.calculations import Calculations
+from ..utils.presupuesto import PresupuestoMemoria
+
+PRODUCTOS = tuple(CALIDAD_PRODUCTOS)
+
+
+class EconomicService:
+    """Pérdidas económicas por daño del grano sobre escenarios de precios"""
+
+    @staticmethod
+    def escenarios_precios(multiplicadores=None, precios=None):
+        """Matriz de precios (escenario × producto) en USD/ton de producto"""
+        multiplicadores = multiplicadores or ESCENARIOS_PRECIOS
+        precios = {**PRECIOS_PRODUCTOS, **(precios or {})}
+        return pd.DataFrame(
+            [[precios[p] * factor for p in PRODUCTOS] for factor in multiplicadores.values()],
+            index=pd.Index(list(multiplicadores), name="escenario"),
+            columns=pd.Index(PRODUCTOS, name="producto"),
+        )
+
+    @staticmethod
+    def perdida_unitaria(gdt):
+        """Fracción de valor perdida por producto respecto al grano sin daño: (lotes × productos)
+
+        Usa ``Calculations.calcular_impacto_productos_lote``: la calidad del producto
+        pasa de su calidad base (GDT = 0) a la calidad con el GDT del lote.
+        """
+        impacto = Calculations.calcular_impacto_productos_lote(np.atleast_1d(gdt))
+        return np.column_stack([CALIDAD_PRODUCTOS[p] - impacto[p] for p in PRODUCTOS])
+
+    @staticmethod
+    @PresupuestoMemoria.cache("perdidas", maximo_entradas=32, ttl=3600)
+    def resumir_perdidas(toneladas, gdt, precios, grupos=None):
+        """Pérdidas agregadas en formato largo: grupo, escenario, producto, perdida_usd
+
+        Las pérdidas de cada lote son lineales en toneladas × pérdida unitaria, así
+        que se suman por grupo antes de multiplicar por los precios: el cubo se
+        forma sobre grupos (G × S × P) y no sobre lotes, con memoria independiente
+        del tamaño del inventario. Cacheado por contenido de los arreglos para que
+        la UI pueda pivotar sin recalcular.
+        """
+        toneladas = np.asarray(toneladas, dtype=float)
+        validos = ~(np.isnan(toneladas) | np.isnan(np.asarray(gdt, dtype=float)))
+        if grupos is None:
+            grupos = np.full(len(toneladas), "Total", dtype=object)
+        codigos, nombres = pd.factorize(np.asarray(grupos)[validos], sort=True)
+
+        ponderada = toneladas[validos, None] * EconomicService.perdida_unitaria(np.asarray(gdt)[validos])
+        por_grupo = np.column_stack([
+            np.bincount(codigos, weights=ponderada[:, j], minlength=len(nombres))
+            for j in range(len(PRODUCTOS))
+        ]).reshape(len(nombres), len(PRODUCTOS))
+        rendimiento = np.array([RENDIMIENTO_PRODUCTOS[p] for p in PRODUCTOS])
+        cubo = (por_grupo * rendimiento)[:, None, :] * np.asarray(precios, dtype=float)[None, :, :]
+
+        escenarios = precios.index if isinstance(precios, pd.DataFrame) else np.arange(cubo.shape[1])
+        indice = pd.MultiIndex.from_product(
+            [nombres, escenarios, PRODUCTOS], names=["grupo", "escenario", "producto"]
+        )
+        return pd.DataFrame({"perdida_usd": cubo.ravel()}, index=indice).reset_index()
@@ -0,0 +1,298 @@
+import os
+import json
+import shutil
+import logging
+import threading
+from collections import OrderedDict
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from ..config.constants import (
+    ACIDEZ_REGISTRY_PATH, ACIDEZ_MODEL_FILE, ACIDEZ_METRICS_FILE, ACIDEZ_INFO_FILE,
+    REGISTRY_ACTIVE_FILE, REGISTRY_POLL_SECONDS, REGISTRY_MEMORY_BUDGET_MB
+)
+from ..utils.forest_lookup import get_lookup_table
+
+logger = logging.getLogger(__name__)
+
+# Versión implícita cuando el registro aún no tiene versiones publicadas
+LEGACY_VERSION = "artifacts"
+
+
+class ModelVersion:
+    """Versión de modelo residente en memoria"""
+
+    def __init__(self, version, model, metrics, info, size_bytes, huella=None):
+        self.version = version
+        self.model = model
+        self.metrics = metrics
+        self.info = info
+        self.size_bytes = size_bytes
+        # Contenido cargado (ruta, tamaño, mtime): distingue artefactos reemplazados bajo el mismo nombre
+        self.huella = huella
+
+
+class ModelRegistry:
+    """Registro versionado de modelos con intercambio atómico en caliente
+
+    Estructura en disco::
+
+        <registry_path>/
+            ACTIVE                  # nombre de la versión activa
+            <version>/
+                random_forest_acidez.pkl
+                metrics_acidez.json
+                model_info_acidez.json
+
+    Un hilo vigilante revisa el puntero ``ACTIVE``; cuando cambia, carga y valida
+    la nueva versión en segundo plano y la activa para todas las sesiones. Las
+    versiones anteriores quedan residentes para rollback mientras quepan en el
+    presupuesto de memoria.
+    """
+
+    def __init__(self, registry_path=ACIDEZ_REGISTRY_PATH,
+                 model_file=ACIDEZ_MODEL_FILE, metrics_file=ACIDEZ_METRICS_FILE,
+                 info_file=ACIDEZ_INFO_FILE, poll_seconds=REGISTRY_POLL_SECONDS,
+                 memory_budget_mb=REGISTRY_MEMORY_BUDGET_MB):
+        self.registry_path = registry_path
+        self.legacy_dir = os.path.dirname(model_file)
+        self.model_filename = os.path.basename(model_file)
+        self.metrics_filename = os.path.basename(metrics_file)
+        self.info_filename = os.path.basename(info_file)
+        self.poll_seconds = poll_seconds
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+
+        self._lock = threading.Lock()
+        self._active = None
+        self._resident = OrderedDict()  # versión -> ModelVersion (más reciente al final)
+        self._pointer = None
+        self._fallido = None  # (versión, estado de sus archivos) del último intento fallido
+        self._stop = threading.Event()
+        self._watcher = None
+
+    # ----- Consulta -----
+
+    @property
+    def active(self):
+        """Versión activa (lectura atómica, sin bloqueo)"""
+        return self._active
+
+    def resident_versions(self):
+        """Versiones residentes en memoria, de la más antigua a la más reciente"""
+        with self._lock:
+            return list(self._resident.keys())
+
+    def memoria_bytes(self):
+        """Tamaño de las versiones residentes, para el presupuesto de caches
+
+        Suma el artefacto de cada versión y su ``ForestLookupTable`` ya construida
+        (varios MB por modelo, fuera de cualquier otro cache).
+        """
+        with self._lock:
+            modelos = [(e.model, e.size_bytes) for e in self._resident.values()]
+        total = 0
+        for model, size_bytes in modelos:
+            # Cada versión pidió su tabla al activarse: aquí solo se consulta, sin esperar
+            tabla = get_lookup_table(model, esperar=False)
+            total += size_bytes + (tabla.nbytes if tabla is not None else 0)
+        return total
+
+    def available_versions(self):
+        """Versiones publicadas en disco"""
+        if not os.path.isdir(self.registry_path):
+            return []
+        return sorted(
+            d for d in os.listdir(self.registry_path)
+            if os.path.isfile(os.path.join(self.registry_path, d, self.model_filename))
+        )
+
+    # ----- Ciclo de vida -----
+
+    def start(self):
+        """Cargar la versión activa y arrancar el hilo vigilante"""
+        self.refresh()
+        if self._watcher is None and self.poll_seconds > 0:
+            self._watcher = threading.Thread(
+                target=self._watch, name="model-registry-watcher", daemon=True
+            )
+            self._watcher.start()
+        return self
+
+    def stop(self):
+        """Detener el hilo vigilante"""
+        self._stop.set()
+
+    def refresh(self):
+        """Revisar el puntero y activar la versión indicada si cambió"""
+        pointer = self._read_pointer()
+        if pointer == self._pointer and self._active is not None:
+            return False
+        intento = (pointer, self._estado_version(pointer))
+        if intento == self._fallido:
+            return False  # Nada cambió desde el último fallo: se reintenta cuando el operador corrija la versión
+        try:
+            self._activate(pointer)
+        except Exception as e:
+            # Una versión inválida nunca reemplaza a la activa
+            logger.error("No se pudo activar la versión de modelo '%s': %s", pointer, e)
+            self._fallido = intento
+            return False
+        self._pointer = pointer
+        self._fallido = None
+        return True
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Error vigilando el registro de modelos")
+
+    # ----- Publicación y rollback -----
+
+    def publish(self, source_dir, version, activate=True):
+        """Copiar artefactos de ``source_dir`` al registro como ``version``"""
+        target = os.path.join(self.registry_path, version)
+        if os.path.exists(target):
+            raise ValueError(f"La versión '{version}' ya existe en el registro")
+        staging = target + ".tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        for filename in (self.model_filename, self.metrics_filename, self.info_filename):
+            src = os.path.join(source_dir, filename)
+            if os.path.exists(src):
+                shutil.copy2(src, os.path.join(staging, filename))
+        if not os.path.exists(os.path.join(staging, self.model_filename)):
+            shutil.rmtree(staging, ignore_errors=True)
+            raise FileNotFoundError(f"No se encontró {self.model_filename} en {source_dir}")
+        os.replace(staging, target)
+        if activate:
+            self.set_active(version)
+        return target
+
+    def set_active(self, version):
+        """Apuntar la versión activa (escritura atómica del puntero)"""
+        if version != LEGACY_VERSION and version not in self.available_versions():
+            raise ValueError(f"La versión '{version}' no existe en el registro")
+        os.makedirs(self.registry_path, exist_ok=True)
+        pointer_file = os.path.join(self.registry_path, REGISTRY_ACTIVE_FILE)
+        tmp_file = pointer_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            f.write(version + "\n")
+        os.replace(tmp_file, pointer_file)
+
+    def rollback(self):
+        """Volver a la versión residente anterior a la activa"""
+        with self._lock:
+            previous = [v for v in self._resident if self._active and v != self._active.version]
+        if not previous:
+            raise RuntimeError("No hay versiones previas residentes para rollback")
+        version = previous[-1]
+        self.set_active(version)
+        self.refresh()
+        return version
+
+    # ----- Internos -----
+
+    def _read_pointer(self):
+        pointer_file = os.path.join(self.registry_path, REGISTRY_ACTIVE_FILE)
+        try:
+            with open(pointer_file, "r") as f:
+                version = f.read().strip()
+            return version or LEGACY_VERSION
+        except FileNotFoundError:
+            return LEGACY_VERSION
+
+    def _version_dir(self, version):
+        if version == LEGACY_VERSION:
+            return self.legacy_dir
+        return os.path.join(self.registry_path, version)
+
+    def _estado_version(self, version):
+        """Tamaño y mtime de los archivos de ``version`` (None por cada archivo que falta)"""
+        estado = []
+        for filename in (self.model_filename, self.metrics_filename, self.info_filename):
+            try:
+                stat = os.stat(os.path.join(self._version_dir(version), filename))
+                estado.append((stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                estado.append(None)
+        return tuple(estado)
+
+    def _activate(self, version):
+        with self._lock:
+            entry = self._resident.get(version)
+        if entry is None:
+            entry = self._load(version)
+            self._validate(entry)
+        with self._lock:
+            self._resident[version] = entry
+            self._resident.move_to_end(version)
+            self._active = entry  # Intercambio atómico para todas las sesiones
+            self._enforce_budget()
+        # Precalcular en segundo plano la tabla de predicción rápida del bosque
+        get_lookup_table(entry.model, esperar=False)
+        logger.info("Modelo de acidez activo: versión '%s'", version)
+
+    def _load(self, version):
+        version_dir = self._version_dir(version)
+        model_path = os.path.join(version_dir, self.model_filename)
+        stat = os.stat(model_path)
+        model = joblib.load(model_path)
+        metrics = self._load_json(os.path.join(version_dir, self.metrics_filename))
+        info = self._load_json(os.path.join(version_dir, self.info_filename))
+        huella = (os.path.abspath(model_path), stat.st_size, stat.st_mtime_ns)
+        return ModelVersion(version, model, metrics, info, stat.st_size, huella)
+
+    @staticmethod
+    def _load_json(path):
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _validate(entry):
+        """Verificar que el modelo prediga valores finitos en el dominio de daño"""
+        model = entry.model
+        if not hasattr(model, "predict"):
+            raise TypeError("El artefacto no expone predict()")
+        columns = list(getattr(model, "feature_names_in_", ["gdc_mean_in", "gdh_mean_in"]))
+        if len(columns) != 2:
+            raise ValueError(f"Se esperaban 2 variables (GDC, GDH) y el modelo usa {len(columns)}")
+        gdc, gdh = np.meshgrid(np.linspace(0, 100, 5), np.linspace(0, 50, 5))
+        X_probe = pd.DataFrame(np.column_stack([gdc.ravel(), gdh.ravel()]), columns=columns)
+        y_probe = np.asarray(model.predict(X_probe), dtype=float)
+        if y_probe.shape != (len(X_probe),) or not np.isfinite(y_probe).all():
+            raise ValueError("El modelo produjo predicciones inválidas en la validación")
+
+    def _enforce_budget(self):
+        # Llamar con el bloqueo tomado; la versión activa nunca se descarta
+        total = sum(e.size_bytes for e in self._resident.values())
+        for version in list(self._resident.keys()):
+            if total <= self.memory_budget_bytes:
+                break
+            if version == self._active.version:
+                continue
+            total -= self._resident.pop(version).size_bytes
+            logger.info("Versión de modelo '%s' descartada de memoria (presupuesto)", version)
+
+
+if __name__ == "__main__":
+    # Uso: python -m src.services.model_registry publicar <dir> <version>
+    #      python -m src.services.model_registry activar <version>
+    import sys
+
+    registry = ModelRegistry(poll_seconds=0)
+    command, args = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ("listar", [])
+    if command == "publicar":
+        print(registry.publish(args[0], args[1]))
+    elif command == "activar":
+        registry.set_active(args[0])
+    else:
+        print("Activa:", registry._read_pointer())
+        for version in registry.available_versions():
+            print(" -", version)
@@ -1,35 +1,63 @@
-import os
-import joblib
-import json
+import logging
 import numpy as np
-import streamlit as st
 from sklearn.linear_model import LinearRegression
 import pandas as pd
-from ..config.constants import (
-    ACIDEZ_MODEL_FILE, ACIDEZ_METRICS_FILE, ACIDEZ_INFO_FILE,
-    PROTEINA_DATA_FILE
-)
+from ..config.constants import SUPERFICIE_ACIDEZ, CURVA_ACIDEZ_PERCENTILES, PROTEINA_DATA_FILE
+from ..utils.forest_lookup import ForestLookupTable, get_lookup_table
+from ..utils.metricas import Metricas
+from ..utils.presupuesto import PresupuestoMemoria
 from .data_service import DataService
+from .model_registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
 
 class ModelService:
-    """Servicio para manejo de modelos con cache optimizado"""
+    """Servicio para manejo de modelos con cache optimizado
+
+    No depende de Streamlit: si un modelo o sus metadatos faltan se retorna
+    None (o ``{}``) y se registra un aviso con ``logging`` que la interfaz muestra.
+    """
     
     @staticmethod
-    @st.cache_resource
+    @PresupuestoMemoria.cache("modelo.registro_acidez", fijo=True)
+    def get_acidez_registry():
+        """Registro de versiones del modelo de acidez (compartido por todas las sesiones)"""
+        return ModelRegistry().start()
+
+    @staticmethod
     def load_acidez_model():
-        """Cargar modelo de acidez con cache persistente"""
+        """Cargar la versión activa del modelo de acidez desde el registro"""
         try:
-            if os.path.exists(ACIDEZ_MODEL_FILE):
-                return joblib.load(ACIDEZ_MODEL_FILE)
-            else:
-                st.warning("Modelo de acidez no encontrado")
+            active = ModelService.get_acidez_registry().active
+            if active is None:
+                logger.warning("Modelo de acidez no encontrado", extra={"aviso": True})
                 return None
+            return active.model
         except Exception as e:
-            st.error(f"Error cargando modelo de acidez: {e}")
+            logger.error("Error cargando modelo de acidez: %s", e, extra={"aviso": True})
             return None
+
+    @staticmethod
+    def get_acidez_model_version():
+        """Versión activa del modelo de acidez (útil como llave de cache)"""
+        active = ModelService.get_acidez_registry().active
+        return active.version if active is not None else None
+
+    @staticmethod
+    def huella_acidez(*archivos):
+        """Huella del contenido del modelo activo y de ``archivos`` (``get_data_version``)
+
+        Llave de persistencia en disco: cambia si se reemplaza el artefacto aunque
+        conserve su versión (``artifacts``). None si no hay modelo o falta un archivo.
+        """
+        active = ModelService.get_acidez_registry().active
+        versiones = tuple(DataService.get_data_version(a) for a in archivos)
+        if active is None or active.huella is None or None in versiones:
+            return None
+        return (active.huella,) + versiones
     
     @staticmethod
-    @st.cache_resource
+    @PresupuestoMemoria.cache("modelo.proteina", fijo=True)
     def load_proteina_model():
         """Cargar modelo de proteína con cache persistente"""
         try:
@@ -45,63 +73,122 @@ class ModelService:
             model_protein.fit(X_protein, y_protein)
             return model_protein
         except Exception as e:
-            st.warning(f"No se pudo cargar el modelo de proteína: {e}")
+            logger.warning("No se pudo cargar el modelo de proteína: %s", e, extra={"aviso": True})
             return None
     
     @staticmethod
-    @st.cache_data(ttl=3600)
     def load_model_metrics():
-        """Cargar métricas del modelo con cache"""
-        try:
-            with open(ACIDEZ_METRICS_FILE, "r") as f:
-                return json.load(f)
-        except Exception as e:
-            st.warning(f"No se pudieron cargar las métricas del modelo: {e}")
+        """Cargar métricas de la versión activa del modelo"""
+        active = ModelService.get_acidez_registry().active
+        if active is None or not active.metrics:
+            logger.warning("No se pudieron cargar las métricas del modelo", extra={"aviso": True})
             return {}
+        return active.metrics
     
     @staticmethod
-    @st.cache_data(ttl=3600)
     def load_model_info():
-        """Cargar información del modelo con cache"""
-        try:
-            with open(ACIDEZ_INFO_FILE, "r") as f:
-                return json.load(f)
-        except Exception as e:
-            st.warning(f"No se pudo cargar la información del modelo: {e}")
+        """Cargar información de la versión activa del modelo"""
+        active = ModelService.get_acidez_registry().active
+        if active is None or not active.info:
+            logger.warning("No se pudo cargar la información del modelo", extra={"aviso": True})
             return {}
+        return active.info
     
     @staticmethod
     def predict_acidez(gdc, gdh, model=None):
         """Predecir acidez usando el modelo"""
+        return float(ModelService.predict_acidez_batch(gdc, gdh, model))
+    
+    @staticmethod
+    def predict_proteina(gdt, model=None):
+        """Predecir proteína usando el modelo"""
+        return float(ModelService.predict_proteina_batch(gdt, model))
+    
+    @staticmethod
+    @Metricas.medido("modelo.predecir_acidez")
+    def predict_acidez_batch(gdc, gdh, model=None):
+        """Predecir acidez para arreglos de GDC/GDH en una sola evaluación del modelo
+        
+        Acepta escalares o arreglos de cualquier forma; retorna un arreglo con la
+        forma difundida de ``gdc`` y ``gdh``. ``model`` puede ser el bosque o su
+        ``ForestLookupTable``; para bosques se usa la tabla exacta en cuanto está lista.
+        """
+        gdc, gdh = np.broadcast_arrays(np.asarray(gdc, dtype=float), np.asarray(gdh, dtype=float))
         if model is None:
             # Fallback: modelo simplificado
             acidez_base = 0.5
             incremento_acidez = (gdc + gdh) * 0.02
             return acidez_base + incremento_acidez
         
-        # Usar modelo real con DataFrame para evitar warnings
-        try:
-            X_pred = pd.DataFrame([[gdc, gdh]], columns=['GDC', 'GDH'])
-            return model.predict(X_pred)[0]
-        except:
-            # Fallback si hay problemas con feature names
-            X_pred = np.array([[gdc, gdh]])
-            return model.predict(X_pred)[0]
+        tabla = model if isinstance(model, ForestLookupTable) else get_lookup_table(model, esperar=False)
+        if tabla is not None:
+            return tabla.predict(gdc, gdh)
+        
+        # Usar los nombres de variables con que se entrenó el modelo para evitar warnings
+        X_pred = np.column_stack([gdc.ravel(), gdh.ravel()])
+        feature_names = getattr(model, "feature_names_in_", None)
+        if feature_names is not None:
+            X_pred = pd.DataFrame(X_pred, columns=feature_names)
+        return np.asarray(model.predict(X_pred), dtype=float).reshape(gdc.shape)
     
     @staticmethod
-    def predict_proteina(gdt, model=None):
-        """Predecir proteína usando el modelo"""
+    @PresupuestoMemoria.cache("modelo.superficie_acidez", maximo_entradas=4,
+                              disco=lambda *args, **kwargs: ModelService.huella_acidez())
+    def superficie_acidez(version_modelo, paso=SUPERFICIE_ACIDEZ["paso"]):
+        """Acidez predicha sobre todo el plano GDC × GDH, una vez por versión de modelo
+
+        Retorna los ejes ``gdc`` y ``gdh`` y la matriz float32 (len(gdc) × len(gdh)).
+        """
+        model = ModelService.load_acidez_model()
+        tabla = get_lookup_table(model)
+        (gdc_min, gdc_max), (gdh_min, gdh_max) = SUPERFICIE_ACIDEZ["gdc"], SUPERFICIE_ACIDEZ["gdh"]
+        gdc = np.round(np.arange(gdc_min, gdc_max + paso / 2, paso), 6)
+        gdh = np.round(np.arange(gdh_min, gdh_max + paso / 2, paso), 6)
+        valores = ModelService.predict_acidez_batch(
+            gdc[:, np.newaxis], gdh[np.newaxis, :], tabla if tabla is not None else model
+        )
+        return gdc, gdh, valores.astype(np.float32)
+
+    @staticmethod
+    @PresupuestoMemoria.cache("modelo.curva_acidez", maximo_entradas=8,
+                              disco=lambda *args, **kwargs: ModelService.huella_acidez(PROTEINA_DATA_FILE))
+    def curva_acidez_marginal(version_modelo, version_datos, gdt, percentiles=CURVA_ACIDEZ_PERCENTILES):
+        """Acidez esperada vs GDT sobre la distribución empírica de la proporción GDC/GDH
+
+        Cada lote de ``datos_gdt_protein.csv`` aporta su proporción GDC/(GDC+GDH); para
+        cada GDT se predice la acidez con todas las proporciones en una sola evaluación
+        (lotes × puntos) y se resume con la media y los ``percentiles``. Cacheado por
+        versión de modelo y de datos; el archivo se lee aquí (no del cache con TTL de
+        ``DataService``) para que cada versión de datos use su propio contenido.
+        """
+        try:
+            datos = pd.read_csv(PROTEINA_DATA_FILE, usecols=["GDC", "GDH"])
+            total = datos["GDC"] + datos["GDH"]
+            proporcion = (datos["GDC"] / total)[total > 0].to_numpy()
+        except (OSError, ValueError) as e:
+            logger.warning("No se pudieron leer las proporciones GDC/GDH: %s", e)
+            proporcion = np.array([])
+        if len(proporcion) == 0:
+            proporcion = np.array([0.7])  # Sin datos válidos: división fija 70/30
+        gdt = np.asarray(gdt, dtype=float)
+        acidez = ModelService.predict_acidez_batch(
+            proporcion[:, np.newaxis] * gdt, (1 - proporcion)[:, np.newaxis] * gdt,
+            ModelService.load_acidez_model()
+        )
+        curva = pd.DataFrame({"gdt": gdt, "media": acidez.mean(axis=0)})
+        for p, valores in zip(percentiles, np.percentile(acidez, percentiles, axis=0)):
+            curva[f"p{p}"] = valores
+        return curva
+
+    @staticmethod
+    @Metricas.medido("modelo.predecir_proteina")
+    def predict_proteina_batch(gdt, model=None):
+        """Predecir proteína para un arreglo de GDT en una sola evaluación del modelo"""
+        gdt = np.asarray(gdt, dtype=float)
         if model is None:
             # Fallback: modelo simplificado
             proteina_base = 70.0
             perdida_proteina = gdt * 0.3
-            return max(proteina_base - perdida_proteina, 30.0)
+            return np.maximum(proteina_base - perdida_proteina, 30.0)
         
-        # Usar modelo real
-        try:
-            X_pred = pd.DataFrame([[gdt]], columns=['GDT'])
-            return model.predict(X_pred)[0]
-        except:
-            # Fallback si hay problemas
-            X_pred = np.array([[gdt]])
-            return model.predict(X_pred)[0] 
\ No newline at end of file
+        return np.asarray(model.predict(gdt.reshape(-1, 1)), dtype=float).reshape(gdt.shape)
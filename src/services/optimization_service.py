@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+
+from ..config.constants import (
+    ACIDEZ_MAXIMA, PROTEINA_MINIMA, MESES_ALMACENAMIENTO, VIDA_UTIL_PASO_MESES,
+    COSTOS_ALMACENAMIENTO, OPTIMIZACION_MALLA, OPTIMIZACION_TOLERANCIA, OPTIMIZACION_CANDIDATOS,
+    PRECIOS_PRODUCTOS, RENDIMIENTO_PRODUCTOS
+)
+from ..utils.calculations import Calculations
+from ..utils.presupuesto import PresupuestoMemoria
+from ..utils.forest_lookup import get_lookup_table
+from .economic_service import EconomicService, PRODUCTOS
+from .model_service import ModelService
+from .shelf_life_service import ShelfLifeService
+
+# Vecindario del refinamiento local (8 direcciones)
+_DIRECCIONES = np.array([(dt, dh) for dt in (-1, 0, 1) for dh in (-1, 0, 1) if dt or dh], dtype=float)
+
+
+class EvaluadorCondiciones:
+    """Costo y cumplimiento de setpoints (temperatura, humedad) con memoria de puntos evaluados
+
+    Para cada setpoint se simula el lote sobre ``meses`` con el modelo de daño y se
+    predicen acidez y proteína en una malla de ``VIDA_UTIL_PASO_MESES``. El costo es
+    el acondicionamiento (enfriamiento mensual y secado) más la pérdida de calidad
+    al final del horizonte; la violación mide cuánto se exceden los límites.
+    """
+
+    def __init__(self, acidez_model, proteina_model, gdc_ini, gdh_ini, meses,
+                 acidez_maxima=ACIDEZ_MAXIMA, proteina_minima=PROTEINA_MINIMA, costos=None):
+        tabla = get_lookup_table(acidez_model)
+        self.predictor_acidez = tabla if tabla is not None else acidez_model
+        self.proteina_model = proteina_model
+        self.gdc_ini = gdc_ini
+        self.gdh_ini = gdh_ini
+        self.meses = meses
+        self.acidez_maxima = acidez_maxima
+        self.proteina_minima = proteina_minima
+        self.costos = {**COSTOS_ALMACENAMIENTO, **(costos or {})}
+        self.tiempos = np.arange(0, meses + VIDA_UTIL_PASO_MESES / 2, VIDA_UTIL_PASO_MESES)
+        self._valor_calidad = np.array([RENDIMIENTO_PRODUCTOS[p] * PRECIOS_PRODUCTOS[p] for p in PRODUCTOS])
+        self._memoria = {}
+
+    @property
+    def evaluaciones(self):
+        return len(self._memoria)
+
+    def evaluar(self, temperaturas, humedades):
+        """Arreglos (costo, violación, acidez máxima) para cada par de setpoints"""
+        claves = list(zip(np.round(temperaturas, 6), np.round(humedades, 6)))
+        nuevas = list(dict.fromkeys(c for c in claves if c not in self._memoria))
+        if nuevas:
+            t_nuevas, h_nuevas = (np.array(v) for v in zip(*nuevas))
+            for clave, valores in zip(nuevas, zip(*self._calcular(t_nuevas, h_nuevas))):
+                self._memoria[clave] = valores
+        return tuple(np.array(v) for v in zip(*(self._memoria[c] for c in claves)))
+
+    def _calcular(self, temperaturas, humedades):
+        gdc, gdh = Calculations.calcular_daño(
+            temperaturas[:, None], humedades[:, None], self.gdc_ini, self.gdh_ini, self.tiempos[None, :]
+        )
+        acidez = ModelService.predict_acidez_batch(gdc, gdh, self.predictor_acidez)
+        proteina = ModelService.predict_proteina_batch(gdc + gdh, self.proteina_model)
+        acidez_max = acidez.max(axis=1)
+        violacion = (
+            np.maximum(0, acidez_max - self.acidez_maxima) / self.acidez_maxima
+            + np.maximum(0, self.proteina_minima - proteina.min(axis=1)) / self.proteina_minima
+        )
+
+        c = self.costos
+        acondicionamiento = (
+            c["enfriamiento"] * np.maximum(0, c["temperatura_ambiente"] - temperaturas) * self.meses
+            + c["secado"] * np.maximum(0, c["humedad_ambiente"] - humedades)
+        )
+        gdt_final = gdc[:, -1] + gdh[:, -1]
+        perdida_calidad = EconomicService.perdida_unitaria(gdt_final) @ self._valor_calidad
+        return acondicionamiento + perdida_calidad, violacion, acidez_max
+
+
+def _orden(costo, violacion):
+    """Orden lexicográfico: primero factibles, luego menor violación y menor costo"""
+    return np.lexsort((costo, violacion))
+
+
+class OptimizationService:
+    """Optimización de setpoints de almacenamiento a mínimo costo"""
+
+    @staticmethod
+    @PresupuestoMemoria.cache("optimizacion", maximo_entradas=32, ttl=3600)
+    def optimizar(version_modelo, gdc_ini, gdh_ini, meses, acidez_maxima=ACIDEZ_MAXIMA,
+                  proteina_minima=PROTEINA_MINIMA, costos=None):
+        """Optimización con cache por versión de modelo y parámetros"""
+        return OptimizationService.optimizar_condiciones(
+            ModelService.load_acidez_model(), ModelService.load_proteina_model(),
+            gdc_ini, gdh_ini, meses, acidez_maxima, proteina_minima, costos
+        )
+
+    @staticmethod
+    def optimizar_condiciones(acidez_model, proteina_model, gdc_ini, gdh_ini, meses=12,
+                              acidez_maxima=ACIDEZ_MAXIMA, proteina_minima=PROTEINA_MINIMA,
+                              costos=None, malla=None, tolerancia=OPTIMIZACION_TOLERANCIA,
+                              candidatos=OPTIMIZACION_CANDIDATOS):
+        """Setpoints de temperatura y humedad de mínimo costo que cumplen los límites durante ``meses``
+
+        1. Búsqueda gruesa: toda la malla ``OPTIMIZACION_MALLA`` en una sola evaluación vectorizada.
+        2. Refinamiento local: búsqueda por patrones (8 vecinos, paso que se reduce a la
+           mitad hasta ``tolerancia``) desde los ``candidatos`` mejores puntos de la malla.
+           Los puntos ya evaluados se reutilizan de la memoria del evaluador.
+
+        Si ningún punto cumple, retorna el de menor violación con ``factible=False``.
+        Incluye la vida útil (meses máximos de almacenamiento) en el óptimo y la malla
+        gruesa evaluada para graficar.
+        """
+        malla = {**OPTIMIZACION_MALLA, **(malla or {})}
+        evaluador = EvaluadorCondiciones(
+            acidez_model, proteina_model, gdc_ini, gdh_ini, meses, acidez_maxima, proteina_minima, costos
+        )
+        limites = np.array([malla["temperatura"][:2], malla["humedad"][:2]])
+        pasos = np.array([malla["temperatura"][2], malla["humedad"][2]])
+
+        ejes = [np.arange(minimo, maximo + paso / 2, paso) for minimo, maximo, paso in malla.values()]
+        tt, hh = (e.ravel() for e in np.meshgrid(*ejes, indexing="ij"))
+        costo, violacion, acidez_max = evaluador.evaluar(tt, hh)
+        grilla = pd.DataFrame({
+            "temperatura": tt, "humedad": hh, "costo": costo,
+            "violacion": violacion, "acidez_maxima": acidez_max,
+        })
+
+        mejores = []
+        for indice in _orden(costo, violacion)[:candidatos]:
+            punto = np.array([tt[indice], hh[indice]])
+            mejor = (violacion[indice], costo[indice])
+            paso = pasos / 2
+            while np.all(paso >= tolerancia):
+                vecinos = np.clip(punto + _DIRECCIONES * paso, limites[:, 0], limites[:, 1])
+                c, v, _ = evaluador.evaluar(vecinos[:, 0], vecinos[:, 1])
+                i = _orden(c, v)[0]
+                if (v[i], c[i]) < mejor:
+                    punto, mejor = vecinos[i], (v[i], c[i])
+                else:
+                    paso = paso / 2
+            mejores.append((mejor, punto))
+        (violacion_opt, costo_opt), (temperatura, humedad) = min(mejores, key=lambda m: m[0])
+
+        _, _, acidez_opt = evaluador.evaluar(np.array([temperatura]), np.array([humedad]))
+        meses_acidez, meses_proteina = ShelfLifeService.resolver_vida_util(
+            acidez_model, proteina_model, temperatura, humedad, gdc_ini, gdh_ini,
+            acidez_maxima=acidez_maxima, proteina_minima=proteina_minima,
+            meses_max=max(MESES_ALMACENAMIENTO, meses)
+        )
+        c = evaluador.costos
+        acondicionamiento = (
+            c["enfriamiento"] * max(0.0, c["temperatura_ambiente"] - temperatura) * meses
+            + c["secado"] * max(0.0, c["humedad_ambiente"] - humedad)
+        )
+        return {
+            "temperatura": float(temperatura),
+            "humedad": float(humedad),
+            "factible": bool(violacion_opt == 0),
+            "costo_total": float(costo_opt),
+            "costo_acondicionamiento": float(acondicionamiento),
+            "perdida_calidad": float(costo_opt - acondicionamiento),
+            "acidez_maxima_prevista": float(acidez_opt[0]),
+            "meses_maximos": float(min(meses_acidez[0], meses_proteina[0])),
+            "evaluaciones": evaluador.evaluaciones,
+            "malla": grilla,
+        }
@@ -0,0 +1,328 @@
+"""API HTTP de predicción sin interfaz, para integradores (LIMS, tableros de silos)
+
+Uso: python -m src.services.prediction_api --host 0.0.0.0 --puerto 8000
+
+Endpoints POST que reciben lotes de filas y las evalúan en una sola pasada
+vectorizada con el mismo ``ModelService`` que la app:
+
+- ``/v1/acidez``: columnas gdc y gdh → acidez
+- ``/v1/proteina``: gdt (o gdc y gdh) → proteina
+- ``/v1/calidad``: gdc y gdh → evaluación de ``ScoringService`` (clase de calidad,
+  acidez, proteína, cumplimiento e impacto en productos)
+- ``/v1/simulacion?meses=12``: temperatura, humedad, gdc y gdh → trayectoria de cada
+  escenario cada 15 días con su acidez y proteína
+
+El cuerpo puede ser JSON (lista de objetos o ``{columna: [valores]}``), CSV o Arrow
+IPC (``application/vnd.apache.arrow.stream``) según ``Content-Type``; la respuesta
+usa el formato de ``Accept`` o, si no se indica, el de la petición. Los nombres de
+columna aceptan los alias de ``LOTES_COLUMNAS``. GET ``/salud`` informa la versión
+del modelo activo y ``/metrics`` las métricas de Prometheus.
+"""
+import argparse
+import io
+import json
+import logging
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from ..config.constants import API_HOST, API_PUERTO, API_MAX_BYTES, API_MAX_FILAS, API_MESES_MAX
+from ..utils.calculations import Calculations
+from ..utils.forest_lookup import get_lookup_table
+from ..utils.metricas import Metricas
+from .model_service import ModelService
+from .scoring_service import ScoringService
+
+logger = logging.getLogger(__name__)
+
+JSON, CSV, ARROW = "application/json", "text/csv", "application/vnd.apache.arrow.stream"
+FORMATOS = (JSON, CSV, ARROW)
+
+
+class ErrorPeticion(ValueError):
+    """Petición inválida; ``estado`` es el código HTTP a responder"""
+
+    def __init__(self, mensaje, estado=400):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def _formato(cabecera, defecto=None):
+    """Formato conocido de una cabecera ``Content-Type``/``Accept`` (None si no se reconoce)"""
+    for tipo in (cabecera or "").split(","):
+        tipo = tipo.split(";")[0].strip().lower()
+        if tipo in FORMATOS:
+            return tipo
+        if tipo in ("application/vnd.apache.arrow.file", "application/octet-stream"):
+            return ARROW
+    return defecto
+
+
+def _columna(df, nombre):
+    """Columna ``nombre`` sin distinguir mayúsculas como arreglo float (ErrorPeticion si falta o no es numérica)"""
+    original = next((c for c in df.columns if str(c).strip().lower() == nombre), None)
+    if original is None:
+        raise ErrorPeticion(f"Falta la columna requerida: {nombre}")
+    valores = pd.to_numeric(df[original], errors="coerce")
+    if (valores.isna() & df[original].notna()).any():
+        raise ErrorPeticion(f"Valores no numéricos en la columna {nombre}")
+    return valores.to_numpy(dtype=float)
+
+
+def _acidez(gdc, gdh, acidez_model):
+    """Acidez por fila; las filas sin daño registrado quedan en NaN (como en ``ScoringService``)"""
+    validas = ~np.isnan(gdc + gdh)
+    acidez = np.full(len(gdc), np.nan)
+    if validas.any():
+        acidez[validas] = ModelService.predict_acidez_batch(gdc[validas], gdh[validas], acidez_model)
+    return acidez
+
+
+def _proteina(gdt, proteina_model):
+    validas = ~np.isnan(gdt)
+    proteina = np.full(len(gdt), np.nan)
+    if validas.any():
+        proteina[validas] = ModelService.predict_proteina_batch(gdt[validas], proteina_model)
+    return proteina
+
+
+class PredictionAPI:
+    """Lógica de los endpoints: DataFrame de entrada → DataFrame de resultados (sin HTTP)"""
+
+    @staticmethod
+    def leer(cuerpo, formato):
+        """DataFrame del cuerpo de la petición en ``formato`` (JSON, CSV o Arrow IPC)"""
+        try:
+            if formato == CSV:
+                return pd.read_csv(io.BytesIO(cuerpo))
+            if formato == ARROW:
+                import pyarrow as pa
+
+                lector = pa.ipc.open_stream(cuerpo) if cuerpo[:6] != b"ARROW1" else pa.ipc.open_file(cuerpo)
+                return lector.read_all().to_pandas()
+            datos = json.loads(cuerpo)
+        except Exception as e:
+            raise ErrorPeticion(f"Cuerpo ilegible como {formato}: {e}")
+        if isinstance(datos, dict) and isinstance(datos.get("filas"), list):
+            datos = datos["filas"]
+        if isinstance(datos, list):
+            return pd.DataFrame.from_records(datos)
+        if isinstance(datos, dict):
+            try:
+                return pd.DataFrame(datos)
+            except ValueError as e:
+                raise ErrorPeticion(f"Columnas JSON inválidas: {e}")
+        raise ErrorPeticion("El JSON debe ser una lista de objetos o un objeto {columna: [valores]}")
+
+    @staticmethod
+    def escribir(resultado, formato, version_modelo):
+        """Bytes de la respuesta en ``formato``"""
+        if formato == CSV:
+            return ScoringService.exportar_csv(resultado)
+        if formato == ARROW:
+            import pyarrow as pa
+
+            tabla = pa.Table.from_pandas(resultado, preserve_index=False)
+            buffer = io.BytesIO()
+            with pa.ipc.new_stream(buffer, tabla.schema) as escritor:
+                escritor.write_table(tabla)
+            return buffer.getvalue()
+        filas = resultado.to_json(orient="records", force_ascii=False, double_precision=10)
+        return (
+            f'{{"version_modelo": {json.dumps(version_modelo)}, "filas": {len(resultado)}, '
+            f'"resultados": {filas}}}'
+        ).encode("utf-8")
+
+    @staticmethod
+    def acidez(df, acidez_model, proteina_model, parametros):
+        inventario = ScoringService.normalizar_inventario(df)
+        gdc, gdh = inventario["gdc"].to_numpy(dtype=float), inventario["gdh"].to_numpy(dtype=float)
+        return pd.DataFrame({
+            "lote": inventario["lote"].to_numpy(), "gdc": gdc, "gdh": gdh, "acidez": _acidez(gdc, gdh, acidez_model)
+        })
+
+    @staticmethod
+    def proteina(df, acidez_model, proteina_model, parametros):
+        if any(str(c).strip().lower() == "gdt" for c in df.columns):
+            gdt = _columna(df, "gdt")
+            lote = np.arange(1, len(gdt) + 1)
+        else:
+            inventario = ScoringService.normalizar_inventario(df)
+            gdt = inventario["gdc"].to_numpy(dtype=float) + inventario["gdh"].to_numpy(dtype=float)
+            lote = inventario["lote"].to_numpy()
+        return pd.DataFrame({"lote": lote, "gdt": gdt, "proteina": _proteina(gdt, proteina_model)})
+
+    @staticmethod
+    def calidad(df, acidez_model, proteina_model, parametros):
+        return ScoringService.evaluar_lotes(ScoringService.normalizar_inventario(df), acidez_model, proteina_model)
+
+    @staticmethod
+    def simulacion(df, acidez_model, proteina_model, parametros):
+        try:
+            meses = float(parametros.get("meses", ["12"])[0])
+        except ValueError:
+            raise ErrorPeticion("meses debe ser numérico")
+        if not 0 < meses <= API_MESES_MAX:
+            raise ErrorPeticion(f"meses debe estar entre 0 y {API_MESES_MAX}")
+        inventario = ScoringService.normalizar_inventario(df)
+        condiciones = [_columna(inventario, "temperatura"), _columna(inventario, "humedad"),
+                       inventario["gdc"].to_numpy(dtype=float), inventario["gdh"].to_numpy(dtype=float)]
+        if any(np.isnan(c).any() for c in condiciones):
+            raise ErrorPeticion("La simulación requiere temperatura, humedad, gdc y gdh en todas las filas")
+        pasos = len(Calculations.tiempos_simulacion(meses))
+        if len(inventario) * pasos > API_MAX_FILAS:
+            raise ErrorPeticion(f"La simulación supera {API_MAX_FILAS:,} filas (escenarios × tiempos)", 413)
+
+        tiempos, gdc, gdh, gdt = Calculations.simular_evolucion_lote(*condiciones, meses)
+        gdc, gdh, gdt = gdc.ravel(), gdh.ravel(), gdt.ravel()
+        return pd.DataFrame({
+            "lote": np.repeat(inventario["lote"].to_numpy(), len(tiempos)),
+            "mes": np.tile(tiempos, len(inventario)),
+            "gdc": gdc, "gdh": gdh, "gdt": gdt,
+            "acidez": _acidez(gdc, gdh, acidez_model), "proteina": _proteina(gdt, proteina_model),
+        })
+
+    @staticmethod
+    def atender(ruta, cuerpo, tipo, aceptar, parametros=None):
+        """Resolver una petición POST; retorna ``(formato, bytes, version_modelo, filas)``
+
+        Lanza ``ErrorPeticion`` con el código HTTP si la ruta o el cuerpo no son válidos.
+        """
+        endpoint = ENDPOINTS.get(ruta)
+        if endpoint is None:
+            raise ErrorPeticion(f"Ruta desconocida: {ruta}", 404)
+        formato = _formato(tipo, JSON)
+        with Metricas.medir(f"api.{ruta.rsplit('/', 1)[-1]}"):
+            df = PredictionAPI.leer(cuerpo, formato)
+            if len(df) > API_MAX_FILAS:
+                raise ErrorPeticion(f"Máximo {API_MAX_FILAS:,} filas por petición", 413)
+            try:
+                resultado = endpoint(
+                    df, ModelService.load_acidez_model(), ModelService.load_proteina_model(), parametros or {}
+                )
+            except ErrorPeticion:
+                raise
+            except ValueError as e:
+                raise ErrorPeticion(str(e))
+            version = ModelService.get_acidez_model_version()
+            salida = _formato(aceptar, formato)
+            return salida, PredictionAPI.escribir(resultado, salida, version), version, len(resultado)
+
+
+ENDPOINTS = {
+    "/v1/acidez": PredictionAPI.acidez,
+    "/v1/proteina": PredictionAPI.proteina,
+    "/v1/calidad": PredictionAPI.calidad,
+    "/v1/simulacion": PredictionAPI.simulacion,
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Conexiones persistentes para clientes que envían muchos lotes
+    disable_nagle_algorithm = True  # Cabeceras y cuerpo van en envíos separados: sin esto, ~40 ms por ACK diferido
+
+    def _responder(self, estado, tipo, cuerpo, cabeceras=()):
+        self.send_response(estado)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        for nombre, valor in cabeceras:
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _error(self, estado, mensaje):
+        self._responder(estado, "application/json; charset=utf-8",
+                        json.dumps({"error": mensaje}, ensure_ascii=False).encode("utf-8"))
+
+    def do_GET(self):
+        ruta = urlsplit(self.path).path
+        if ruta == "/salud":
+            cuerpo = {"estado": "ok", "version_modelo": ModelService.get_acidez_model_version(),
+                      "endpoints": sorted(ENDPOINTS)}
+            self._responder(200, "application/json; charset=utf-8", json.dumps(cuerpo).encode("utf-8"))
+        elif ruta == "/metrics":
+            self._responder(200, "text/plain; version=0.0.4; charset=utf-8", Metricas.prometheus().encode("utf-8"))
+        elif ruta in ENDPOINTS:
+            self._error(405, "Use POST con un lote de filas")
+        else:
+            self._error(404, f"Ruta desconocida: {ruta}")
+
+    def do_POST(self):
+        partes = urlsplit(self.path)
+        largo = self.headers.get("Content-Length")
+        if largo is None:
+            self._error(411, "Se requiere Content-Length")
+            return
+        try:
+            largo = int(largo)
+        except ValueError:
+            largo = -1
+        if largo < 0:
+            self.close_connection = True  # Sin largo válido no se sabe dónde termina el cuerpo
+            self._error(400, "Content-Length inválido")
+            return
+        if largo > API_MAX_BYTES:
+            self.close_connection = True  # El cuerpo no se lee
+            self._error(413, f"Cuerpo mayor que {API_MAX_BYTES // 2**20} MB")
+            return
+        cuerpo = self.rfile.read(largo)
+        try:
+            formato, contenido, version, filas = PredictionAPI.atender(
+                partes.path, cuerpo, self.headers.get("Content-Type"), self.headers.get("Accept"),
+                parse_qs(partes.query),
+            )
+        except ErrorPeticion as e:
+            self._error(e.estado, str(e))
+            return
+        except Exception:
+            logger.exception("Error atendiendo %s", partes.path)
+            self._error(500, "Error interno")
+            return
+        self._responder(200, formato + ("; charset=utf-8" if formato != ARROW else ""), contenido,
+                        [("X-Version-Modelo", str(version)), ("X-Filas", str(filas))])
+
+    def log_message(self, formato, *args):
+        logger.debug(formato, *args)
+
+
+def crear_servidor(host=API_HOST, puerto=API_PUERTO):
+    """``ThreadingHTTPServer`` listo para ``serve_forever()`` (un hilo por conexión)"""
+    servidor = ThreadingHTTPServer((host, puerto), _Handler)
+    servidor.daemon_threads = True
+    return servidor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP de predicción por lotes (acidez, proteína, calidad y simulación)")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--puerto", type=int, default=API_PUERTO)
+    parser.add_argument("--sin-precalentar", action="store_true",
+                        help="No construir la tabla exacta del bosque antes de aceptar peticiones")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if not args.sin_precalentar:
+        # Las primeras peticiones ya usan la tabla exacta en vez de recorrer los árboles
+        get_lookup_table(ModelService.load_acidez_model())
+        ModelService.load_proteina_model()
+    try:
+        servidor = crear_servidor(args.host, args.puerto)
+    except OSError as e:
+        print(f"Error: no se pudo abrir {args.host}:{args.puerto}: {e}", file=sys.stderr)
+        return 1
+    logger.info("API de predicción en http://%s:%s (modelo %s)", args.host, args.puerto,
+                ModelService.get_acidez_model_version())
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
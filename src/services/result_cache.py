@@ -0,0 +1,67 @@
+import functools
+
+from ..config.constants import RESULTADOS_CACHE_MAX
+from ..utils.cache_backends import CacheEnCapas
+from ..utils.metricas import Metricas
+from ..utils.presupuesto import PresupuestoMemoria
+
+
+class ResultCache:
+    """Resultados de las calculadoras compartidos entre sesiones por entradas cuantizadas y versión de modelo
+
+    Las entradas de las calculadoras se mueven en pasos fijos (0.1 en los
+    sliders, enteros en los number_input), así que los estados distintos son
+    finitos y los valores populares se repiten entre usuarios. Con
+    ``SOYA_CACHE_DIR`` definido, los resultados con ``huella`` también se guardan
+    en disco (junto a los caches de servicios) y sobreviven a reinicios del proceso.
+    """
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def registro():
+        """Almacén del proceso: LRU en el presupuesto de memoria, delante del disco si está configurado"""
+        memoria = PresupuestoMemoria.registro("resultados", maximo_entradas=RESULTADOS_CACHE_MAX)
+        disco = PresupuestoMemoria.disco("resultados")
+        return memoria if disco is None else CacheEnCapas(memoria, disco)
+
+    @staticmethod
+    def cuantizar(valor, paso):
+        """``valor`` redondeado al múltiplo de ``paso`` más cercano (sin ruido de coma flotante)"""
+        decimales = max(0, -int(f"{paso:e}".split("e")[1]))
+        return round(round(valor / paso) * paso, decimales)
+
+    @staticmethod
+    def obtener(nombre, entradas, version, calcular, huella=lambda: None):
+        """Resultado de ``calcular()`` para ``entradas`` ya cuantizadas y ``version`` (p. ej. de modelo y datos)
+
+        ``calcular`` solo se llama si ninguna sesión calculó antes la misma llave.
+        El resultado es compartido y no debe modificarse; debe ser serializable con pickle.
+        ``huella()`` (p. ej. ``ModelService.huella_acidez(archivo)``) identifica el
+        contenido leído: solo con ella el resultado se persiste en disco, pues la
+        versión ``artifacts`` no cambia al reemplazar el modelo.
+        """
+        registro = ResultCache.registro()
+        # Se calcula fuera de cualquier lock; si dos sesiones coinciden, gana la primera
+        resultado, acierto = PresupuestoMemoria.obtener_con_huella(
+            registro, PresupuestoMemoria.registro("resultados"), (nombre, tuple(entradas), version), calcular, huella
+        )
+        Metricas.contar("resultados", acierto)
+        return resultado
+
+    @staticmethod
+    def estadisticas():
+        """Entradas, aciertos (memoria y disco), fallos, tasa de aciertos y bytes en memoria"""
+        memoria = PresupuestoMemoria.registro("resultados")
+        disco = getattr(ResultCache.registro(), "disco", None)
+        aciertos_disco = disco.aciertos if disco is not None else 0
+        fallos = disco.fallos if disco is not None else memoria.fallos
+        consultas = memoria.aciertos + aciertos_disco + fallos
+        return {
+            "entradas": len(memoria),
+            "aciertos": memoria.aciertos,
+            "aciertos_disco": aciertos_disco,
+            "fallos": fallos,
+            "tasa_aciertos": (memoria.aciertos + aciertos_disco) / consultas if consultas else 0.0,
+            "bytes": memoria.bytes,
+            "disco": disco.directorio if disco is not None else None,
+        }
@@ -0,0 +1,111 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from ..config.constants import (
+    ACIDEZ_MAXIMA, PROTEINA_MINIMA, CONDICIONES_ALMACENAMIENTO, MESES_ALMACENAMIENTO,
+    MONTE_CARLO_SEMILLA, MONTE_CARLO_BLOQUE
+)
+from ..utils.calculations import Calculations
+from ..utils.presupuesto import PresupuestoMemoria
+from ..utils.forest_lookup import get_lookup_table
+from .model_service import ModelService
+
+# Modelos cargados una sola vez por proceso del pool
+_modelos_worker = {}
+
+
+def _inicializar_worker(predictor_acidez, modelo_proteina):
+    _modelos_worker["acidez"] = predictor_acidez
+    _modelos_worker["proteina"] = modelo_proteina
+
+
+def _simular_bloque(semilla, n_trayectorias, condiciones, meses):
+    """Simular un bloque de trayectorias y contar excedencias por instante"""
+    rng = np.random.default_rng(semilla)
+    muestras = {
+        nombre: np.maximum(rng.normal(media, desviacion, n_trayectorias), 0.0)
+        for nombre, (media, desviacion) in condiciones.items()
+    }
+    tiempos, gdc, gdh, gdt = Calculations.simular_evolucion_lote(
+        muestras["temperatura"], muestras["humedad"],
+        muestras["gdc_ini"], muestras["gdh_ini"], meses
+    )
+    acidez = ModelService.predict_acidez_batch(gdc, gdh, _modelos_worker["acidez"])
+    proteina = ModelService.predict_proteina_batch(gdt, _modelos_worker["proteina"])
+    return (
+        (acidez > ACIDEZ_MAXIMA).sum(axis=0),
+        (proteina < PROTEINA_MINIMA).sum(axis=0),
+        acidez.sum(axis=0),
+        proteina.sum(axis=0),
+    )
+
+
+class RiskService:
+    """Servicio de riesgo de almacenamiento por simulación Monte Carlo"""
+
+    @staticmethod
+    @PresupuestoMemoria.cache("riesgo", maximo_entradas=32, ttl=3600)
+    def calcular_riesgo(version_modelo, n_trayectorias, condiciones):
+        """Riesgo Monte Carlo con cache por versión de modelo y condiciones"""
+        return RiskService.simular_riesgo_almacenamiento(
+            ModelService.load_acidez_model(), ModelService.load_proteina_model(),
+            n_trayectorias, condiciones=condiciones
+        )
+
+    @staticmethod
+    def simular_riesgo_almacenamiento(acidez_model, proteina_model, n_trayectorias=100_000,
+                                      meses=MESES_ALMACENAMIENTO, condiciones=None,
+                                      semilla=MONTE_CARLO_SEMILLA, n_procesos=None,
+                                      tamano_bloque=MONTE_CARLO_BLOQUE):
+        """Probabilidad mensual de exceder ``ACIDEZ_MAXIMA`` y de caer bajo ``PROTEINA_MINIMA``
+
+        Muestrea condiciones de almacenamiento y daño inicial por trayectoria según
+        ``condiciones`` ({variable: (media, desviación)}), simula cada trayectoria
+        y evalúa los predictores de acidez y proteína. El trabajo se divide en bloques
+        de ``tamano_bloque`` con semillas derivadas de ``semilla``, así que el resultado
+        no depende del número de procesos.
+        """
+        if n_trayectorias <= 0:
+            raise ValueError(f"n_trayectorias debe ser positivo (se recibió {n_trayectorias})")
+        condiciones = {**CONDICIONES_ALMACENAMIENTO, **(condiciones or {})}
+        # La tabla exacta del bosque viaja a los procesos en vez de los 545 árboles
+        tabla = get_lookup_table(acidez_model)
+        predictor_acidez = tabla if tabla is not None else acidez_model
+
+        tamanos = [tamano_bloque] * (n_trayectorias // tamano_bloque)
+        if n_trayectorias % tamano_bloque:
+            tamanos.append(n_trayectorias % tamano_bloque)
+        semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+        argumentos = [
+            (s, n, condiciones, meses) for s, n in zip(semillas, tamanos)
+        ]
+
+        n_procesos = min(n_procesos or os.cpu_count() or 1, len(tamanos))
+        if n_procesos <= 1:
+            _inicializar_worker(predictor_acidez, proteina_model)
+            resultados = [_simular_bloque(*args) for args in argumentos]
+        else:
+            # Sin fork: en el servidor multihilo de Streamlit el hijo podría heredar un lock tomado
+            with ProcessPoolExecutor(
+                max_workers=n_procesos, mp_context=multiprocessing.get_context("forkserver"),
+                initializer=_inicializar_worker,
+                initargs=(predictor_acidez, proteina_model)
+            ) as pool:
+                resultados = list(pool.map(_simular_bloque, *zip(*argumentos)))
+
+        excede_acidez, bajo_proteina, suma_acidez, suma_proteina = (
+            np.sum(parte, axis=0) for parte in zip(*resultados)
+        )
+        tiempos = np.arange(0, meses + 1, 0.5)
+        mensual = tiempos % 1 == 0
+        return pd.DataFrame({
+            "mes": tiempos[mensual].astype(int),
+            "prob_acidez_excede": excede_acidez[mensual] / n_trayectorias,
+            "prob_proteina_bajo": bajo_proteina[mensual] / n_trayectorias,
+            "acidez_media": suma_acidez[mensual] / n_trayectorias,
+            "proteina_media": suma_proteina[mensual] / n_trayectorias,
+        })
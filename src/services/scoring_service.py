@@ -0,0 +1,119 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from ..config.constants import (
+    ACIDEZ_MAXIMA, PROTEINA_MINIMA, LOTES_COLUMNAS, LOTES_BLOQUE, CLASES_CALIDAD
+)
+from ..utils.calculations import Calculations
+from .model_service import ModelService
+
+
+class ScoringService:
+    """Evaluación masiva de lotes: acidez, proteína, impacto en productos y clase de calidad"""
+
+    @staticmethod
+    def normalizar_inventario(df, primer_lote=1):
+        """Renombrar columnas del inventario a ``lote``, ``gdc``, ``gdh`` y ``toneladas`` (opcional)
+
+        Acepta los alias de ``LOTES_COLUMNAS`` sin distinguir mayúsculas. Si no hay
+        columna de lote se numeran las filas desde ``primer_lote``. Lanza ValueError si faltan GDC o GDH
+        o si contienen valores no numéricos.
+        """
+        nombres = {str(col).strip().lower(): col for col in df.columns}
+        if len(nombres) < len(df.columns):
+            raise ValueError("Columnas duplicadas (sin distinguir mayúsculas)")
+        renombrar = {}
+        for estandar, alias in LOTES_COLUMNAS.items():
+            original = next((nombres[a] for a in alias if a in nombres), None)
+            if original is not None:
+                renombrar[original] = estandar
+
+        faltantes = [col for col in ("gdc", "gdh") if col not in renombrar.values()]
+        if faltantes:
+            raise ValueError(
+                f"Faltan columnas requeridas: {', '.join(faltantes)}. "
+                f"Nombres aceptados: {', '.join(LOTES_COLUMNAS['gdc'] + LOTES_COLUMNAS['gdh'])}"
+            )
+
+        inventario = df.rename(columns=renombrar)
+        if "lote" not in inventario.columns:
+            inventario.insert(0, "lote", np.arange(primer_lote, primer_lote + len(inventario)))
+        for col in ("gdc", "gdh", "toneladas"):
+            if col not in inventario.columns:
+                continue
+            valores = pd.to_numeric(inventario[col], errors="coerce")
+            invalidos = valores.isna() & inventario[col].notna()
+            if invalidos.any():
+                filas = ", ".join(str(i + 1) for i in np.flatnonzero(invalidos)[:5])
+                raise ValueError(f"Valores no numéricos en la columna {col} (filas {filas})")
+            inventario[col] = valores
+        return inventario
+
+    @staticmethod
+    def evaluar_lotes(inventario, acidez_model, proteina_model,
+                      acidez_maxima=ACIDEZ_MAXIMA, proteina_minima=PROTEINA_MINIMA):
+        """Evaluar todos los lotes de un inventario normalizado en una sola pasada vectorizada"""
+        gdc = inventario["gdc"].to_numpy(dtype=float)
+        gdh = inventario["gdh"].to_numpy(dtype=float)
+        gdt = gdc + gdh
+
+        # Filas sin daño registrado no se evalúan
+        sin_datos = np.isnan(gdt)
+        acidez = np.full(len(gdt), np.nan)
+        proteina = np.full(len(gdt), np.nan)
+        if not sin_datos.all():
+            acidez[~sin_datos] = ModelService.predict_acidez_batch(gdc[~sin_datos], gdh[~sin_datos], acidez_model)
+            proteina[~sin_datos] = ModelService.predict_proteina_batch(gdt[~sin_datos], proteina_model)
+        impacto = Calculations.calcular_impacto_productos_lote(gdt)
+
+        resultado = inventario.copy()
+        resultado["gdt"] = gdt
+        resultado["acidez"] = acidez
+        resultado["proteina"] = proteina
+        resultado["clase_calidad"] = Calculations.clasificar_calidad(gdt)
+        resultado["cumple_acidez"] = pd.array(acidez <= acidez_maxima, dtype="boolean")
+        resultado["cumple_proteina"] = pd.array(proteina >= proteina_minima, dtype="boolean")
+        for producto, calidad in impacto.items():
+            resultado[f"calidad_{producto}"] = calidad
+
+        if sin_datos.any():
+            resultado.loc[sin_datos, ["clase_calidad", "cumple_acidez", "cumple_proteina"]] = pd.NA
+        return resultado
+
+    @staticmethod
+    def evaluar_por_bloques(inventario, acidez_model, proteina_model,
+                            tamano_bloque=LOTES_BLOQUE, **limites):
+        """Generador de resultados por bloques de ``tamano_bloque`` filas
+
+        Permite mostrar avances parciales en inventarios grandes; concatenar los
+        bloques da el mismo resultado que ``evaluar_lotes`` sobre todo el archivo.
+        """
+        for inicio in range(0, len(inventario), tamano_bloque):
+            bloque = inventario.iloc[inicio:inicio + tamano_bloque]
+            yield ScoringService.evaluar_lotes(bloque, acidez_model, proteina_model, **limites)
+
+    @staticmethod
+    def resumir_clases(resultado):
+        """Conteo y porcentaje de lotes por clase de calidad"""
+        conteo = resultado["clase_calidad"].value_counts().reindex(CLASES_CALIDAD, fill_value=0)
+        resumen = pd.DataFrame({"lotes": conteo})
+        resumen["porcentaje"] = 100 * resumen["lotes"] / max(len(resultado), 1)
+        return resumen
+
+    @staticmethod
+    def exportar_csv(resultado, encabezado=True):
+        """Serializar resultados a CSV (bytes UTF-8); usa pyarrow si está disponible"""
+        try:
+            import pyarrow as pa
+            import pyarrow.csv as pa_csv
+        except ImportError:
+            # Sin pyarrow se usa el escritor de pandas (varias veces más lento)
+            return resultado.to_csv(index=False, header=encabezado).encode("utf-8")
+        buffer = io.BytesIO()
+        pa_csv.write_csv(
+            pa.Table.from_pandas(resultado, preserve_index=False), buffer,
+            pa_csv.WriteOptions(include_header=encabezado)
+        )
+        return buffer.getvalue()
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from ..config.constants import (
+    RANGOS_SENSIBILIDAD, VARIABLES_SENSIBILIDAD, SOBOL_MUESTRAS, MONTE_CARLO_SEMILLA
+)
+from ..utils.calculations import Calculations
+from ..utils.presupuesto import PresupuestoMemoria
+from ..utils.forest_lookup import get_lookup_table
+from .model_service import ModelService
+
+
+class SensitivityService:
+    """Servicio de análisis de sensibilidad global (índices de Sobol)"""
+
+    @staticmethod
+    @PresupuestoMemoria.cache("sobol", maximo_entradas=16, ttl=3600)
+    def calcular_indices(version_modelo, rangos, n=SOBOL_MUESTRAS):
+        """Índices de Sobol con cache por versión de modelo y configuración de rangos"""
+        return SensitivityService.calcular_indices_sobol(
+            ModelService.load_acidez_model(), ModelService.load_proteina_model(),
+            rangos, n=n
+        )
+
+    @staticmethod
+    def calcular_indices_sobol(acidez_model, proteina_model, rangos=None,
+                               n=SOBOL_MUESTRAS, semilla=MONTE_CARLO_SEMILLA):
+        """Índices de Sobol de primer orden y totales (método de Saltelli)
+
+        Cada variable de ``rangos`` ({variable: (mínimo, máximo)}) se muestrea de una
+        uniforme y la cadena simulador → bosque de acidez → modelo de proteína se evalúa
+        en lotes vectorizados de ``n × (variables + 2)`` puntos. Retorna un DataFrame
+        con una fila por (salida, variable). Un rango con mínimo >= máximo lanza
+        ``ValueError``.
+        """
+        rangos = {**RANGOS_SENSIBILIDAD, **(rangos or {})}
+        variables = list(RANGOS_SENSIBILIDAD.keys())
+        for v in variables:
+            if rangos[v][0] >= rangos[v][1]:
+                raise ValueError(
+                    f"El rango de {VARIABLES_SENSIBILIDAD[v]} debe tener mínimo menor que máximo: {tuple(rangos[v])}"
+                )
+        tabla = get_lookup_table(acidez_model)
+        predictor_acidez = tabla if tabla is not None else acidez_model
+
+        def cadena(x):
+            temperatura, humedad, gdc_ini, gdh_ini, meses = x
+            gdc, gdh = Calculations.calcular_daño(temperatura, humedad, gdc_ini, gdh_ini, meses)
+            acidez = ModelService.predict_acidez_batch(gdc, gdh, predictor_acidez)
+            proteina = ModelService.predict_proteina_batch(gdc + gdh, proteina_model)
+            return np.vstack([acidez, proteina])
+
+        dists = [
+            stats.uniform(loc=rangos[v][0], scale=rangos[v][1] - rangos[v][0])
+            for v in variables
+        ]
+        resultado = stats.sobol_indices(
+            func=cadena, n=n, dists=dists, random_state=np.random.default_rng(semilla)
+        )
+
+        filas = []
+        for i, salida in enumerate(["Acidez", "Proteína"]):
+            for j, variable in enumerate(variables):
+                filas.append({
+                    "salida": salida,
+                    "variable": VARIABLES_SENSIBILIDAD[variable],
+                    "primer_orden": float(resultado.first_order[i, j]),
+                    "total": float(resultado.total_order[i, j]),
+                })
+        return pd.DataFrame(filas)
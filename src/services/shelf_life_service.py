@@ -0,0 +1,177 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ..config.constants import (
+    ACIDEZ_MAXIMA, PROTEINA_MINIMA, MESES_ALMACENAMIENTO, VIDA_UTIL_MALLA,
+    VIDA_UTIL_PASO_MESES, VIDA_UTIL_ITERACIONES, VIDA_UTIL_BLOQUE
+)
+from ..utils.calculations import Calculations
+from ..utils.presupuesto import PresupuestoMemoria
+from ..utils.forest_lookup import get_lookup_table
+from .model_service import ModelService
+
+CONDICIONES = ("temperatura", "humedad", "gdc_ini", "gdh_ini")
+
+
+class TablaVidaUtil:
+    """Tabla de vida útil sobre condiciones cuantizadas, llenada bajo demanda
+
+    Cada eje sigue ``VIDA_UTIL_MALLA`` (mínimo, máximo, paso). Las consultas dentro
+    de la malla se ajustan al punto más cercano y se resuelven por indexación; las
+    celdas aún no calculadas se resuelven juntas con el solver vectorizado y quedan
+    guardadas. Las condiciones fuera de la malla se resuelven sin cuantizar.
+    """
+
+    def __init__(self, solver, malla=None):
+        self.solver = solver
+        self.malla = {**VIDA_UTIL_MALLA, **(malla or {})}
+        self.ejes = [
+            np.round(np.arange(minimo, maximo + paso / 2, paso), 6)
+            for minimo, maximo, paso in (self.malla[c] for c in CONDICIONES)
+        ]
+        forma = tuple(len(eje) for eje in self.ejes)
+        self.meses_acidez = np.full(forma, np.nan, dtype=np.float32)
+        self.meses_proteina = np.full(forma, np.nan, dtype=np.float32)
+        self._lock = threading.Lock()
+
+    @property
+    def celdas_calculadas(self):
+        return int(np.count_nonzero(~np.isnan(self.meses_acidez)))
+
+    @property
+    def nbytes(self):
+        return self.meses_acidez.nbytes + self.meses_proteina.nbytes
+
+    def consultar(self, temperatura, humedad, gdc_ini, gdh_ini):
+        """Meses hasta exceder acidez y proteína para cada lote (arreglos)"""
+        valores = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (temperatura, humedad, gdc_ini, gdh_ini)))
+        forma = valores[0].shape
+        valores = [v.ravel() for v in valores]
+
+        indices, dentro = [], np.ones(len(valores[0]), dtype=bool)
+        for (minimo, maximo, paso), valor in zip((self.malla[c] for c in CONDICIONES), valores):
+            indice = np.rint((valor - minimo) / paso).astype(np.int64)
+            dentro &= (valor >= minimo) & (valor <= maximo)
+            indices.append(indice)
+
+        meses_acidez = np.empty(len(valores[0]))
+        meses_proteina = np.empty(len(valores[0]))
+
+        # Fuera de la malla: resolver directamente
+        fuera = ~dentro
+        if fuera.any():
+            meses_acidez[fuera], meses_proteina[fuera] = self.solver(*(v[fuera] for v in valores))
+
+        if dentro.any():
+            celdas = tuple(i[dentro] for i in indices)
+            with self._lock:
+                faltantes = np.isnan(self.meses_acidez[celdas])
+                if faltantes.any():
+                    unicas = np.unique(np.column_stack([c[faltantes] for c in celdas]), axis=0)
+                    puntos = [eje[unicas[:, k]] for k, eje in enumerate(self.ejes)]
+                    acidez, proteina = self.solver(*puntos)
+                    self.meses_acidez[tuple(unicas.T)] = acidez
+                    self.meses_proteina[tuple(unicas.T)] = proteina
+                meses_acidez[dentro] = self.meses_acidez[celdas]
+                meses_proteina[dentro] = self.meses_proteina[celdas]
+
+        return meses_acidez.reshape(forma), meses_proteina.reshape(forma)
+
+
+class ShelfLifeService:
+    """Servicio de vida útil: meses de almacenamiento hasta salir de especificación"""
+
+    @staticmethod
+    @PresupuestoMemoria.cache("vida_util.tabla", maximo_entradas=8)
+    def get_tabla(version_modelo, acidez_maxima=ACIDEZ_MAXIMA, proteina_minima=PROTEINA_MINIMA,
+                  meses_max=MESES_ALMACENAMIENTO):
+        """Tabla de vida útil compartida por versión de modelo y límites"""
+        acidez_model = ModelService.load_acidez_model()
+        proteina_model = ModelService.load_proteina_model()
+
+        def solver(*condiciones):
+            return ShelfLifeService.resolver_vida_util(
+                acidez_model, proteina_model, *condiciones, acidez_maxima=acidez_maxima,
+                proteina_minima=proteina_minima, meses_max=meses_max
+            )
+
+        return TablaVidaUtil(solver)
+
+    @staticmethod
+    def calcular_vida_util(tabla, temperatura, humedad, gdc_ini, gdh_ini):
+        """Vida útil de muchos lotes consultando la tabla cuantizada
+
+        Retorna un DataFrame con los meses hasta exceder la acidez, hasta caer bajo
+        la proteína mínima y la vida útil (el primero de ambos); ``inf`` indica que
+        el lote no sale de especificación dentro del horizonte.
+        """
+        meses_acidez, meses_proteina = tabla.consultar(temperatura, humedad, gdc_ini, gdh_ini)
+        return pd.DataFrame({
+            "meses_acidez": np.ravel(meses_acidez),
+            "meses_proteina": np.ravel(meses_proteina),
+            "vida_util": np.minimum(np.ravel(meses_acidez), np.ravel(meses_proteina)),
+        })
+
+    @staticmethod
+    def resolver_vida_util(acidez_model, proteina_model, temperatura, humedad, gdc_ini, gdh_ini,
+                           acidez_maxima=ACIDEZ_MAXIMA, proteina_minima=PROTEINA_MINIMA,
+                           meses_max=MESES_ALMACENAMIENTO, paso=VIDA_UTIL_PASO_MESES,
+                           iteraciones=VIDA_UTIL_ITERACIONES):
+        """Primer mes en que la acidez excede ``acidez_maxima`` y la proteína cae bajo ``proteina_minima``
+
+        Evalúa todos los lotes sobre una malla de tiempo de ``paso`` meses con el
+        modelo de daño del simulador, localiza el primer intervalo con incumplimiento
+        y lo refina por bisección vectorizada. Retorna dos arreglos (acidez, proteína)
+        con ``inf`` donde no hay incumplimiento dentro de ``meses_max``.
+        """
+        tabla = get_lookup_table(acidez_model)
+        predictor_acidez = tabla if tabla is not None else acidez_model
+        condiciones = [
+            c.ravel() for c in np.broadcast_arrays(
+                *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (temperatura, humedad, gdc_ini, gdh_ini))
+            )
+        ]
+
+        def excede_acidez(gdc, gdh):
+            return ModelService.predict_acidez_batch(gdc, gdh, predictor_acidez) > acidez_maxima
+
+        def bajo_proteina(gdc, gdh):
+            return ModelService.predict_proteina_batch(gdc + gdh, proteina_model) < proteina_minima
+
+        tiempos = np.arange(0, meses_max + paso / 2, paso)
+        meses_acidez = np.empty(len(condiciones[0]))
+        meses_proteina = np.empty(len(condiciones[0]))
+        for inicio in range(0, len(condiciones[0]), VIDA_UTIL_BLOQUE):
+            bloque = slice(inicio, inicio + VIDA_UTIL_BLOQUE)
+            escenario = [c[bloque] for c in condiciones]
+            gdc, gdh = Calculations.calcular_daño(
+                *(c[:, np.newaxis] for c in escenario), tiempos[np.newaxis, :]
+            )
+            meses_acidez[bloque] = _primer_incumplimiento(excede_acidez, tiempos, gdc, gdh, escenario, iteraciones)
+            meses_proteina[bloque] = _primer_incumplimiento(bajo_proteina, tiempos, gdc, gdh, escenario, iteraciones)
+        return meses_acidez, meses_proteina
+
+
+def _primer_incumplimiento(incumple, tiempos, gdc, gdh, condiciones, iteraciones):
+    """Horquillado en la malla de tiempo + bisección para el primer incumplimiento"""
+    malla = incumple(gdc, gdh)
+    hay = malla.any(axis=1)
+    k = np.argmax(malla, axis=1)
+    meses = np.where(hay, tiempos[k], np.inf)
+
+    # Refinar solo los lotes cuyo incumplimiento no ocurre desde el inicio
+    refinar = hay & (k > 0)
+    if refinar.any():
+        bajo = tiempos[k[refinar] - 1]
+        alto = tiempos[k[refinar]]
+        escenario = [c[refinar] for c in condiciones]
+        for _ in range(iteraciones):
+            medio = (bajo + alto) / 2
+            gdc_medio, gdh_medio = Calculations.calcular_daño(*escenario, medio)
+            incumple_medio = incumple(gdc_medio, gdh_medio)
+            alto = np.where(incumple_medio, medio, alto)
+            bajo = np.where(incumple_medio, bajo, medio)
+        meses[refinar] = alto
+    return meses
@@ -1,5 +1,16 @@
 # Utilidades de la aplicación
 from .calculations import Calculations
 from .regression_utils import load_and_prepare_data, fit_quantile_regression, plot_best_fit, PALETTE
+from .forest_lookup import ForestLookupTable, get_lookup_table
+from .distribuciones import Distribuciones
+from .decimacion import Decimacion
+from .metricas import Metricas
+from .perfilado import Perfilador
+from .presupuesto import PresupuestoMemoria, CacheAcotado
+from .cache_backends import CacheBackend, CacheDisco, CacheEnCapas, CacheStreamlit
+from .secciones import seccion_memorizada, estadisticas_secciones
 
-__all__ = ['Calculations', 'load_and_prepare_data', 'fit_quantile_regression', 'plot_best_fit', 'PALETTE'] 
\ No newline at end of file
+__all__ = ['Calculations', 'load_and_prepare_data', 'fit_quantile_regression', 'plot_best_fit', 'PALETTE',
+           'ForestLookupTable', 'get_lookup_table', 'seccion_memorizada', 'estadisticas_secciones',
+           'Distribuciones', 'Decimacion', 'Metricas', 'Perfilador', 'PresupuestoMemoria', 'CacheAcotado',
+           'CacheBackend', 'CacheDisco', 'CacheEnCapas', 'CacheStreamlit'] 
\ No newline at end of file
@@ -0,0 +1,235 @@
+"""Almacenes intercambiables para los caches de los servicios
+
+Los servicios memorizan con ``PresupuestoMemoria.cache`` sin saber dónde se
+guardan los resultados. Cualquier ``CacheBackend`` sirve de almacén:
+
+- ``CacheAcotado`` (``presupuesto.py``): LRU en proceso dentro del presupuesto de memoria
+- ``CacheDisco``: archivos pickle que sobreviven a reinicios y se comparten entre procesos
+- ``CacheEnCapas``: memoria delante de disco (lectura en cascada, escritura en ambos)
+- ``CacheStreamlit``: adaptador para la app; vacía su almacén cuando Streamlit limpia sus caches
+
+Ninguno importa Streamlit al cargar el módulo, así que los mismos servicios
+sirven a la interfaz, a la evaluación por lotes y a consumidores sin interfaz.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import threading
+
+logger = logging.getLogger(__name__)
+
+_NINGUNO = object()
+
+
+class CacheBackend:
+    """Interfaz de almacén: ``obtener``, ``guardar``, ``limpiar`` y ``estadisticas``
+
+    ``guardar`` retorna el valor vigente: si otro hilo guardó antes la misma
+    llave, el de ese hilo. Los valores son compartidos y no deben modificarse.
+    """
+
+    nombre = None
+
+    def obtener(self, llave, defecto=None):
+        raise NotImplementedError
+
+    def guardar(self, llave, valor, tamano=None):
+        raise NotImplementedError
+
+    def limpiar(self):
+        raise NotImplementedError
+
+    def estadisticas(self):
+        raise NotImplementedError
+
+    def clear(self):
+        self.limpiar()
+
+    def obtener_o_calcular(self, llave, calcular, tamano=None):
+        """Valor de ``llave`` o el de ``calcular()`` (calculado fuera de cualquier lock; gana el primero)"""
+        valor = self.obtener(llave, _NINGUNO)
+        if valor is not _NINGUNO:
+            return valor
+        return self.guardar(llave, calcular(), tamano)
+
+
+class CacheDisco(CacheBackend):
+    """Un archivo pickle por llave en ``directorio``; se podan los menos usados
+
+    Los límites ``maximo_archivos`` y ``maximo_bytes`` aplican a ``directorio`` o,
+    si se indica ``raiz``, a todos los caches en subdirectorios de ``raiz``
+    (un solo presupuesto de disco compartido).
+    """
+
+    def __init__(self, nombre, directorio, maximo_archivos=None, maximo_bytes=None, raiz=None):
+        self.nombre = nombre
+        self.directorio = directorio
+        self.maximo_archivos = maximo_archivos
+        self.maximo_bytes = maximo_bytes
+        self.raiz = raiz
+        self.aciertos = 0
+        self.fallos = 0
+        self.escrituras = 0
+        self._lock = threading.Lock()
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, llave):
+        return os.path.join(self.directorio, hashlib.sha256(repr(llave).encode()).hexdigest() + ".pkl")
+
+    def _archivos(self, directorio=None):
+        return [e for e in os.scandir(directorio or self.directorio) if e.name.endswith(".pkl")]
+
+    def _podar(self):
+        if self.raiz:
+            archivos = [a for d in os.scandir(self.raiz) if d.is_dir() for a in self._archivos(d.path)]
+        else:
+            archivos = self._archivos()
+        estados = []
+        for entrada in archivos:
+            try:
+                estado = entrada.stat()
+                estados.append((estado.st_mtime, estado.st_size, entrada.path))
+            except FileNotFoundError:
+                pass  # Podado por otro proceso
+        cantidad, total = len(estados), sum(e[1] for e in estados)
+        for _, tamano, ruta in sorted(estados):
+            if ((not self.maximo_archivos or cantidad <= self.maximo_archivos)
+                    and (not self.maximo_bytes or total <= self.maximo_bytes)):
+                break
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+            cantidad, total = cantidad - 1, total - tamano
+
+    def obtener(self, llave, defecto=None):
+        ruta = self._ruta(llave)
+        leido = None
+        try:
+            with open(ruta, "rb") as f:
+                guardado_llave, valor = pickle.load(f)
+            os.utime(ruta)  # La poda descarta primero los menos usados
+            # Colisión de hash o archivo ajeno: se ignora
+            leido = (valor,) if guardado_llave == llave else None
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("Cache en disco %s: archivo ilegible (%s); se recalcula", self.nombre, e)
+        with self._lock:
+            if leido is None:
+                self.fallos += 1
+                return defecto
+            self.aciertos += 1
+        return leido[0]
+
+    def guardar(self, llave, valor, tamano=None):
+        self._escribir(llave, pickle.dumps((llave, valor), protocol=pickle.HIGHEST_PROTOCOL))
+        return valor
+
+    def _escribir(self, llave, contenido):
+        ruta = self._ruta(llave)
+        temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporal, "wb") as f:
+                f.write(contenido)
+            os.replace(temporal, ruta)
+            with self._lock:
+                self.escrituras += 1
+            self._podar()
+        except OSError as e:
+            logger.warning("Cache en disco %s: no se pudo guardar (%s)", self.nombre, e)
+
+    def limpiar(self):
+        for entrada in self._archivos():
+            try:
+                os.remove(entrada.path)
+            except OSError:
+                pass
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            "cache": self.nombre,
+            "entradas": len(self._archivos()),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            "escrituras": self.escrituras,
+            "directorio": self.directorio,
+        }
+
+
+class CacheEnCapas(CacheBackend):
+    """``memoria`` delante de ``disco``: lo leído de disco se sube a memoria y lo guardado va a ambos"""
+
+    def __init__(self, memoria, disco):
+        self.nombre = memoria.nombre
+        self.memoria = memoria
+        self.disco = disco
+
+    def obtener(self, llave, defecto=None):
+        valor = self.memoria.obtener(llave, _NINGUNO)
+        if valor is not _NINGUNO:
+            return valor
+        valor = self.disco.obtener(llave, _NINGUNO)
+        if valor is _NINGUNO:
+            return defecto
+        return self.memoria.guardar(llave, valor)
+
+    def guardar(self, llave, valor, tamano=None):
+        contenido = pickle.dumps((llave, valor), protocol=pickle.HIGHEST_PROTOCOL)
+        vigente = self.memoria.guardar(llave, valor, tamano if tamano is not None else len(contenido))
+        if vigente is valor:
+            self.disco._escribir(llave, contenido)
+        return vigente
+
+    def limpiar(self):
+        self.memoria.limpiar()
+        self.disco.limpiar()
+
+    def estadisticas(self):
+        return {**self.memoria.estadisticas(), "disco": self.disco.estadisticas()}
+
+
+def _testigo_streamlit(nombre):
+    return object()
+
+
+class CacheStreamlit(CacheBackend):
+    """Adaptador de la app: ``interno`` se vacía cuando Streamlit limpia sus caches
+
+    Un testigo guardado en ``st.cache_resource`` cambia tras "Clear cache" o
+    ``st.cache_resource.clear()``; al notarlo se limpia ``interno``. Los valores
+    siguen viviendo en ``interno`` (y en el presupuesto de memoria).
+    """
+
+    def __init__(self, interno):
+        import streamlit as st  # Solo la interfaz depende de Streamlit
+
+        self.nombre = interno.nombre
+        self.interno = interno
+        self._testigo = st.cache_resource(show_spinner=False)(_testigo_streamlit)
+        self._vigente = None
+        self._lock = threading.Lock()
+
+    def _sincronizar(self):
+        testigo = self._testigo(self.nombre)
+        with self._lock:
+            if testigo is not self._vigente:
+                if self._vigente is not None:
+                    self.interno.limpiar()
+                self._vigente = testigo
+
+    def obtener(self, llave, defecto=None):
+        self._sincronizar()
+        return self.interno.obtener(llave, defecto)
+
+    def guardar(self, llave, valor, tamano=None):
+        return self.interno.guardar(llave, valor, tamano)
+
+    def limpiar(self):
+        self.interno.limpiar()
+
+    def estadisticas(self):
+        return self.interno.estadisticas()
@@ -1,5 +1,25 @@
+import threading
 import numpy as np
-from ..config.constants import GDT_EXCELENTE, GDT_MODERADO
+from ..config.constants import (
+    GDT_EXCELENTE, GDT_MODERADO, SIMULACION_CACHE_MAX_ESCENARIOS, CALIDAD_PRODUCTOS, CLASES_CALIDAD
+)
+from .metricas import Metricas
+from .presupuesto import PresupuestoMemoria
+
+# Cache LRU de trayectorias simuladas: (temperatura, humedad, gdc_ini, gdh_ini, meses) -> (gdc, gdh)
+_cache_simulacion = PresupuestoMemoria.registro("simulacion", maximo_entradas=SIMULACION_CACHE_MAX_ESCENARIOS)
+_cache_simulacion_lock = threading.Lock()
+
+
+def ecuacion_daño_grano(tiempo):
+    """Ecuación real del daño del grano: y = 0.0730x² - 0.7741x + 14.8443"""
+    return 0.0730 * tiempo**2 - 0.7741 * tiempo + 14.8443
+
+
+def _simular_escenarios(escenarios, tiempos):
+    """Evolución de GDC y GDH para una matriz de escenarios (S × 4) sobre ``tiempos``"""
+    temperatura, humedad, gdc_ini, gdh_ini = (escenarios[:, [i]] for i in range(4))
+    return Calculations.calcular_daño(temperatura, humedad, gdc_ini, gdh_ini, tiempos[np.newaxis, :])
 
 class Calculations:
     """Utilidades para cálculos de calidad"""
@@ -9,49 +29,94 @@ class Calculations:
         """Calcular impacto en productos basado en GDT"""
         # GDT más alto = mayor impacto negativo
         factor_calidad = max(0.05, 1 - (gdt / 100))
-        
-        productos = {
-            "Aceite de Soya": factor_calidad * 0.9,  # 90% de calidad base
-            "Harina de Soya": factor_calidad * 0.85,  # 85% de calidad base
-            "Proteína de Soya": factor_calidad * 0.8,  # 80% de calidad base
-            "Lecitina": factor_calidad * 0.95,  # 95% de calidad base
-            "Biodiesel": factor_calidad * 0.75   # 75% de calidad base
-        }
-        return productos
+        return {producto: factor_calidad * base for producto, base in CALIDAD_PRODUCTOS.items()}
+
+    @staticmethod
+    def calcular_impacto_productos_lote(gdt):
+        """Impacto en productos para un arreglo de GDT: {producto: arreglo}"""
+        factor_calidad = np.maximum(0.05, 1 - (np.asarray(gdt, dtype=float) / 100))
+        return {producto: factor_calidad * base for producto, base in CALIDAD_PRODUCTOS.items()}
+
+    @staticmethod
+    def clasificar_calidad(gdt):
+        """Clase de calidad por GDT (Excelente < GDT_EXCELENTE <= Moderada < GDT_MODERADO <= Crítica)"""
+        gdt = np.asarray(gdt, dtype=float)
+        indice = (gdt >= GDT_EXCELENTE).astype(int) + (gdt >= GDT_MODERADO)
+        return np.asarray(CLASES_CALIDAD, dtype=object)[indice]
     
     @staticmethod
     def simular_evolucion_temporal(temperatura, humedad, gdc_ini, gdh_ini, meses):
         """Simular evolución de GDC y GDH a lo largo del tiempo"""
-        tiempos = np.arange(0, meses + 1, 0.5)  # Cada 15 días
+        tiempos, gdc_evol, gdh_evol, gdt_evol = Calculations.simular_evolucion_lote(
+            temperatura, humedad, gdc_ini, gdh_ini, meses
+        )
+        return tiempos, gdc_evol[0].tolist(), gdh_evol[0].tolist(), gdt_evol[0].tolist()
+    
+    @staticmethod
+    @Metricas.medido("calculos.calcular_daño")
+    def calcular_daño(temperatura, humedad, gdc_ini, gdh_ini, tiempo):
+        """Calcular GDC y GDH tras ``tiempo`` meses de almacenamiento (elemento a elemento)
         
+        Todos los argumentos aceptan escalares o arreglos difundibles entre sí, por
+        lo que el tiempo puede ser continuo y distinto para cada escenario.
+        """
         # Factores de degradación basados en condiciones
         factor_temp = 1 + (temperatura - 20) * 0.02  # 2% por °C sobre 20°C
         factor_hum = 1 + (humedad - 50) * 0.01       # 1% por % de humedad sobre 50%
         
-        # Ecuación real del daño del grano: y = 0.0730x² - 0.7741x + 14.8443
-        def ecuacion_daño_grano(tiempo):
-            return 0.0730 * tiempo**2 - 0.7741 * tiempo + 14.8443
+        daño_base = ecuacion_daño_grano(tiempo)
         
         # Evolución de GDC (daño térmico)
-        gdc_evol = []
-        for t in tiempos:
-            daño_base = ecuacion_daño_grano(t)
-            daño_ajustado = daño_base * factor_temp
-            gdc_final = min(gdc_ini + daño_ajustado, 100)
-            gdc_evol.append(max(0, gdc_final))
+        gdc = np.maximum(0, np.minimum(gdc_ini + daño_base * factor_temp, 100))
         
         # Evolución de GDH (daño por hongos)
-        gdh_evol = []
-        for t in tiempos:
-            daño_hongos_base = ecuacion_daño_grano(t) * 0.6
-            daño_hongos_ajustado = daño_hongos_base * factor_hum
-            gdh_final = min(gdh_ini + daño_hongos_ajustado, 50)
-            gdh_evol.append(max(0, gdh_final))
+        gdh = np.maximum(0, np.minimum(gdh_ini + (daño_base * 0.6) * factor_hum, 50))
+        return gdc, gdh
+    
+    @staticmethod
+    def tiempos_simulacion(meses):
+        """Instantes (meses) de ``simular_evolucion_lote``: cada 15 días de 0 a ``meses`` + 0.5"""
+        return np.arange(0, meses + 1, 0.5)
+
+    @staticmethod
+    @Metricas.medido("calculos.simular_evolucion")
+    def simular_evolucion_lote(temperaturas, humedades, gdc_ini, gdh_ini, meses):
+        """Simular evolución de GDC, GDH y GDT para varios escenarios a la vez
+        
+        Los argumentos de escenario aceptan escalares o arreglos (se difunden entre sí).
+        Retorna ``tiempos`` (T,) y matrices (escenario × tiempo) de GDC, GDH y GDT.
+        Los escenarios repetidos se calculan una sola vez y se memorizan entre llamadas.
+        """
+        escenarios = np.broadcast_arrays(
+            *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (temperaturas, humedades, gdc_ini, gdh_ini))
+        )
+        escenarios = np.column_stack([e.ravel() for e in escenarios])
+        unicos, inverso = np.unique(escenarios, axis=0, return_inverse=True)
+        tiempos = Calculations.tiempos_simulacion(meses)
         
-        # Calcular GDT
-        gdt_evol = [gdc + gdh for gdc, gdh in zip(gdc_evol, gdh_evol)]
+        if len(unicos) > SIMULACION_CACHE_MAX_ESCENARIOS:
+            # Lotes grandes: memorizar cada escenario desplazaría toda la cache
+            gdc, gdh = _simular_escenarios(unicos, tiempos)
+        else:
+            gdc = np.empty((len(unicos), len(tiempos)))
+            gdh = np.empty_like(gdc)
+            claves = [tuple(fila) + (meses,) for fila in unicos.tolist()]
+            with _cache_simulacion_lock:
+                guardadas = [_cache_simulacion.obtener(clave) for clave in claves]
+                faltantes = [i for i, guardada in enumerate(guardadas) if guardada is None]
+                Metricas.contar("simulacion", True, len(claves) - len(faltantes))
+                Metricas.contar("simulacion", False, len(faltantes))
+                if faltantes:
+                    gdc_nuevo, gdh_nuevo = _simular_escenarios(unicos[faltantes], tiempos)
+                    for j, i in enumerate(faltantes):
+                        guardadas[i] = (gdc_nuevo[j], gdh_nuevo[j])
+                        _cache_simulacion.guardar(claves[i], guardadas[i], gdc_nuevo[j].nbytes + gdh_nuevo[j].nbytes)
+                for i, (gdc_escenario, gdh_escenario) in enumerate(guardadas):
+                    gdc[i], gdh[i] = gdc_escenario, gdh_escenario
         
-        return tiempos, gdc_evol, gdh_evol, gdt_evol
+        inverso = inverso.ravel()
+        gdc_evol, gdh_evol = gdc[inverso], gdh[inverso]
+        return tiempos, gdc_evol, gdh_evol, gdc_evol + gdh_evol
     
     @staticmethod
     def obtener_ecuacion_base():
@@ -0,0 +1,178 @@
+import copy
+
+import numpy as np
+from plotly.io.json import to_json_plotly
+
+from ..config.constants import DECIMACION_UMBRAL, DECIMACION_UMBRAL_WEBGL, DECIMACION_DIGITOS
+
+# Atributos por punto que deben seguir a x/y cuando se descartan puntos
+ATRIBUTOS_POR_PUNTO = ("x", "y", "text", "hovertext", "customdata", "ids")
+ATRIBUTOS_MARCADOR = ("color", "size", "symbol", "opacity")
+ATRIBUTOS_NUMERICOS = ("x", "y", "z")
+
+
+def _numerico(valores):
+    arreglo = np.asarray(valores)
+    return arreglo if arreglo.dtype.kind in "iuf" else None
+
+
+class Decimacion:
+    """Reducción de trazas Plotly grandes antes de serializarlas
+
+    Las series de líneas (x creciente) con más de ``DECIMACION_UMBRAL`` puntos
+    se submuestrean (LTTB si llevan marcadores, mín/máx por cubeta si son solo
+    líneas, para conservar la envolvente); los scatter de solo marcadores con más de
+    ``DECIMACION_UMBRAL_WEBGL`` puntos se conservan completos pero pasan a
+    ``scattergl``. Los valores numéricos se redondean a ``DECIMACION_DIGITOS``
+    cifras significativas respecto a la magnitud de cada arreglo.
+    """
+
+    @staticmethod
+    def lttb(x, y, umbral):
+        """Índices de ``umbral`` puntos por Largest-Triangle-Three-Buckets (Steinarsson, 2013)"""
+        n = len(y)
+        if umbral >= n or umbral < 3:
+            return np.arange(n)
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        bordes = np.linspace(1, n - 1, umbral - 1).astype(np.int64)
+        indices = np.empty(umbral, dtype=np.int64)
+        indices[0], indices[-1] = 0, n - 1
+        anterior = 0
+        for i in range(umbral - 2):
+            inicio, fin = bordes[i], bordes[i + 1]
+            # Promedio de la cubeta siguiente (el último punto para la última cubeta)
+            siguiente_fin = bordes[i + 2] if i + 2 < len(bordes) else n
+            promedio_x = x[fin:siguiente_fin].mean() if siguiente_fin > fin else x[-1]
+            promedio_y = y[fin:siguiente_fin].mean() if siguiente_fin > fin else y[-1]
+            # Área (doble) del triángulo anterior - candidato - promedio siguiente
+            areas = np.abs(
+                (x[anterior] - promedio_x) * (y[inicio:fin] - y[anterior])
+                - (x[anterior] - x[inicio:fin]) * (promedio_y - y[anterior])
+            )
+            anterior = inicio + int(np.argmax(areas))
+            indices[i + 1] = anterior
+        return indices
+
+    @staticmethod
+    def minmax(y, umbral):
+        """Índices del mínimo y máximo de ``umbral // 2`` cubetas, más los extremos, en orden"""
+        n = len(y)
+        if umbral >= n or umbral < 4:
+            return np.arange(n)
+        y = np.asarray(y, dtype=float)
+        cubetas = (umbral - 2) // 2
+        bordes = np.linspace(1, n - 1, cubetas + 1).astype(np.int64)
+        seleccion = [0, n - 1]
+        for inicio, fin in zip(bordes[:-1], bordes[1:]):
+            if fin > inicio:
+                tramo = y[inicio:fin]
+                seleccion.extend((inicio + int(np.argmin(tramo)), inicio + int(np.argmax(tramo))))
+        return np.unique(seleccion)
+
+    @staticmethod
+    def redondear(valores, digitos=DECIMACION_DIGITOS):
+        """Redondear a ``digitos`` cifras significativas de la mayor magnitud del arreglo"""
+        arreglo = np.asarray(valores)
+        if arreglo.dtype.kind != "f" or arreglo.size == 0:
+            return valores
+        finitos = np.abs(arreglo[np.isfinite(arreglo)])
+        magnitud = finitos.max() if finitos.size else 0.0
+        if magnitud == 0:
+            return arreglo
+        return np.round(arreglo, max(0, digitos - 1 - int(np.floor(np.log10(magnitud)))))
+
+    @staticmethod
+    def reducir_traza(traza, umbral=DECIMACION_UMBRAL, umbral_webgl=DECIMACION_UMBRAL_WEBGL,
+                      digitos=DECIMACION_DIGITOS):
+        """Traza (dict de ``to_plotly_json``) reducida; retorna ``(traza, puntos_antes, puntos_despues)``"""
+        traza = dict(traza)
+        tipo = traza.get("type", "scatter")
+        y = traza.get("y")
+        n = len(y) if y is not None and np.ndim(y) == 1 else 0
+        puntos = n
+
+        if tipo in ("scatter", "scattergl") and n:
+            modo = traza.get("mode") or ("lines+markers" if n < 20 else "lines")
+            y_numerico = _numerico(y)
+            x = traza.get("x")
+            x_numerico = _numerico(x) if x is not None else np.arange(n, dtype=float)
+            if x_numerico is None or len(x_numerico) != n:
+                # Fechas o categorías: se usa la posición
+                x_numerico = np.arange(n, dtype=float)
+            # Solo series y barridos (x creciente y sin huecos); contornos y curvas cerradas no se tocan
+            serie = (
+                y_numerico is not None and np.isfinite(y_numerico).all()
+                and np.isfinite(x_numerico).all() and np.all(np.diff(x_numerico) >= 0)
+            )
+            if "lines" in modo and n > umbral and serie:
+                indices = (Decimacion.lttb(x_numerico, y_numerico, umbral) if "markers" in modo
+                           else Decimacion.minmax(y_numerico, umbral))
+                Decimacion._indexar(traza, indices, n)
+                puntos = len(indices)
+            elif modo == "markers" and n > umbral_webgl:
+                traza["type"] = "scattergl"
+
+        for atributo in ATRIBUTOS_NUMERICOS:
+            if traza.get(atributo) is not None:
+                traza[atributo] = Decimacion.redondear(traza[atributo], digitos)
+        return traza, n, puntos
+
+    @staticmethod
+    def _indexar(traza, indices, n):
+        for atributo in ATRIBUTOS_POR_PUNTO:
+            valores = traza.get(atributo)
+            if valores is not None and np.ndim(valores) >= 1 and len(valores) == n:
+                traza[atributo] = np.asarray(valores)[indices]
+        marcador = traza.get("marker")
+        if isinstance(marcador, dict):
+            marcador = dict(marcador)
+            for atributo in ATRIBUTOS_MARCADOR:
+                valores = marcador.get(atributo)
+                if valores is not None and not isinstance(valores, str) and np.ndim(valores) == 1 and len(valores) == n:
+                    marcador[atributo] = np.asarray(valores)[indices]
+            traza["marker"] = marcador
+
+    @staticmethod
+    def reducir(figura, umbral=DECIMACION_UMBRAL, umbral_webgl=DECIMACION_UMBRAL_WEBGL, digitos=DECIMACION_DIGITOS):
+        """Figura (dict con ``data`` y ``layout``) con todas sus trazas reducidas
+
+        Retorna ``(figura, informe)``; el informe cuenta puntos antes/después y
+        trazas pasadas a WebGL. La figura original no se modifica.
+        """
+        trazas, antes, despues = [], 0, 0
+        for traza in figura.get("data", []):
+            reducida, n, puntos = Decimacion.reducir_traza(traza, umbral, umbral_webgl, digitos)
+            trazas.append(reducida)
+            antes += n
+            despues += puntos
+        informe = {
+            "puntos_antes": antes,
+            "puntos_despues": despues,
+            "trazas_webgl": sum(t.get("type") == "scattergl" and o.get("type") != "scattergl"
+                                for t, o in zip(trazas, figura.get("data", []))),
+        }
+        return {"data": trazas, "layout": copy.copy(figura.get("layout", {}))}, informe
+
+    @staticmethod
+    def bytes_carga(figura, muestra=None):
+        """Bytes del JSON que recibiría el navegador
+
+        Con ``muestra`` se estiman serializando a lo sumo ``muestra`` puntos
+        equiespaciados por traza y escalando por los omitidos: en figuras de
+        cientos de miles de puntos cuesta una fracción de serializarlas completas.
+        """
+        if muestra is None:
+            return len(to_json_plotly({"data": figura.get("data", []), "layout": figura.get("layout", {})}))
+        total = len(to_json_plotly(figura.get("layout", {})))
+        for traza in figura.get("data", []):
+            y = traza.get("y")
+            n = len(y) if y is not None and np.ndim(y) == 1 else 0
+            if n <= muestra:
+                total += len(to_json_plotly(traza))
+                continue
+            indices = np.arange(0, n, -(-n // muestra))
+            traza = dict(traza)
+            Decimacion._indexar(traza, indices, n)
+            total += int(len(to_json_plotly(traza)) * n / len(indices))
+        return total
@@ -0,0 +1,89 @@
+import numpy as np
+
+from ..config.constants import DISTRIBUCION_BINS, DISTRIBUCION_PUNTOS_KDE
+
+
+class Distribuciones:
+    """Histogramas y densidades (KDE) agregados en el servidor
+
+    El navegador recibe solo los arreglos binados (``bins`` barras y
+    ``puntos`` valores de densidad), sin importar cuántas muestras tenga el dataset.
+    """
+
+    @staticmethod
+    def ancho_banda(valores):
+        """Regla de Silverman: 0.9 · min(σ, IQR/1.34) · n^(-1/5)"""
+        n = len(valores)
+        if n < 2:
+            return 0.0
+        q75, q25 = np.percentile(valores, [75, 25])
+        escala = min(np.std(valores, ddof=1), (q75 - q25) / 1.34) or np.std(valores, ddof=1)
+        return float(0.9 * escala * n ** (-0.2))
+
+    @staticmethod
+    def histograma(valores, bins=DISTRIBUCION_BINS, rango=None):
+        """Bordes y conteos de ``bins`` barras de igual ancho (O(n))"""
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[np.isfinite(valores)]
+        return np.histogram(valores, bins=bins, range=rango)
+
+    @staticmethod
+    def kde_fft(valores, puntos=DISTRIBUCION_PUNTOS_KDE, ancho=None, extension=3.0):
+        """Densidad gaussiana en una malla de ``puntos`` en O(n + puntos log puntos)
+
+        Las muestras se reparten linealmente entre los dos nodos vecinos de la
+        malla (binning lineal, O(n)) y la malla se convoluciona con el kernel
+        gaussiano por FFT con relleno de ceros, sin efecto circular. El error frente
+        a la KDE exacta es del orden de (paso / ancho)², despreciable con 512 puntos.
+        Retorna ``(x, densidad, ancho)``; la malla se extiende ``extension`` anchos de
+        banda a cada lado de los datos.
+        """
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[np.isfinite(valores)]
+        n = len(valores)
+        ancho = ancho or Distribuciones.ancho_banda(valores)
+        if n == 0 or ancho <= 0:
+            # Sin dispersión no hay densidad que estimar
+            return np.array([float(valores[0]) if n else 0.0]), np.zeros(1), 0.0
+
+        minimo = valores.min() - extension * ancho
+        maximo = valores.max() + extension * ancho
+        x = np.linspace(minimo, maximo, puntos)
+        paso = x[1] - x[0]
+
+        # Binning lineal
+        posicion = (valores - minimo) / paso
+        izquierda = np.clip(np.floor(posicion).astype(np.int64), 0, puntos - 2)
+        fraccion = posicion - izquierda
+        pesos = (np.bincount(izquierda, 1 - fraccion, minlength=puntos)
+                 + np.bincount(izquierda + 1, fraccion, minlength=puntos))
+
+        # Kernel sobre desplazamientos -(puntos-1)..(puntos-1) y convolución lineal por FFT
+        desplazamientos = np.arange(-(puntos - 1), puntos) * paso
+        kernel = np.exp(-0.5 * (desplazamientos / ancho) ** 2) / (ancho * np.sqrt(2 * np.pi))
+        tamano = 1 << int(np.ceil(np.log2(len(pesos) + len(kernel) - 1)))
+        convolucion = np.fft.irfft(np.fft.rfft(pesos, tamano) * np.fft.rfft(kernel, tamano), tamano)
+        densidad = np.maximum(convolucion[puntos - 1:2 * puntos - 1], 0.0) / n
+        return x, densidad, ancho
+
+    @staticmethod
+    def resumir(valores, bins=DISTRIBUCION_BINS, puntos=DISTRIBUCION_PUNTOS_KDE, decimales=4):
+        """Histograma + KDE listos para graficar, con la densidad escalada a conteos por barra
+
+        Retorna un diccionario con ``bordes``, ``conteos``, ``x``, ``densidad``
+        (en conteos por barra para superponerla al histograma), ``n``, ``media`` y ``ancho``.
+        """
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[np.isfinite(valores)]
+        conteos, bordes = Distribuciones.histograma(valores, bins)
+        x, densidad, ancho = Distribuciones.kde_fft(valores, puntos)
+        ancho_barra = bordes[1] - bordes[0] if len(bordes) > 1 else 1.0
+        return {
+            "bordes": np.round(bordes, decimales),
+            "conteos": conteos,
+            "x": np.round(x, decimales),
+            "densidad": np.round(densidad * len(valores) * ancho_barra, decimales),
+            "n": int(len(valores)),
+            "media": float(valores.mean()) if len(valores) else float("nan"),
+            "ancho": ancho,
+        }
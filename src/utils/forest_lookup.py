@@ -0,0 +1,154 @@
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+
+class ForestLookupTable:
+    """Tabla exacta de predicción para ensambles de árboles sobre 2 variables
+
+    Los árboles parten el plano (GDC, GDH) con cortes paralelos a los ejes, así
+    que la predicción del bosque es constante en cada celda de la malla formada
+    por todos los umbrales. Se precalcula el valor de cada celda y luego cada
+    predicción es un par de ``searchsorted`` + indexación: O(n log k) sin
+    recorrer los árboles, con resultados idénticos a ``model.predict``.
+    """
+
+    def __init__(self, umbrales_x, umbrales_y, valores):
+        self.umbrales_x = umbrales_x
+        self.umbrales_y = umbrales_y
+        self.valores = valores
+
+    @classmethod
+    def from_model(cls, model):
+        """Construir la tabla acumulando la tabla pequeña de cada árbol
+
+        Cada árbol solo tiene unas decenas de cortes, así que se evalúa en su propia
+        malla y se proyecta a la malla global; las predicciones se promedian en el
+        mismo orden que ``RandomForestRegressor.predict``. Se verifica contra
+        ``model.predict`` en una muestra de celdas antes de usarla.
+        """
+        arboles = _arboles(model)
+        if getattr(model, "n_features_in_", 2) != 2:
+            raise ValueError("La tabla de búsqueda solo aplica a modelos de 2 variables")
+
+        umbrales = [_umbrales(arboles, feature) for feature in range(2)]
+        representantes = [_representantes(u) for u in umbrales]
+
+        valores = np.zeros((len(representantes[0]), len(representantes[1])))
+        for arbol in arboles:
+            umbrales_arbol = [_umbrales([arbol], feature) for feature in range(2)]
+            xx, yy = np.meshgrid(*(_representantes(u) for u in umbrales_arbol), indexing="ij")
+            X_arbol = np.ascontiguousarray(np.column_stack([xx.ravel(), yy.ravel()]), dtype=np.float32)
+            tabla_arbol = arbol.predict(X_arbol).reshape(len(X_arbol), -1)[:, 0].reshape(xx.shape)
+            ix, iy = (
+                np.searchsorted(u, r, side="left")
+                for u, r in zip(umbrales_arbol, representantes)
+            )
+            valores += tabla_arbol[np.ix_(ix, iy)]
+        if hasattr(model, "estimators_"):
+            valores /= len(arboles)
+
+        tabla = cls(umbrales[0], umbrales[1], valores)
+        tabla._verificar(model, representantes)
+        return tabla
+
+    def _verificar(self, model, representantes, n_muestras=2000, semilla=0):
+        rng = np.random.default_rng(semilla)
+        x = rng.choice(representantes[0], n_muestras)
+        y = rng.choice(representantes[1], n_muestras)
+        X = np.column_stack([x, y])
+        feature_names = getattr(model, "feature_names_in_", None)
+        if feature_names is not None:
+            X = pd.DataFrame(X, columns=feature_names)
+        esperado = np.asarray(model.predict(X), dtype=float)
+        if not np.allclose(self.predict(x, y), esperado, rtol=0, atol=1e-12):
+            raise ValueError("La tabla de búsqueda no reproduce las predicciones del modelo")
+
+    def predict(self, x, y):
+        """Predecir para arreglos ``x`` (GDC) e ``y`` (GDH) de cualquier forma"""
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        # Los árboles de sklearn comparan la entrada en float32 contra umbrales float64
+        i = np.searchsorted(self.umbrales_x, x.astype(np.float32).astype(float), side="left")
+        j = np.searchsorted(self.umbrales_y, y.astype(np.float32).astype(float), side="left")
+        return self.valores[i, j]
+
+    @property
+    def nbytes(self):
+        return self.umbrales_x.nbytes + self.umbrales_y.nbytes + self.valores.nbytes
+
+
+def _arboles(model):
+    if hasattr(model, "estimators_"):
+        return [est.tree_ for est in np.ravel(model.estimators_)]
+    if hasattr(model, "tree_"):
+        return [model.tree_]
+    raise TypeError("El modelo no es un ensamble de árboles")
+
+
+def _umbrales(arboles, feature):
+    return np.unique(np.concatenate([t.threshold[t.feature == feature] for t in arboles]))
+
+
+def _representantes(umbrales):
+    """El mayor float32 <= u[i] para cada celda (u[i-1], u[i]] y uno mayor al último
+
+    Si una celda no contiene ningún float32 nunca será consultada, así que su
+    representante (fuera de la celda) es irrelevante.
+    """
+    bajo = umbrales.astype(np.float32)
+    bajo = np.where(bajo.astype(float) > umbrales, np.nextafter(bajo, np.float32(-np.inf)), bajo)
+    ultimo = np.float32(umbrales[-1]) if len(umbrales) else np.float32(0)
+    if len(umbrales) and float(ultimo) <= umbrales[-1]:
+        ultimo = np.nextafter(ultimo, np.float32(np.inf))
+    return np.append(bajo, ultimo).astype(float)
+
+
+class _Construccion:
+    """Estado de construcción de la tabla de un modelo"""
+
+    def __init__(self):
+        self.listo = threading.Event()
+        self.tabla = None
+
+    def construir(self, model):
+        try:
+            self.tabla = ForestLookupTable.from_model(model)
+        except (TypeError, ValueError, AttributeError):
+            self.tabla = None  # El modelo no admite tabla: se usa model.predict
+        finally:
+            self.listo.set()
+
+
+# Tablas construidas por modelo (se liberan junto con el modelo)
+_tablas = weakref.WeakKeyDictionary()
+_tablas_lock = threading.Lock()
+
+
+def get_lookup_table(model, esperar=True):
+    """Tabla de búsqueda memorizada para ``model``
+
+    Retorna None si el modelo no admite tabla o, con ``esperar=False``, mientras
+    la tabla se sigue construyendo en segundo plano.
+    """
+    if model is None:
+        return None
+    try:
+        with _tablas_lock:
+            estado = _tablas.get(model)
+            nuevo = estado is None
+            if nuevo:
+                estado = _tablas[model] = _Construccion()
+    except TypeError:
+        return None  # Objeto sin soporte de weakref
+    if nuevo:
+        if esperar:
+            estado.construir(model)
+        else:
+            threading.Thread(
+                target=estado.construir, args=(model,), name="forest-lookup", daemon=True
+            ).start()
+    if esperar:
+        estado.listo.wait()
+    return estado.tabla if estado.listo.is_set() else None
@@ -0,0 +1,231 @@
+"""Tiempos por sección del rerun y aciertos de cache, exportados en formato de texto de Prometheus
+
+Con ``SOYA_METRICAS_PUERTO`` se sirven en ``http://<host>:<puerto>/metrics``; con
+``SOYA_METRICAS_ARCHIVO`` se escriben periódicamente en ese archivo (p. ej. para el
+textfile collector de node_exporter).
+"""
+import bisect
+import contextlib
+import functools
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ..config.constants import (
+    METRICAS_BUCKETS, METRICAS_PUERTO, METRICAS_HOST, METRICAS_ARCHIVO, METRICAS_INTERVALO
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _RegistroMetricas:
+    """Histogramas de duración por sección y contadores de consultas por cache (por proceso)"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.histogramas = {}                # sección -> [conteos por bucket..., +Inf]
+        self.sumas = defaultdict(float)
+        self.consultas = defaultdict(int)    # (cache, "acierto" | "fallo") -> n
+        self.colectores = []                 # Funciones que agregan líneas propias (p. ej. memoria de caches)
+        self._lock = threading.Lock()
+
+    def observar(self, seccion, segundos):
+        indice = bisect.bisect_left(self.buckets, segundos)
+        with self._lock:
+            conteos = self.histogramas.setdefault(seccion, [0] * (len(self.buckets) + 1))
+            conteos[indice] += 1
+            self.sumas[seccion] += segundos
+
+    def contar(self, cache, resultado, n=1):
+        with self._lock:
+            self.consultas[(cache, resultado)] += n
+
+    def texto(self):
+        with self._lock:
+            histogramas = {s: list(c) for s, c in self.histogramas.items()}
+            sumas = dict(self.sumas)
+            consultas = dict(self.consultas)
+        lineas = [
+            "# HELP soya_seccion_segundos Duración de las secciones del rerun (carga, predicción, simulación, figuras)",
+            "# TYPE soya_seccion_segundos histogram",
+        ]
+        for seccion in sorted(histogramas):
+            etiqueta = f'seccion="{_escapar(seccion)}"'
+            acumulado = 0
+            for limite, conteo in zip(self.buckets + (float("inf"),), histogramas[seccion]):
+                acumulado += conteo
+                le = "+Inf" if limite == float("inf") else repr(float(limite))
+                lineas.append(f'soya_seccion_segundos_bucket{{{etiqueta},le="{le}"}} {acumulado}')
+            lineas.append(f"soya_seccion_segundos_sum{{{etiqueta}}} {sumas[seccion]:.6f}")
+            lineas.append(f"soya_seccion_segundos_count{{{etiqueta}}} {acumulado}")
+        lineas += [
+            "# HELP soya_cache_consultas_total Consultas a cada cache por resultado",
+            "# TYPE soya_cache_consultas_total counter",
+        ]
+        for (cache, resultado), n in sorted(consultas.items()):
+            lineas.append(f'soya_cache_consultas_total{{cache="{_escapar(cache)}",resultado="{resultado}"}} {n}')
+        for colector in self.colectores:
+            lineas += colector()
+        return "\n".join(lineas) + "\n"
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_registro = _RegistroMetricas(METRICAS_BUCKETS)
+_exportador_lock = threading.Lock()
+_exportador_iniciado = False
+
+
+class _Pagina:
+    """Cronómetro de un rerun completo de una página
+
+    Como bloque ``with`` registra el tiempo al salir aunque el rerun termine con
+    ``st.stop()``, un rerun interrumpido o una excepción de la página.
+    """
+
+    def __init__(self, nombre):
+        self.nombre = f"pagina.{nombre}"
+        self.inicio = time.perf_counter()
+        self.terminada = False
+
+    def terminar(self):
+        if not self.terminada:
+            self.terminada = True
+            _registro.observar(self.nombre, time.perf_counter() - self.inicio)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.terminar()
+        return False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        cuerpo = _registro.texto().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class Metricas:
+    """API de tramos (spans) y contadores de cache; no depende de Streamlit"""
+
+    @staticmethod
+    @contextlib.contextmanager
+    def medir(seccion):
+        """``with Metricas.medir("modelo.predecir_acidez"):`` registra la duración del bloque"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            _registro.observar(seccion, time.perf_counter() - inicio)
+
+    @staticmethod
+    def medido(seccion):
+        """Decorador equivalente a ``Metricas.medir`` alrededor de toda la función"""
+        def decorar(funcion):
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                with Metricas.medir(seccion):
+                    return funcion(*args, **kwargs)
+            return envoltura
+        return decorar
+
+    @staticmethod
+    def contar(cache, acierto, n=1):
+        """Sumar consultas a un cache propio (``FigureCache``, ``ResultCache``, secciones)"""
+        _registro.contar(cache, "acierto" if acierto else "fallo", n)
+
+    @staticmethod
+    def cache(nombre, decorador):
+        """Aplicar ``decorador`` (``st.cache_data(...)``, ``st.cache_resource``) contando aciertos y fallos
+
+        El cuerpo de la función solo se ejecuta en un fallo; el resto de llamadas
+        son aciertos. La duración de cada llamada se registra como ``cache.<nombre>``.
+        """
+        def decorar(funcion):
+            fallos = threading.local()
+
+            @functools.wraps(funcion)
+            def calcular(*args, **kwargs):
+                fallos.ultimo = True
+                return funcion(*args, **kwargs)
+
+            cacheada = decorador(calcular)
+
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                fallos.ultimo = False
+                with Metricas.medir(f"cache.{nombre}"):
+                    resultado = cacheada(*args, **kwargs)
+                Metricas.contar(nombre, not fallos.ultimo)
+                return resultado
+
+            envoltura.clear = cacheada.clear
+            return envoltura
+        return decorar
+
+    @staticmethod
+    def registrar_colector(colector):
+        """Agregar al texto de Prometheus las líneas que retorne ``colector()`` (con sus ``# HELP``/``# TYPE``)"""
+        _registro.colectores.append(colector)
+
+    @staticmethod
+    def pagina(nombre):
+        """Iniciar el cronómetro del rerun de una página (``with Metricas.pagina(...):`` alrededor del script)
+
+        También arranca el exportador configurado, una sola vez por proceso.
+        """
+        Metricas.iniciar_exportador()
+        return _Pagina(nombre)
+
+    @staticmethod
+    def prometheus():
+        """Todas las métricas en formato de texto de Prometheus (versión 0.0.4)"""
+        return _registro.texto()
+
+    @staticmethod
+    def iniciar_exportador(puerto=METRICAS_PUERTO, archivo=METRICAS_ARCHIVO):
+        """Servir ``/metrics`` en ``puerto`` y/o volcar a ``archivo`` cada ``METRICAS_INTERVALO`` s"""
+        global _exportador_iniciado
+        with _exportador_lock:
+            if _exportador_iniciado:
+                return
+            _exportador_iniciado = True
+        if puerto:
+            try:
+                servidor = ThreadingHTTPServer((METRICAS_HOST, puerto), _Handler)
+                servidor.daemon_threads = True
+                threading.Thread(target=servidor.serve_forever, name="metricas-http", daemon=True).start()
+                logger.info("Métricas en http://%s:%s/metrics", METRICAS_HOST, puerto)
+            except OSError as e:
+                logger.error("No se pudo abrir el puerto de métricas %s: %s", puerto, e)
+        if archivo:
+            threading.Thread(target=_volcar_periodicamente, args=(archivo,), name="metricas-archivo", daemon=True).start()
+
+
+def _volcar_periodicamente(archivo):
+    while True:
+        try:
+            temporal = archivo + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                f.write(_registro.texto())
+            os.replace(temporal, archivo)
+        except OSError as e:
+            logger.error("No se pudieron escribir las métricas en %s: %s", archivo, e)
+        time.sleep(METRICAS_INTERVALO)
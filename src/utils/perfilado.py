@@ -0,0 +1,143 @@
+"""Perfilado bajo demanda de un rerun: muestreo de pilas (gráfico de llamas) o cProfile (tabla)
+
+El perfil crudo se guarda en disco: ``.folded`` (pilas colapsadas, compatibles con
+flamegraph.pl y speedscope) para el muestreo y ``.prof`` (``pstats``/snakeviz) para cProfile.
+"""
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+import pandas as pd
+
+from ..config.constants import PERFILADO_INTERVALO, PERFILADO_FILAS
+
+MODOS_PERFILADO = {"muestreo": "Muestreo de pilas (gráfico de llamas)", "determinista": "cProfile (tabla ordenada)"}
+
+
+def _etiqueta(codigo):
+    return f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})"
+
+
+class _Muestreador:
+    """Hilo que toma la pila del hilo perfilado cada ``intervalo`` segundos"""
+
+    def __init__(self, hilo, intervalo):
+        self.hilo = hilo
+        self.intervalo = intervalo
+        self.pilas = Counter()
+        self._detener = threading.Event()
+        self._thread = threading.Thread(target=self._muestrear, name="perfilado-muestreo", daemon=True)
+
+    def _muestrear(self):
+        while not self._detener.wait(self.intervalo):
+            marco = sys._current_frames().get(self.hilo)
+            pila = []
+            while marco is not None:
+                pila.append(marco.f_code)
+                marco = marco.f_back
+            pila.reverse()
+            # Se descarta el runtime de Streamlit: la pila empieza en el script de la página
+            inicio = next((i for i, c in enumerate(pila) if c.co_name == "<module>"), 0)
+            if pila[inicio:]:
+                self.pilas[tuple(_etiqueta(c) for c in pila[inicio:])] += 1
+
+    def iniciar(self):
+        self._thread.start()
+
+    def detener(self):
+        self._detener.set()
+        self._thread.join()
+        return self.pilas
+
+
+class Perfilador:
+    """Perfil de un bloque de código del hilo actual (típicamente el rerun completo de una página)"""
+
+    def __init__(self, modo="muestreo", intervalo=PERFILADO_INTERVALO):
+        if modo not in MODOS_PERFILADO:
+            raise ValueError(f"Modo de perfilado desconocido: {modo}")
+        self.modo = modo
+        self.intervalo = intervalo
+        self._perfil = None
+        self._muestreador = None
+        self._inicio = None
+
+    def iniciar(self):
+        self._inicio = time.perf_counter()
+        if self.modo == "muestreo":
+            self._muestreador = _Muestreador(threading.get_ident(), self.intervalo)
+            self._muestreador.iniciar()
+        else:
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+        return self
+
+    def detener(self):
+        """Resultado del perfil: ``modo``, ``segundos``, ``tabla`` (DataFrame) y ``pilas`` (solo muestreo)"""
+        segundos = time.perf_counter() - self._inicio
+        if self.modo == "muestreo":
+            pilas = self._muestreador.detener()
+            return {"modo": self.modo, "segundos": segundos, "pilas": pilas,
+                    "tabla": Perfilador.tabla_muestreo(pilas, segundos)}
+        self._perfil.disable()
+        return {"modo": self.modo, "segundos": segundos, "pilas": None, "perfil": self._perfil,
+                "tabla": Perfilador.tabla_determinista(self._perfil)}
+
+    @staticmethod
+    def tabla_muestreo(pilas, segundos, filas=PERFILADO_FILAS):
+        """Funciones por muestras propias (en la cima de la pila) e inclusivas, con tiempo estimado"""
+        total = sum(pilas.values())
+        if not total:
+            return pd.DataFrame(columns=["funcion", "muestras_propias", "muestras_inclusivas",
+                                         "segundos_propios", "segundos_inclusivos", "pct_inclusivo"])
+        propias, inclusivas = Counter(), Counter()
+        for pila, n in pilas.items():
+            propias[pila[-1]] += n
+            for funcion in set(pila):
+                inclusivas[funcion] += n
+        por_muestra = segundos / total
+        tabla = pd.DataFrame({
+            "funcion": list(inclusivas),
+            "muestras_propias": [propias[f] for f in inclusivas],
+            "muestras_inclusivas": list(inclusivas.values()),
+        })
+        tabla["segundos_propios"] = tabla["muestras_propias"] * por_muestra
+        tabla["segundos_inclusivos"] = tabla["muestras_inclusivas"] * por_muestra
+        tabla["pct_inclusivo"] = 100 * tabla["muestras_inclusivas"] / total
+        return tabla.sort_values(["muestras_propias", "muestras_inclusivas"], ascending=False).head(filas).reset_index(drop=True)
+
+    @staticmethod
+    def tabla_determinista(perfil, filas=PERFILADO_FILAS):
+        """Funciones de cProfile ordenadas por tiempo acumulado"""
+        estadisticas = pstats.Stats(perfil).stats
+        tabla = pd.DataFrame([
+            {
+                "funcion": f"{funcion} ({os.path.basename(archivo)}:{linea})",
+                "llamadas": llamadas,
+                "segundos_propios": propio,
+                "segundos_acumulados": acumulado,
+            }
+            for (archivo, linea, funcion), (_, llamadas, propio, acumulado, _) in estadisticas.items()
+        ])
+        if tabla.empty:
+            return tabla
+        return tabla.sort_values("segundos_acumulados", ascending=False).head(filas).reset_index(drop=True)
+
+    @staticmethod
+    def guardar(resultado, directorio, nombre):
+        """Guardar el perfil crudo en ``directorio``; retorna la ruta del archivo"""
+        os.makedirs(directorio, exist_ok=True)
+        base = os.path.join(directorio, f"{nombre}-{time.strftime('%Y%m%d-%H%M%S')}")
+        if resultado["modo"] == "muestreo":
+            ruta = base + ".folded"
+            with open(ruta, "w", encoding="utf-8") as f:
+                for pila, n in resultado["pilas"].most_common():
+                    f.write(";".join(pila) + f" {n}\n")
+        else:
+            ruta = base + ".prof"
+            resultado["perfil"].dump_stats(ruta)
+        return ruta
@@ -0,0 +1,374 @@
+"""Presupuesto global de memoria para los caches en proceso (datos, modelos, figuras y resultados)
+
+Todos los caches registrados comparten un mismo límite de bytes
+(``SOYA_MEMORIA_MB``). Al superarlo se desaloja la entrada usada hace más tiempo
+de cualquier cache (LRU global); las entradas mayores que
+``MEMORIA_MAX_FRACCION`` del presupuesto no se guardan, para que un solo
+resultado enorme no vacíe el resto. Las entradas fijas (modelos) cuentan en el
+total pero nunca se desalojan. Los tamaños son estimaciones: ``nbytes`` de los
+arreglos, ``memory_usage(deep=True)`` de los DataFrames y recorrido de los
+contenedores y atributos del resto. ``CacheAcotado`` es el almacén en proceso
+de ``cache_backends``; los caches decorados pueden cambiar de almacén
+(``usar_backend``) sin tocar los servicios.
+"""
+import functools
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from ..config.constants import MEMORIA_PRESUPUESTO_MB, MEMORIA_MAX_FRACCION, CACHE_DISCO_DIR, CACHE_DISCO_MB
+from .cache_backends import _NINGUNO, CacheBackend, CacheDisco, CacheEnCapas
+from .metricas import Metricas
+
+
+def _tamano(valor, vistos):
+    if id(valor) in vistos:
+        return 0
+    vistos.add(id(valor))
+    if hasattr(type(valor), "memoria_bytes"):
+        return int(valor.memoria_bytes())
+    if isinstance(valor, np.ndarray):
+        return int(valor.nbytes)
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True, index=True).sum())
+    if isinstance(valor, (pd.Series, pd.Index)):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, (str, bytes, bytearray, int, float, complex, bool, type(None), np.generic)):
+        return sys.getsizeof(valor)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(_tamano(k, vistos) + _tamano(v, vistos) for k, v in valor.items())
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return sys.getsizeof(valor) + sum(_tamano(v, vistos) for v in valor)
+    if isinstance(valor, (type, types.ModuleType, types.FunctionType, types.MethodType)):
+        return 0  # Código compartido, no datos del cache
+    if hasattr(valor, "__dict__"):
+        return sys.getsizeof(valor) + _tamano(vars(valor), vistos)
+    try:
+        # Objetos de extensiones (p. ej. árboles de sklearn): su estado serializado
+        return len(pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(valor)
+
+
+def _hasheable(valor):
+    """Llave hasheable para argumentos de funciones cacheadas (diccionarios, listas, arreglos, DataFrames)"""
+    if isinstance(valor, dict):
+        return ("dict", tuple(sorted((k, _hasheable(v)) for k, v in valor.items())))
+    if isinstance(valor, (list, tuple)):
+        return tuple(_hasheable(v) for v in valor)
+    if isinstance(valor, (set, frozenset)):
+        return frozenset(_hasheable(v) for v in valor)
+    if isinstance(valor, np.ndarray):
+        datos = valor.tobytes() if valor.dtype != object else pickle.dumps(valor)
+        return ("ndarray", str(valor.dtype), valor.shape, hashlib.sha1(datos).hexdigest())
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        huella = pd.util.hash_pandas_object(valor, index=True).to_numpy()
+        columnas = tuple(valor.columns) if isinstance(valor, pd.DataFrame) else valor.name
+        return ("pandas", columnas, hashlib.sha1(huella.tobytes()).hexdigest())
+    try:
+        hash(valor)
+        return valor
+    except TypeError:
+        return ("repr", repr(valor))
+
+
+class _Presupuesto:
+    """Bytes de todos los caches y orden LRU global de las entradas desalojables"""
+
+    def __init__(self, maximo_bytes, max_fraccion):
+        self.maximo_bytes = int(maximo_bytes)
+        self.max_fraccion = max_fraccion
+        self.caches = {}             # nombre -> CacheAcotado
+        self.orden = OrderedDict()   # (nombre, llave) -> None, de la menos a la más reciente
+        self.bytes = 0               # Entradas desalojables
+        self.lock = threading.RLock()
+        self._fijos = (0, float("-inf"))  # (bytes de las entradas fijas, momento de la medición)
+
+    def bytes_fijos(self, refrescar=False):
+        """Bytes de las entradas fijas; se vuelven a medir a lo sumo una vez por segundo"""
+        bytes_fijos, medido = self._fijos
+        if refrescar or time.monotonic() - medido > 1.0:
+            bytes_fijos = sum(c.bytes_fijos() for c in self.caches.values() if c.fijo)
+            self._fijos = (bytes_fijos, time.monotonic())
+        return bytes_fijos
+
+    def ajustar(self):
+        """Desalojar por LRU global hasta caber en el presupuesto (con el lock tomado)"""
+        fijos = self.bytes_fijos()
+        while self.orden and self.bytes + fijos > self.maximo_bytes:
+            nombre, llave = next(iter(self.orden))
+            self.caches[nombre]._quitar(llave, desalojo=True)
+
+
+class CacheAcotado(CacheBackend):
+    """Cache LRU con nombre dentro del presupuesto global; seguro entre hilos
+
+    Los valores son compartidos y no deben modificarse.
+    """
+
+    def __init__(self, nombre, presupuesto, maximo_entradas=None, ttl=None, fijo=False):
+        self.nombre = nombre
+        self.presupuesto = presupuesto
+        self.maximo_entradas = maximo_entradas
+        self.ttl = ttl
+        self.fijo = fijo
+        self.entradas = OrderedDict()  # llave -> [valor, bytes, vence]
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.expirados = 0
+        self.rechazados = 0
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def __contains__(self, llave):
+        return llave in self.entradas
+
+    def bytes_fijos(self):
+        vistos = set()
+        return sum(_tamano(entrada[0], vistos) for entrada in list(self.entradas.values()))
+
+    def _quitar(self, llave, desalojo=False):
+        _, tamano, _ = self.entradas.pop(llave)
+        if not self.fijo:
+            self.bytes -= tamano
+            self.presupuesto.bytes -= tamano
+            self.presupuesto.orden.pop((self.nombre, llave), None)
+        if desalojo:
+            self.desalojos += 1
+
+    def obtener(self, llave, defecto=None):
+        """Valor guardado en ``llave`` (y lo marca como reciente) o ``defecto``"""
+        with self.presupuesto.lock:
+            entrada = self.entradas.get(llave)
+            if entrada is not None and entrada[2] is not None and entrada[2] < time.monotonic():
+                self._quitar(llave)
+                self.expirados += 1
+                entrada = None
+            if entrada is None:
+                self.fallos += 1
+                return defecto
+            self.aciertos += 1
+            self.entradas.move_to_end(llave)
+            if not self.fijo:
+                self.presupuesto.orden.move_to_end((self.nombre, llave))
+            return entrada[0]
+
+    def guardar(self, llave, valor, tamano=None):
+        """Guardar ``valor``; si otro hilo ya lo guardó, retorna ese. Retorna el valor vigente"""
+        if tamano is None and not self.fijo:
+            tamano = _tamano(valor, set())
+        presupuesto = self.presupuesto
+        with presupuesto.lock:
+            if llave in self.entradas:
+                return self.entradas[llave][0]
+            if not self.fijo and tamano > presupuesto.maximo_bytes * presupuesto.max_fraccion:
+                self.rechazados += 1
+                return valor
+            vence = time.monotonic() + self.ttl if self.ttl else None
+            self.entradas[llave] = [valor, tamano or 0, vence]
+            if not self.fijo:
+                self.bytes += tamano
+                presupuesto.bytes += tamano
+                presupuesto.orden[(self.nombre, llave)] = None
+            while self.maximo_entradas and len(self.entradas) > self.maximo_entradas:
+                self._quitar(next(iter(self.entradas)), desalojo=True)
+            presupuesto.ajustar()
+            return valor
+
+    def valores(self):
+        with self.presupuesto.lock:
+            return [entrada[0] for entrada in self.entradas.values()]
+
+    def limpiar(self):
+        with self.presupuesto.lock:
+            for llave in list(self.entradas):
+                self._quitar(llave)
+
+    clear = limpiar
+
+    def estadisticas(self):
+        with self.presupuesto.lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "cache": self.nombre,
+                "entradas": len(self.entradas),
+                "bytes": self.bytes_fijos() if self.fijo else self.bytes,
+                "maximo_entradas": self.maximo_entradas,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+                "desalojos": self.desalojos,
+                "expirados": self.expirados,
+                "rechazados": self.rechazados,
+                "fijo": self.fijo,
+            }
+
+
+_presupuesto = _Presupuesto(MEMORIA_PRESUPUESTO_MB * 1024 * 1024, MEMORIA_MAX_FRACCION)
+_backends = {}  # Caches decorados: nombre -> almacén vigente
+
+
+class PresupuestoMemoria:
+    """Caches en proceso acotados por un presupuesto global de bytes, con contabilidad por cache"""
+
+    @staticmethod
+    def registro(nombre, maximo_entradas=None, ttl=None, fijo=False):
+        """``CacheAcotado`` con ese nombre (se crea la primera vez; después se reutiliza)"""
+        with _presupuesto.lock:
+            cache = _presupuesto.caches.get(nombre)
+            if cache is None:
+                cache = _presupuesto.caches[nombre] = CacheAcotado(nombre, _presupuesto, maximo_entradas, ttl, fijo)
+            return cache
+
+    @staticmethod
+    def cache(nombre, maximo_entradas=None, ttl=None, fijo=False, disco=None):
+        """Decorador que memoriza la función por sus argumentos en el cache ``nombre``
+
+        Reemplaza a ``st.cache_data``/``st.cache_resource`` sin depender de
+        Streamlit: los argumentos pueden ser diccionarios, listas, arreglos o
+        DataFrames; el resultado se comparte (no se copia) y no debe modificarse.
+        Las excepciones se propagan y no se memorizan. Cuenta aciertos y fallos
+        en ``Metricas`` como ``Metricas.cache``; ``funcion.clear()`` vacía el cache.
+
+        ``disco`` es una función con los mismos argumentos que retorna la huella
+        del contenido que el cálculo lee (archivos de modelo y datos). Con
+        ``SOYA_CACHE_DIR`` definido los resultados también se guardan en disco
+        (deben ser serializables con pickle), siempre bajo esa huella: un
+        artefacto reemplazado no reutiliza lo persistido. Si la huella es None o
+        cambia durante el cálculo, el resultado solo queda en memoria o no se guarda.
+        """
+        registro = PresupuestoMemoria.registro(nombre, maximo_entradas, ttl, fijo)
+        backend = registro
+        en_disco = PresupuestoMemoria.disco(nombre) if disco is not None else None
+        if en_disco is not None:
+            backend = CacheEnCapas(registro, en_disco)
+        _backends.setdefault(nombre, backend)
+
+        def memorizar(funcion):
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                llave = (_hasheable(args), _hasheable(tuple(sorted(kwargs.items()))))
+                calcular = lambda: funcion(*args, **kwargs)  # noqa: E731
+                if disco is None:
+                    return _backends[nombre].obtener_o_calcular(llave, calcular)
+                valor, _ = PresupuestoMemoria.obtener_con_huella(
+                    _backends[nombre], registro, llave, calcular, lambda: disco(*args, **kwargs)
+                )
+                return valor
+
+            envoltura.clear = lambda: _backends[nombre].limpiar()
+            return envoltura
+
+        return Metricas.cache(nombre, memorizar)
+
+    @staticmethod
+    def disco(nombre):
+        """``CacheDisco`` del cache ``nombre`` en ``SOYA_CACHE_DIR`` (None si no está configurado)
+
+        Todos los caches en disco comparten el límite ``CACHE_DISCO_MB``.
+        """
+        if not CACHE_DISCO_DIR:
+            return None
+        return CacheDisco(nombre, os.path.join(CACHE_DISCO_DIR, nombre),
+                          maximo_bytes=int(CACHE_DISCO_MB * 1024 * 1024), raiz=CACHE_DISCO_DIR)
+
+    @staticmethod
+    def obtener_con_huella(backend, memoria, llave, calcular, huella):
+        """``(valor, acierto)`` de ``llave`` guardando en disco solo bajo la huella del contenido leído
+
+        ``huella()`` retorna la huella de los insumos (archivos de modelo y
+        datos) o None; sin huella se usa solo ``memoria``. Si la huella cambia
+        mientras se calcula, el resultado no se guarda.
+        """
+        actual = huella()
+        if actual is None:
+            backend = memoria  # Sin huella: solo en memoria
+        else:
+            llave += (_hasheable(actual),)
+        valor = backend.obtener(llave, _NINGUNO)
+        if valor is not _NINGUNO:
+            return valor, True
+        valor = calcular()
+        if actual is not None and huella() != actual:
+            return valor, False  # Los insumos cambiaron mientras se calculaba: no se guarda
+        return backend.guardar(llave, valor), False
+
+    @staticmethod
+    def backends():
+        """Almacén vigente de cada cache decorado (nombre -> ``CacheBackend``)"""
+        return dict(_backends)
+
+    @staticmethod
+    def usar_backend(nombre, backend):
+        """Cambiar el almacén del cache decorado ``nombre`` (p. ej. por un ``CacheStreamlit`` que lo envuelva)"""
+        if nombre not in _backends:
+            raise KeyError(f"Cache no declarado: {nombre}")
+        _backends[nombre] = backend
+
+    @staticmethod
+    def tamano(valor):
+        """Bytes estimados de ``valor`` (arreglos, DataFrames, contenedores y atributos)"""
+        return _tamano(valor, set())
+
+    @staticmethod
+    def estadisticas():
+        """Una fila por cache: entradas, bytes, aciertos, fallos, desalojos, expirados y rechazados"""
+        with _presupuesto.lock:
+            filas = [c.estadisticas() for c in _presupuesto.caches.values()]
+        return pd.DataFrame(filas, columns=[
+            "cache", "entradas", "bytes", "maximo_entradas", "aciertos", "fallos", "tasa_aciertos",
+            "desalojos", "expirados", "rechazados", "fijo",
+        ]).sort_values("bytes", ascending=False, ignore_index=True)
+
+    @staticmethod
+    def resumen():
+        """Bytes usados (desalojables y fijos) frente al presupuesto"""
+        with _presupuesto.lock:
+            fijos = _presupuesto.bytes_fijos(refrescar=True)
+            return {
+                "presupuesto_bytes": _presupuesto.maximo_bytes,
+                "bytes": _presupuesto.bytes + fijos,
+                "bytes_fijos": fijos,
+                "caches": len(_presupuesto.caches),
+            }
+
+    @staticmethod
+    def limpiar():
+        """Vaciar todos los caches (las estadísticas se conservan)"""
+        with _presupuesto.lock:
+            for cache in _presupuesto.caches.values():
+                cache.limpiar()
+
+
+def _prometheus():
+    tabla = PresupuestoMemoria.estadisticas()
+    resumen = PresupuestoMemoria.resumen()
+    lineas = [
+        "# HELP soya_memoria_presupuesto_bytes Presupuesto global de memoria de los caches",
+        "# TYPE soya_memoria_presupuesto_bytes gauge",
+        f"soya_memoria_presupuesto_bytes {resumen['presupuesto_bytes']}",
+        "# HELP soya_memoria_bytes Bytes estimados en los caches (incluye entradas fijas)",
+        "# TYPE soya_memoria_bytes gauge",
+        f"soya_memoria_bytes {resumen['bytes']}",
+    ]
+    for columna, tipo, ayuda in (("bytes", "gauge", "Bytes estimados por cache"),
+                                 ("entradas", "gauge", "Entradas por cache"),
+                                 ("desalojos", "counter", "Entradas desalojadas por presupuesto o límite de entradas")):
+        nombre = f"soya_cache_{columna}" + ("_total" if tipo == "counter" else "")
+        lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} {tipo}"]
+        lineas += [f'{nombre}{{cache="{fila.cache}"}} {getattr(fila, columna)}' for fila in tabla.itertuples()]
+    return lineas
+
+
+Metricas.registrar_colector(_prometheus)
@@ -5,6 +5,8 @@ import matplotlib.pyplot as plt
 import statsmodels.api as sm
 from statsmodels.regression.quantile_regression import QuantReg
 
+from .metricas import Metricas
+
 # Paleta de colores personalizada
 PALETTE = {
     "mean": "#1A494C",    # Verde oscuro
@@ -15,11 +17,13 @@ PALETTE = {
     "ajuste": "#1A494C",  # Verde oscuro
 }
 
+@Metricas.medido("regresion.cargar_datos")
 def load_and_prepare_data(file_path):
     """Carga y prepara los datos del archivo CSV."""
     df = pd.read_csv(file_path)
     return df
 
+@Metricas.medido("regresion.ajustar_cuantilica")
 def fit_quantile_regression(df, column, taus=[0.4, 0.5, 0.6]):
     """Ajusta modelos de regresión cuantílica para una columna específica."""
     y = pd.to_numeric(df[column], errors="coerce").dropna()
@@ -72,6 +76,7 @@ def fit_quantile_regression(df, column, taus=[0.4, 0.5, 0.6]):
     
     return pd.DataFrame(results)
 
+@Metricas.medido("regresion.graficar_ajuste")
 def plot_best_fit(df, column, best_model_params):
     """Genera el gráfico del mejor ajuste para una columna específica."""
     x = df["Fecha"]
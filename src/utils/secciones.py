@@ -0,0 +1,63 @@
+import functools
+import time
+
+from .metricas import Metricas
+
+# Llave de session_state con el último resultado de cada sección
+_ESTADO_SECCIONES = "_secciones_memorizadas"
+
+
+def seccion_memorizada(funcion=None, *, nombre=None):
+    """Memorizar por sesión el resultado de una sección de la página según sus entradas declaradas
+
+    Los argumentos de la función son las entradas de la sección; si en un rerun
+    son iguales a los del anterior, se retorna el mismo objeto (figuras, tablas)
+    sin recalcular. Se guarda solo el último resultado por sección y sesión, por
+    nombre de la función, así que funciona aunque el script redefina la función
+    en cada rerun. Equivale a los fragments de Streamlit (>= 1.33) para secciones
+    que solo dependen de sus entradas.
+
+    Las entradas deben ser valores simples comparables con ``==`` (números,
+    textos, tuplas); los diccionarios se pasan como ``tuple(d.items())``.
+    """
+    def decorar(funcion):
+        etiqueta = nombre or funcion.__name__
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            import streamlit as st  # Solo las páginas dependen de Streamlit; ``src.utils`` se importa sin él
+
+            entradas = (args, tuple(sorted(kwargs.items())))
+            secciones = st.session_state.setdefault(_ESTADO_SECCIONES, {})
+            previa = secciones.get(etiqueta)
+            if previa is not None and previa["entradas"] == entradas:
+                previa["reutilizaciones"] += 1
+                Metricas.contar(f"seccion.{etiqueta}", True)
+                return previa["resultado"]
+
+            Metricas.contar(f"seccion.{etiqueta}", False)
+            inicio = time.perf_counter()
+            with Metricas.medir(f"seccion.{etiqueta}"):
+                resultado = funcion(*args, **kwargs)
+            secciones[etiqueta] = {
+                "entradas": entradas,
+                "resultado": resultado,
+                "calculos": (previa["calculos"] if previa else 0) + 1,
+                "reutilizaciones": previa["reutilizaciones"] if previa else 0,
+                "segundos": time.perf_counter() - inicio,
+            }
+            return resultado
+
+        return envoltura
+
+    return decorar(funcion) if funcion is not None else decorar
+
+
+def estadisticas_secciones():
+    """Cálculos, reutilizaciones y duración del último cálculo de cada sección en la sesión"""
+    import streamlit as st
+
+    return {
+        etiqueta: {k: v for k, v in seccion.items() if k not in ("entradas", "resultado")}
+        for etiqueta, seccion in st.session_state.get(_ESTADO_SECCIONES, {}).items()
+    }
@@ -0,0 +1,202 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import presupuesto
+from src.utils.cache_backends import CacheDisco, CacheEnCapas, CacheStreamlit
+from src.utils.presupuesto import CacheAcotado, PresupuestoMemoria, _Presupuesto, _hasheable
+
+
+def _cache(maximo_bytes=10_000, max_fraccion=0.5, **opciones):
+    return CacheAcotado("prueba", _Presupuesto(maximo_bytes, max_fraccion), **opciones)
+
+
+# ----- CacheAcotado -----
+
+def test_desaloja_la_entrada_menos_usada_al_superar_maximo_entradas():
+    cache = _cache(maximo_entradas=2)
+    cache.guardar("a", 1, tamano=10)
+    cache.guardar("b", 2, tamano=10)
+    assert cache.obtener("a") == 1  # "b" pasa a ser la menos usada
+    cache.guardar("c", 3, tamano=10)
+
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.desalojos == 1
+    assert cache.bytes == cache.presupuesto.bytes == 20
+
+
+def test_desaloja_por_presupuesto_global_entre_caches():
+    comun = _Presupuesto(100, 1.0)
+    primero = CacheAcotado("primero", comun)
+    segundo = CacheAcotado("segundo", comun)
+    comun.caches = {"primero": primero, "segundo": segundo}
+    primero.guardar("a", 1, tamano=60)
+    segundo.guardar("b", 2, tamano=60)
+
+    assert "a" not in primero and "b" in segundo
+    assert comun.bytes == 60
+
+
+def test_las_entradas_expiran_por_ttl():
+    cache = _cache(ttl=0.01)
+    cache.guardar("a", 1, tamano=10)
+    time.sleep(0.02)
+
+    assert cache.obtener("a", "vencida") == "vencida"
+    assert cache.expirados == 1 and cache.bytes == 0
+
+
+def test_rechaza_entradas_mayores_que_la_fraccion_del_presupuesto():
+    cache = _cache(maximo_bytes=1000, max_fraccion=0.25)
+
+    assert cache.guardar("grande", "valor", tamano=300) == "valor"
+    assert "grande" not in cache and cache.rechazados == 1
+
+
+def test_guardar_retorna_el_valor_ya_vigente():
+    cache = _cache()
+    primero = cache.guardar("a", [1], tamano=10)
+
+    assert cache.guardar("a", [2], tamano=10) is primero
+
+
+def test_las_entradas_fijas_no_se_desalojan():
+    comun = _Presupuesto(100, 1.0)
+    fijo = CacheAcotado("fijo", comun, fijo=True)
+    comun.caches = {"fijo": fijo}
+    fijo.guardar("modelo", np.zeros(1000))
+
+    assert "modelo" in fijo
+    assert comun.bytes_fijos(refrescar=True) == 8000
+
+
+# ----- _hasheable -----
+
+def test_hasheable_es_estable_para_contenidos_iguales():
+    a = {"x": [1, 2], "y": np.arange(3.0), "df": pd.DataFrame({"c": [1, 2]})}
+    b = {"df": pd.DataFrame({"c": [1, 2]}), "y": np.arange(3.0), "x": [1, 2]}
+
+    assert _hasheable(a) == _hasheable(b)
+    assert hash(_hasheable(a)) == hash(_hasheable(b))
+
+
+def test_hasheable_distingue_contenido_tipo_y_forma():
+    assert _hasheable(np.arange(4.0)) != _hasheable(np.arange(4.0) + 1)
+    assert _hasheable(np.arange(4.0)) != _hasheable(np.arange(4.0).reshape(2, 2))
+    assert _hasheable(np.arange(4.0)) != _hasheable(np.arange(4, dtype=np.int64))
+    assert _hasheable(pd.DataFrame({"a": [1]})) != _hasheable(pd.DataFrame({"b": [1]}))
+    assert _hasheable({1, 2}) == frozenset({1, 2})
+
+
+# ----- CacheDisco y CacheEnCapas -----
+
+def test_disco_sobrevive_a_una_instancia_nueva(tmp_path):
+    CacheDisco("disco", tmp_path).guardar(("llave", 1), {"valor": 1})
+
+    assert CacheDisco("disco", tmp_path).obtener(("llave", 1)) == {"valor": 1}
+    assert CacheDisco("disco", tmp_path).obtener(("otra", 1), "sin") == "sin"
+
+
+def test_disco_poda_los_archivos_menos_usados(tmp_path):
+    disco = CacheDisco("disco", tmp_path, maximo_archivos=2)
+    disco.guardar("a", 1)
+    os.utime(disco._ruta("a"), (1, 1))
+    disco.guardar("b", 2)
+    os.utime(disco._ruta("b"), (2, 2))
+    assert disco.obtener("a") == 1  # La lectura lo marca como reciente: "b" queda como el menos usado
+
+    disco.guardar("c", 3)
+
+    assert disco.obtener("b", "podado") == "podado"
+    assert disco.obtener("a") == 1 and disco.obtener("c") == 3
+    assert disco.estadisticas()["entradas"] == 2
+
+
+def test_disco_ignora_archivos_ilegibles(tmp_path):
+    disco = CacheDisco("disco", tmp_path)
+    disco.guardar("a", 1)
+    with open(disco._ruta("a"), "wb") as f:
+        f.write(b"no es pickle")
+
+    assert disco.obtener("a", "sin") == "sin"
+
+
+def test_en_capas_sube_a_memoria_lo_leido_de_disco(tmp_path):
+    CacheDisco("capas", tmp_path).guardar("a", 1)
+    capas = CacheEnCapas(_cache(), CacheDisco("capas", tmp_path))
+
+    assert capas.obtener("a") == 1
+    assert "a" in capas.memoria
+    assert capas.obtener("a") == 1
+    assert capas.disco.aciertos == 1  # La segunda lectura no llega a disco
+
+
+def test_en_capas_guarda_y_limpia_ambas_capas(tmp_path):
+    capas = CacheEnCapas(_cache(), CacheDisco("capas", tmp_path))
+    capas.guardar("a", 1)
+
+    assert "a" in capas.memoria and capas.disco.obtener("a") == 1
+    capas.limpiar()
+    assert len(capas.memoria) == 0 and capas.disco.obtener("a", "sin") == "sin"
+
+
+# ----- CacheStreamlit -----
+
+def test_streamlit_vacia_el_almacen_cuando_se_limpian_sus_caches():
+    st = pytest.importorskip("streamlit")
+    interno = _cache()
+    cache = CacheStreamlit(interno)
+    cache.guardar("a", 1)
+    assert cache.obtener("a") == 1
+
+    st.cache_resource.clear()
+
+    assert cache.obtener("a", "limpio") == "limpio"
+    assert len(interno) == 0
+
+
+# ----- PresupuestoMemoria.cache con huella en disco -----
+
+def test_cache_en_disco_se_invalida_al_cambiar_la_huella(tmp_path, monkeypatch):
+    monkeypatch.setattr(presupuesto, "CACHE_DISCO_DIR", str(tmp_path))
+    huella = {"valor": "v1"}
+    llamadas = []
+
+    @PresupuestoMemoria.cache("prueba.huella", disco=lambda x: huella["valor"])
+    def calcular(x):
+        llamadas.append(x)
+        return x * 2
+
+    assert calcular(2) == 4 and calcular(2) == 4
+    assert llamadas == [2]
+    huella["valor"] = "v2"  # Mismo argumento, otro contenido leído
+    assert calcular(2) == 4
+    assert llamadas == [2, 2]
+    assert len(os.listdir(tmp_path / "prueba.huella")) == 2
+
+
+def test_cache_sin_huella_no_persiste_en_disco(tmp_path, monkeypatch):
+    monkeypatch.setattr(presupuesto, "CACHE_DISCO_DIR", str(tmp_path))
+
+    @PresupuestoMemoria.cache("prueba.sin_huella", disco=lambda x: None)
+    def calcular(x):
+        return x + 1
+
+    assert calcular(1) == 2
+    assert os.listdir(tmp_path / "prueba.sin_huella") == []
+
+
+def test_disco_comparte_el_limite_de_bytes_entre_caches(tmp_path):
+    primero = CacheDisco("primero", tmp_path / "primero", raiz=tmp_path)
+    primero.guardar("a", 1)
+    os.utime(primero._ruta("a"), (1, 1))
+    segundo = CacheDisco("segundo", tmp_path / "segundo", maximo_bytes=os.path.getsize(primero._ruta("a")) + 1,
+                         raiz=tmp_path)
+
+    segundo.guardar("b", 2)
+
+    assert primero.obtener("a", "podado") == "podado"  # El más antiguo de cualquier cache
+    assert segundo.obtener("b") == 2
@@ -0,0 +1,172 @@
+import http.client
+import io
+import json
+import threading
+
+import pandas as pd
+import pytest
+
+from src.config.constants import API_MAX_FILAS
+from src.services.prediction_api import ARROW, CSV, JSON, ErrorPeticion, PredictionAPI, crear_servidor
+from src.utils.calculations import Calculations
+
+LOTE = [{"gdc": 5.0, "gdh": 2.0}, {"gdc": 20.0, "gdh": 10.0}]
+
+
+def _atender(ruta, cuerpo, tipo=JSON, aceptar=None, parametros=None):
+    if not isinstance(cuerpo, bytes):
+        cuerpo = json.dumps(cuerpo).encode("utf-8")
+    return PredictionAPI.atender(ruta, cuerpo, tipo, aceptar, parametros)
+
+
+def _resultados(contenido):
+    return json.loads(contenido)["resultados"]
+
+
+# ----- Endpoints -----
+
+def test_acidez_una_fila_por_lote():
+    formato, contenido, _, filas = _atender("/v1/acidez", LOTE)
+
+    assert formato == JSON and filas == 2
+    resultados = _resultados(contenido)
+    assert [r["lote"] for r in resultados] == [1, 2]
+    assert resultados[1]["acidez"] > resultados[0]["acidez"] > 0
+
+
+def test_acidez_acepta_alias_y_columnas_por_objeto():
+    _, contenido, _, _ = _atender("/v1/acidez", {"GDC": [5.0], "GDH": [2.0]})
+    _, esperado, _, _ = _atender("/v1/acidez", LOTE[:1])
+
+    assert _resultados(contenido) == _resultados(esperado)
+
+
+def test_proteina_desde_gdt_o_desde_gdc_y_gdh():
+    _, por_gdt, _, _ = _atender("/v1/proteina", [{"gdt": 7.0}])
+    _, por_dano, _, _ = _atender("/v1/proteina", LOTE[:1])
+
+    assert _resultados(por_gdt)[0]["proteina"] == pytest.approx(_resultados(por_dano)[0]["proteina"])
+
+
+def test_calidad_incluye_clase_y_cumplimiento():
+    _, contenido, _, _ = _atender("/v1/calidad", LOTE)
+    resultado = _resultados(contenido)[0]
+
+    assert {"clase_calidad", "cumple_acidez", "cumple_proteina", "acidez", "proteina"} <= set(resultado)
+
+
+def test_simulacion_una_fila_por_escenario_y_tiempo():
+    escenario = [{"gdc": 5.0, "gdh": 2.0, "temperatura": 25.0, "humedad": 60.0}]
+    _, _, _, filas = _atender("/v1/simulacion", escenario * 3, parametros={"meses": ["6"]})
+
+    assert filas == 3 * len(Calculations.tiempos_simulacion(6))
+
+
+def test_simulacion_limita_filas_con_los_tiempos_reales():
+    pasos = len(Calculations.tiempos_simulacion(12))
+    escenario = {"gdc": 5.0, "gdh": 2.0, "temperatura": 25.0, "humedad": 60.0}
+
+    _, _, _, filas = _atender("/v1/simulacion", [escenario] * (API_MAX_FILAS // pasos))
+    assert filas <= API_MAX_FILAS
+    with pytest.raises(ErrorPeticion) as error:
+        _atender("/v1/simulacion", [escenario] * (API_MAX_FILAS // pasos + 1))
+    assert error.value.estado == 413
+
+
+# ----- Formatos -----
+
+def test_csv_de_entrada_y_salida():
+    cuerpo = pd.DataFrame(LOTE).to_csv(index=False).encode("utf-8")
+    formato, contenido, _, _ = _atender("/v1/acidez", cuerpo, tipo=CSV)
+
+    assert formato == CSV
+    assert list(pd.read_csv(io.BytesIO(contenido)).columns) == ["lote", "gdc", "gdh", "acidez"]
+
+
+def test_arrow_de_entrada_y_json_de_salida():
+    pa = pytest.importorskip("pyarrow")
+    tabla = pa.Table.from_pandas(pd.DataFrame(LOTE), preserve_index=False)
+    buffer = io.BytesIO()
+    with pa.ipc.new_stream(buffer, tabla.schema) as escritor:
+        escritor.write_table(tabla)
+
+    formato, contenido, _, filas = _atender("/v1/acidez", buffer.getvalue(), tipo=ARROW, aceptar=JSON)
+    assert formato == JSON and filas == 2 and len(_resultados(contenido)) == 2
+
+
+# ----- Errores -----
+
+@pytest.mark.parametrize("ruta, cuerpo, parametros, estado", [
+    ("/v1/desconocido", LOTE, None, 404),
+    ("/v1/acidez", [{"gdc": 1.0}], None, 400),
+    ("/v1/acidez", [{"gdc": "x", "gdh": 1.0}], None, 400),
+    ("/v1/acidez", [{"gdc": 1.0, "GDC": 2.0, "gdh": 1.0}], None, 400),
+    ("/v1/simulacion", LOTE, {"meses": ["0"]}, 400),
+    ("/v1/simulacion", LOTE, {"meses": ["doce"]}, 400),
+])
+def test_peticiones_invalidas(ruta, cuerpo, parametros, estado):
+    with pytest.raises(ErrorPeticion) as error:
+        _atender(ruta, cuerpo, parametros=parametros)
+    assert error.value.estado == estado
+
+
+def test_cuerpo_ilegible():
+    with pytest.raises(ErrorPeticion):
+        _atender("/v1/acidez", b"{no es json")
+
+
+# ----- Servidor HTTP -----
+
+@pytest.fixture(scope="module")
+def servidor():
+    servidor = crear_servidor("127.0.0.1", 0)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield servidor.server_address
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _pedir(direccion, metodo, ruta, cuerpo=None, cabeceras=None):
+    conexion = http.client.HTTPConnection(*direccion, timeout=30)
+    try:
+        conexion.request(metodo, ruta, cuerpo, cabeceras or {})
+        respuesta = conexion.getresponse()
+        return respuesta.status, dict(respuesta.getheaders()), respuesta.read()
+    finally:
+        conexion.close()
+
+
+def test_http_post_y_salud(servidor):
+    estado, cabeceras, cuerpo = _pedir(servidor, "POST", "/v1/acidez", json.dumps(LOTE),
+                                       {"Content-Type": JSON})
+    assert estado == 200 and cabeceras["X-Filas"] == "2"
+    assert len(_resultados(cuerpo)) == 2
+
+    estado, _, cuerpo = _pedir(servidor, "GET", "/salud")
+    assert estado == 200 and json.loads(cuerpo)["estado"] == "ok"
+    assert _pedir(servidor, "GET", "/v1/acidez")[0] == 405
+
+
+@pytest.mark.parametrize("largo", ["abc", "-5"])
+def test_http_content_length_invalido(servidor, largo):
+    conexion = http.client.HTTPConnection(*servidor, timeout=10)
+    try:
+        conexion.putrequest("POST", "/v1/acidez")
+        conexion.putheader("Content-Length", largo)
+        conexion.endheaders()
+        respuesta = conexion.getresponse()
+        assert respuesta.status == 400
+        assert "Content-Length" in json.loads(respuesta.read())["error"]
+    finally:
+        conexion.close()
+
+
+def test_http_sin_content_length(servidor):
+    conexion = http.client.HTTPConnection(*servidor, timeout=10)
+    try:
+        conexion.putrequest("POST", "/v1/acidez")
+        conexion.endheaders()
+        assert conexion.getresponse().status == 411
+    finally:
+        conexion.close()